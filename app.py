@@ -4,13 +4,18 @@ Plex Media Renamer Web Application
 Flask backend API server
 """
 
+import bisect
+import hmac
 import os
 import sys
 import json
+import threading
+import time
 import traceback
+import uuid
+from concurrent.futures import CancelledError
 from datetime import datetime
-from threading import Thread
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, g, render_template, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import logging
 
@@ -20,9 +25,19 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from src.utils.config import Config
 from src.utils.logger import setup_logging, get_logger
 from src.core.file_parser import FileParser, MediaFileInfo
-from src.core.renamer import MediaRenamer, RenameOperation
+from src.core.renamer import OPERATION_TYPES, MediaRenamer, RenameOperation
+from src.core.results import build_result_row
+from src.core.jobs import COMPLETED, JobManager
+from src.core.jobstore import JobStore
+from src.core.pipeline import ScanPipeline
 from src.api.tmdb import TMDBClient
 from src.api.tvdb import TVDBClient
+from src.utils.events import EventBatcher, EventBus, SQLiteEventLog, format_sse
+from src.utils.fscache import ListingCache
+from src.utils.jobreport import observe_slow, timed_stage
+from src.utils.tracing import configure_tracing, span
+from src.utils.metrics import REGISTRY, SQLiteMetricsStore, gauge_lines
+from src.utils.profiling import PROFILE_SUFFIXES, SUMMARY_SUFFIX, ProfileSession, ProfileStore
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='static', template_folder='templates')
@@ -31,16 +46,523 @@ CORS(app)
 
 # Global variables
 config = Config()
-file_parser = FileParser()
-media_renamer = MediaRenamer(config)
-current_scan_results = []
-current_rename_operations = []
-scan_status = {'is_scanning': False, 'progress': 0, 'message': 'Ready'}
-discovered_media_folders = []  # Store discovered media folders
+# Directory listings are shared by /api/browse and the scanner's tree walks
+listing_cache = ListingCache.from_config(config)
+file_parser = FileParser(listing_cache)
+BROWSE_PAGE_SIZE = max(1, config.get_int('BROWSE', 'page_size', 500))
+# Job status, planned operations and events live in one SQLite file so
+# every web worker (and a restarted one) sees the same jobs and results
+job_store = JobStore.from_config(config)
+event_bus = EventBus(log=SQLiteEventLog(job_store.path))  # Pushes status and results to /api/events subscribers
+METRICS_ENABLED = config.get_boolean('METRICS', 'enabled', True)
+if METRICS_ENABLED:
+    # Each worker writes its counters to the shared database; /metrics sums them
+    REGISTRY.share(SQLiteMetricsStore(job_store.path),
+                   interval=max(1.0, config.get_float('METRICS', 'flush_seconds', 5)))
+# Jobs and requests can opt into profiling (profile: true / ?profile=1);
+# reports are saved to a directory served by the admin endpoints
+PROFILING_ENABLED = config.get_boolean('PROFILING', 'enabled', False)
+PROFILING_ADMIN_TOKEN = os.environ.get('PROFILING_ADMIN_TOKEN') or config.get('PROFILING', 'admin_token', '')
+PROFILE_SAMPLE_INTERVAL = max(0.001, config.get_float('PROFILING', 'sample_interval_ms', 5) / 1000)
+profile_store = ProfileStore.from_config(config)
+# Browsers reconnect on their own, so event streams are recycled periodically
+# rather than holding a worker thread indefinitely
+EVENT_STREAM_SECONDS = 300
+
+IDLE_STATUS = {'job_id': None, 'is_scanning': False, 'is_running': False, 'progress': 0, 'message': 'Ready'}
+
+
+def job_snapshot(status):
+    """
+    Return a job's status as sent to clients.
+    
+    Args:
+        status: Job status dictionary (Job.to_dict() or from the job store),
+            or None for the idle status
+        
+    Returns:
+        Dictionary with status, files_count and operations_count
+    """
+    if status is None:
+        return {'job_id': None, 'status': dict(IDLE_STATUS), 'files_count': 0, 'operations_count': 0}
+    status = dict(status, is_scanning=status['is_running'])
+    return {
+        'job_id': status['job_id'],
+        'status': status,
+        'files_count': status.get('files_count', 0),
+        'operations_count': status.get('operations_count', 0)
+    }
+
+
+def publish_job(job):
+    """Push a job's status to event stream subscribers."""
+    event_bus.publish('status', job_snapshot(job.to_dict()))
+
+
+def report_transfer_progress(path, bytes_done, total_bytes):
+    """Publish per-file copy progress for moves that cross filesystems."""
+    event_bus.publish('transfer', {
+        'file': os.path.basename(path),
+        'bytes_done': bytes_done,
+        'total_bytes': total_bytes,
+        'percent': round(bytes_done * 100 / total_bytes, 1) if total_bytes else 100.0
+    })
+
+
+media_renamer = MediaRenamer(config, progress_callback=report_transfer_progress)
+# Scans and discovery run as jobs so several can run side by side
+jobs = JobManager.from_config(config, on_update=publish_job, store=job_store)
 
 # Setup logging
-setup_logging()
+setup_logging(config=config)
 logger = get_logger(__name__)
+# Spans of scans and applies, exported to a JSONL file or a collector when [TRACING] is enabled
+configure_tracing(config)
+
+# Profiling
+
+def admin_authorized():
+    """Check the admin token (X-Admin-Token header or ?token=); without a configured token nobody is authorized."""
+    if not PROFILING_ADMIN_TOKEN:
+        return False
+    supplied = request.headers.get('X-Admin-Token') or request.args.get('token', '')
+    return hmac.compare_digest(supplied.encode('utf-8'), PROFILING_ADMIN_TOKEN.encode('utf-8'))
+
+
+def admin_denied():
+    """Return the 403 response for a request without a valid admin token."""
+    if not PROFILING_ADMIN_TOKEN:
+        return jsonify({'success': False, 'error': 'Profiling requires an admin token to be configured'}), 403
+    return jsonify({'success': False, 'error': 'Invalid admin token'}), 403
+
+
+def profile_requested(value):
+    """Return whether a profile option (true, "1" or "sample") asks for profiling."""
+    return PROFILING_ENABLED and str(value).lower() not in ('', '0', 'false', 'none', 'off')
+
+
+def start_profile(value, label):
+    """
+    Create a profile session for a request's profile option.
+    
+    Args:
+        value: true / "1" for cProfile data only, "sample" to also record
+            stack samples
+        label: Session label
+        
+    Returns:
+        ProfileSession, or None if profiling was not requested
+    """
+    if not profile_requested(value):
+        return None
+    sampling = str(value).lower() == 'sample'
+    return ProfileSession(label, sample_interval=PROFILE_SAMPLE_INTERVAL if sampling else None)
+
+
+def run_profiled(job, profiler, body):
+    """Run a job body on a profiled thread and record the saved profile in the job's status."""
+    try:
+        with profiler.profile_thread():
+            body(job)
+    finally:
+        try:
+            job.update(profile=profile_store.save(profiler, f'{job.kind}-{job.id}'))
+        except OSError as e:
+            logger.warning(f"Could not save profile of job {job.id}: {e}")
+
+# Scan planning
+
+def plan_scan_operation(renamer, media_file, media_type):
+    """
+    Look up metadata for a parsed file and build its rename operation.
+    
+    Args:
+        renamer: MediaRenamer used for metadata lookup and naming
+        media_file: Parsed MediaFileInfo
+        media_type: 'movies' or 'tv_shows'
+        
+    Returns:
+        Tuple of (RenameOperation or None, list of metadata issue dicts)
+    """
+    metadata_issues = []
+    metadata = show_metadata = episode_metadata = None
+    
+    try:
+        if media_type == 'movies':
+            metadata = renamer.get_movie_metadata(media_file)
+            
+            # Check metadata status
+            if metadata and metadata.get('metadata_status') != 'found':
+                metadata_issues.append({
+                    'file': media_file.filename,
+                    'issue': metadata.get('error_message', 'Unknown metadata issue'),
+                    'status': metadata.get('metadata_status', 'unknown')
+                })
+            
+            new_name = renamer.generate_movie_name(media_file, metadata)
+            target_dir = os.path.dirname(media_file.file_path)
+            if config.get_boolean('MOVIES', 'create_movie_folders', True):
+                movie_folder = os.path.join(os.path.dirname(target_dir), new_name)
+                target_path = os.path.join(movie_folder, f"{new_name}{media_file.extension}")
+            else:
+                target_path = os.path.join(target_dir, f"{new_name}{media_file.extension}")
+        else:
+            show_metadata, episode_metadata = renamer.get_tv_show_metadata(media_file)
+            
+            # Check metadata status
+            if show_metadata and show_metadata.get('metadata_status') != 'found':
+                metadata_issues.append({
+                    'file': media_file.filename,
+                    'issue': show_metadata.get('error_message', 'Unknown show metadata issue'),
+                    'status': show_metadata.get('metadata_status', 'unknown'),
+                    'type': 'show'
+                })
+            
+            if episode_metadata and episode_metadata.get('metadata_status') != 'found':
+                metadata_issues.append({
+                    'file': media_file.filename,
+                    'issue': episode_metadata.get('error_message', 'Unknown episode metadata issue'),
+                    'status': episode_metadata.get('metadata_status', 'unknown'),
+                    'type': 'episode'
+                })
+            
+            new_name = renamer.generate_tv_episode_name(
+                media_file, show_metadata, episode_metadata
+            )
+            
+            # Generate folder structure
+            if show_metadata and show_metadata.get('metadata_status') == 'found':
+                show_folder = renamer.generate_tv_show_folder_name(show_metadata, media_file)
+            else:
+                show_folder = media_file.title
+            
+            season_folder = f"Season {media_file.season:02d}" if media_file.season else "Season 01"
+            target_dir = os.path.join(config.tv_shows_path, show_folder, season_folder)
+            target_path = os.path.join(target_dir, f"{new_name}{media_file.extension}")
+        
+        operation = RenameOperation(media_file.file_path, target_path, renamer.operation_mode)
+        operation.metadata = {
+            'movie_metadata': metadata if media_type == 'movies' else None,
+            'show_metadata': show_metadata if media_type == 'tv_shows' else None,
+            'episode_metadata': episode_metadata if media_type == 'tv_shows' else None,
+            'media_info': {
+                'title': media_file.title,
+                'year': media_file.year,
+                'season': media_file.season,
+                'episode': media_file.episode,
+                'extension': media_file.extension
+            }
+        }
+        return operation, metadata_issues
+        
+    except Exception as e:
+        logger.error(f"Error processing {media_file.file_path}: {e}")
+        metadata_issues.append({
+            'file': media_file.filename,
+            'issue': f'Processing error: {str(e)}',
+            'status': 'error'
+        })
+        return None, metadata_issues
+
+def find_scan_job(job_id=None):
+    """
+    Return the status of the scan job a request refers to.
+    
+    Args:
+        job_id: Job ID from the request, or None for the latest completed scan
+        
+    Returns:
+        Job status dictionary from the job store, or None if there is no such scan
+    """
+    if job_id:
+        job = job_store.get_job(job_id)
+        return job if job is not None and job['kind'] == 'scan' else None
+    return job_store.latest_job('scan', COMPLETED)
+
+
+def run_discovery(job, base_path):
+    """Job body: discover media folders under base_path."""
+    job.update(0, 'Discovering media folders...')
+    jobs.notify(job)
+    
+    with timed_stage('walk'):
+        media_folders = file_parser.scan_plex_directory(base_path)
+    job.check_cancelled()
+    
+    job_store.save_result(job.id, {'media_folders': [
+        {
+            'path': folder.folder_path,
+            'name': folder.folder_name,
+            'media_file_count': folder.media_file_count,
+            'total_file_count': folder.total_file_count,
+            'subdirectory_count': folder.subdirectory_count,
+            'detected_type': folder.detected_type,
+            'confidence_score': folder.confidence_score,
+            'sample_files': folder.sample_files
+        }
+        for folder in media_folders
+    ]})
+    job.update(100, f'Discovery complete. Found {len(media_folders)} media folders.')
+    event_bus.publish('discovery_complete', {'job_id': job.id, 'total_folders': len(media_folders)})
+
+
+def run_scan(job, media_type, scan_paths, profiler=None):
+    """Job body: walk, parse and look up files, then plan and validate operations."""
+    job.update(0, 'Scanning files...', stages={})
+    jobs.notify(job)
+    event_bus.publish('scan_started', {'job_id': job.id, 'media_type': media_type, 'paths': scan_paths})
+    
+    renamer = media_renamer
+    # Planned operations are streamed in batches as lookups finish;
+    # their ids are provisional until the scan completes
+    result_batcher = EventBatcher(event_bus, 'results', context={'job_id': job.id})
+    
+    def walk():
+        for path in scan_paths:
+            yield from file_parser.iter_media_paths(path)
+    
+    def parse(file_path):
+        return file_parser.parse_file(file_path, media_type)
+    
+    def lookup(media_file):
+        start = time.perf_counter()
+        with span('plan', **{'file.path': media_file.file_path, 'media.type': media_type}):
+            operation, issues = plan_scan_operation(renamer, media_file, media_type)
+        observe_slow('files', media_file.file_path, time.perf_counter() - start)
+        return media_file, operation, issues
+    
+    def on_progress(snapshot):
+        stages = snapshot['stages']
+        job.update(
+            snapshot['progress'],
+            f"Found {stages['walk']['processed']} files, "
+            f"parsed {stages['parse']['processed']}, "
+            f"looked up {stages['lookup']['processed']}...",
+            stages=stages
+        )
+        jobs.notify(job)
+        result_batcher.flush_due()
+    
+    def on_result(sequence, result):
+        _, operation, _ = result
+        if operation is not None:
+            result_batcher.add(build_result_row(sequence, operation))
+    
+    # Walking, parsing and metadata lookup overlap; the lookup stage
+    # runs as many workers as the API transport pool allows
+    pipeline = ScanPipeline(
+        walk, parse, lookup,
+        lookup_workers=config.get_int('NETWORK', 'max_workers', 4),
+        cancel_event=job.cancel_event,
+        on_progress=on_progress,
+        on_result=on_result,
+        profiler=profiler
+    )
+    results = pipeline.run()
+    job.check_cancelled()
+    result_batcher.flush()
+    
+    all_media_files = [media_file for media_file, _, _ in results]
+    operations = [operation for _, operation, _ in results if operation is not None]
+    metadata_issues = [issue for _, _, issues in results for issue in issues]
+    
+    # One pass over all targets flags conflicts before anything is applied
+    with timed_stage('validate'), span('validate_operations', **{'operations.count': len(operations)}):
+        validation = renamer.validate_operations(operations)
+    
+    # Results are served from the job store rather than kept in this worker
+    with timed_stage('save'):
+        job_store.save_operations(job.id, operations)
+        job_store.save_result(job.id, {'metadata_issues': metadata_issues})
+    
+    # Create summary message
+    message_parts = [f'Scan complete. Found {len(all_media_files)} files, {len(operations)} operations ready.']
+    if metadata_issues:
+        message_parts.append(f'{len(metadata_issues)} metadata issues detected.')
+    if validation.blocked:
+        message_parts.append(f'{len(validation.blocked)} operations have conflicting targets.')
+    
+    job.update(
+        100, ' '.join(message_parts),
+        stages=pipeline.snapshot()['stages'],
+        validation=validation.summary(),
+        files_count=len(all_media_files),
+        operations_count=len(operations),
+        metadata_issue_count=len(metadata_issues)
+    )
+    event_bus.publish('scan_complete', {
+        'job_id': job.id,
+        'files_count': len(all_media_files),
+        'operations_count': len(operations),
+        'metadata_issue_count': len(metadata_issues),
+        'validation': job.details['validation']
+    })
+
+def operation_result(operation, dry_run):
+    """Describe the outcome of an executed (or skipped) operation for clients."""
+    if not operation.success:
+        message = f'Error: {operation.error_message}'
+    elif dry_run:
+        message = f'Dry run - would {operation.operation_type} file'
+    else:
+        message = 'Renamed successfully'
+    return {
+        'source_path': operation.source_path,
+        'target_path': operation.target_path,
+        'success': operation.success,
+        'message': message,
+        'issues': operation.issues,
+        'seconds': round(operation.duration, 4)
+    }
+
+
+def execution_summary(execution, total, successful, dry_run):
+    """Build the summary returned for an apply."""
+    return {
+        'total': total,
+        'successful': successful,
+        'failed': total - successful,
+        'skipped': execution['skipped'],
+        'cancelled': execution.get('cancelled', 0),
+        'dry_run': dry_run,
+        'elapsed': execution['elapsed'],
+        'operations_per_second': execution['operations_per_second'],
+        'bytes_transferred': execution['bytes_transferred'],
+        'bytes_per_second': execution['bytes_per_second'],
+        'journal_id': execution.get('journal_id'),
+        'validation': execution['validation']
+    }
+
+
+def run_apply(job, scan_job_id, indices, dry_run, operation_type):
+    """Job body: apply selected operations of a scan, storing each result as it finishes."""
+    with timed_stage('load'):
+        loaded = job_store.load_operations(scan_job_id, indices)
+    if indices and not loaded:
+        raise ValueError(f'Operations of scan {scan_job_id} are no longer available; run the scan again')
+    indices = [i for i in indices if i in loaded]
+    operations = [loaded[i] for i in indices]
+    if operation_type:
+        # Apply the planned targets with a different mode (e.g. hardlink for seeding files)
+        for operation in operations:
+            operation.operation_type = operation_type
+    index_of = {id(operation): i for i, operation in zip(indices, operations)}
+    total = len(operations)
+    
+    job.update(0, f'Applying {total} operations...', total=total, done=0, successful=0, failed=0)
+    jobs.notify(job)
+    
+    lock = threading.Lock()  # Guards the counters and pending results
+    flush_lock = threading.Lock()  # Keeps batches committed in seq order
+    state = {'pending': [], 'reported': set(), 'successful': 0, 'last_flush': time.monotonic()}
+    
+    def flush():
+        with flush_lock:
+            with lock:
+                batch, state['pending'] = state['pending'], []
+                state['last_flush'] = time.monotonic()
+                done, successful = len(state['reported']), state['successful']
+            if batch:
+                job_store.add_apply_results(job.id, batch)
+            job.update(
+                done * 100 / total if total else 100,
+                f'Applied {done} of {total} operations...',
+                done=done, successful=successful, failed=done - successful
+            )
+            jobs.notify(job)
+    
+    def report(operation):
+        # Called from executor worker threads as each operation finishes
+        with lock:
+            if id(operation) in state['reported']:
+                return
+            state['reported'].add(id(operation))
+            state['successful'] += bool(operation.success)
+            result = operation_result(operation, dry_run)
+            result.update(seq=len(state['reported']), id=index_of[id(operation)])
+            state['pending'].append(result)
+            due = len(state['pending']) >= 200 or time.monotonic() - state['last_flush'] >= 0.5
+        if due:
+            flush()
+    
+    # Conflicting operations are skipped by validation before anything runs;
+    # real applies are executed in parallel per device and journaled
+    execution = media_renamer.execute_operations(
+        operations, dry_run=dry_run, on_complete=report, cancel_event=job.cancel_event,
+        journal_info={'scan_job_id': scan_job_id, 'apply_job_id': job.id}
+    )
+    # Skipped and cancelled operations never reach the executor callback
+    for operation in operations:
+        report(operation)
+    flush()
+    
+    if not dry_run:
+        with timed_stage('save'):
+            job_store.update_operations(scan_job_id, indices, operations)
+        listing_cache.invalidate()
+    
+    summary = execution_summary(execution, total, state['successful'], dry_run)
+    job.update(100 if not job.cancelled else None, (
+        f"{'Dry run' if dry_run else 'Apply'} finished: {summary['successful']}/{total} succeeded"
+        + (f", {summary['cancelled']} cancelled" if summary['cancelled'] else '')
+    ), summary=summary)
+    event_bus.publish('apply_complete', {'job_id': job.id, 'scan_job_id': scan_job_id, 'summary': summary})
+
+def running_apply(scan_id):
+    """Return the status of an unfinished apply of a scan, if any."""
+    # Two applies of the same scan would race for the same files
+    for other in job_store.list_jobs('apply'):
+        if other['is_running'] and other['params'].get('scan_job_id') == scan_id:
+            return other
+    return None
+
+def submit_apply(scan_id, selected, dry_run, operation_type, selector=None):
+    """Start an apply job for the selected operations of a scan."""
+    params = {'scan_job_id': scan_id, 'dry_run': dry_run, 'operation_type': operation_type,
+              'selector': selector or {}, 'count': len(selected)}
+    return jobs.submit(
+        'apply', lambda job: run_apply(job, scan_id, selected, dry_run, operation_type), params
+    )
+
+def run_journal_action(job, journal_id, action):
+    """Job body: resume or undo an apply from its journal and update the scan's stored operations."""
+    scan_job_id = media_renamer.journals.open(journal_id).info.get('scan_job_id')
+    lock = threading.Lock()
+    settled = {}  # Source path -> operation as the journal now has it
+    
+    def collect(operation):
+        with lock:
+            settled[operation.source_path] = operation
+    
+    job.update(0, f"{'Resuming' if action == 'resume' else 'Undoing'} journal {journal_id}...")
+    jobs.notify(job)
+    if action == 'resume':
+        results = media_renamer.resume_journal(journal_id, on_complete=collect, cancel_event=job.cancel_event)
+    else:
+        results = media_renamer.undo_journal(journal_id, on_complete=collect, cancel_event=job.cancel_event)
+    listing_cache.invalidate()
+    
+    if scan_job_id and settled:
+        with timed_stage('save'):
+            indices = job_store.indices_for_sources(scan_job_id, list(settled))
+            stored = job_store.load_operations(scan_job_id, list(indices.values()))
+            for source_path, index in indices.items():
+                operation = settled[source_path]
+                stored[index].applied = operation.applied
+                stored[index].success = operation.success
+                stored[index].error_message = operation.error_message
+            job_store.update_operations(scan_job_id, list(stored), list(stored.values()))
+    
+    if action == 'resume':
+        message = (f"Resume finished: {results['success']} applied, {results['failed']} failed, "
+                   f"{results['recovered']} already applied, {results['missing']} missing")
+    else:
+        message = f"Undo finished: {results['undone']} reverted, {results['failed']} failed"
+    # Keep the job's details small; timings hold one entry per operation
+    results.pop('timings', None)
+    job.update(100 if not job.cancelled else None, message, results=results, scan_job_id=scan_job_id)
+    event_bus.publish(f'{action}_complete', {'job_id': job.id, 'journal_id': journal_id,
+                                             'scan_job_id': scan_job_id})
 
 # Routes
 
@@ -60,6 +582,8 @@ def get_config():
             'movies_path': config.movies_path,
             'tv_shows_path': config.tv_shows_path,
             'dry_run_mode': config.dry_run_mode,
+            'operation_mode': media_renamer.operation_mode,
+            'operation_modes': list(OPERATION_TYPES),
             'create_movie_folders': config.get_boolean('MOVIES', 'create_movie_folders', True),
             'include_episode_title': config.get_boolean('TV_SHOWS', 'include_episode_title', True),
             'include_series_id': config.get_boolean('TV_SHOWS', 'include_series_id', False),
@@ -94,6 +618,10 @@ def update_config():
         # Update other settings
         if 'dry_run_mode' in data:
             config.set('GENERAL', 'dry_run_mode', str(data['dry_run_mode']).lower())
+        if 'operation_mode' in data:
+            if data['operation_mode'] not in OPERATION_TYPES:
+                return jsonify({'success': False, 'error': f"Unknown operation mode: {data['operation_mode']}"}), 400
+            config.operation_mode = data['operation_mode']
         if 'create_movie_folders' in data:
             config.set('MOVIES', 'create_movie_folders', str(data['create_movie_folders']).lower())
         if 'include_episode_title' in data:
@@ -110,7 +638,8 @@ def update_config():
         
         # Reinitialize media renamer with new config
         global media_renamer
-        media_renamer = MediaRenamer(config)
+        media_renamer.close()
+        media_renamer = MediaRenamer(config, progress_callback=report_transfer_progress)
         
         return jsonify({'success': True, 'message': 'Configuration updated successfully'})
     except Exception as e:
@@ -126,52 +655,39 @@ def discover_media_folders():
         
         if not os.path.exists(base_path):
             return jsonify({'success': False, 'error': f'Directory does not exist: {base_path}'}), 400
+        if profile_requested(data.get('profile')) and not admin_authorized():
+            return admin_denied()
         
-        # Start discovery in a separate thread
-        def discovery_thread():
-            global discovered_media_folders, scan_status
-            try:
-                scan_status['is_scanning'] = True
-                scan_status['message'] = 'Discovering media folders...'
-                scan_status['progress'] = 0
-                
-                # Discover media folders
-                media_folders = file_parser.scan_plex_directory(base_path)
-                discovered_media_folders = media_folders
-                
-                scan_status['is_scanning'] = False
-                scan_status['progress'] = 100
-                scan_status['message'] = f'Discovery complete. Found {len(media_folders)} media folders.'
-                
-            except Exception as e:
-                logger.error(f"Error during media folder discovery: {e}")
-                scan_status['is_scanning'] = False
-                scan_status['message'] = f'Discovery error: {str(e)}'
-        
-        Thread(target=discovery_thread, daemon=True).start()
-        
-        return jsonify({'success': True, 'message': 'Media folder discovery started'})
+        params = {'base_path': base_path}
+        active = job_store.find_active('discovery', params)
+        if active is not None:
+            return jsonify({'success': True, 'job_id': active['job_id'], 'message': 'Media folder discovery already running'})
+        
+        body = lambda job: run_discovery(job, base_path)
+        profiler = start_profile(data.get('profile'), 'discovery')
+        if profiler is not None:
+            job = jobs.submit('discovery', lambda job: run_profiled(job, profiler, body), params)
+        else:
+            job = jobs.submit('discovery', body, params)
+        
+        return jsonify({'success': True, 'job_id': job.id, 'message': 'Media folder discovery started'})
     except Exception as e:
         logger.error(f"Error starting media folder discovery: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/media-folders', methods=['GET'])
 def get_media_folders():
-    """Get discovered media folders."""
+    """Get discovered media folders (from ?job_id= or the latest discovery)."""
     try:
+        job_id = request.args.get('job_id')
+        job = job_store.get_job(job_id) if job_id else job_store.latest_job('discovery', COMPLETED)
+        if job_id and (job is None or job['kind'] != 'discovery'):
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        
         folders_data = []
-        for folder in discovered_media_folders:
-            folder_data = {
-                'path': folder.folder_path,
-                'name': folder.folder_name,
-                'media_file_count': folder.media_file_count,
-                'total_file_count': folder.total_file_count,
-                'subdirectory_count': folder.subdirectory_count,
-                'detected_type': folder.detected_type,
-                'confidence_score': folder.confidence_score,
-                'sample_files': folder.sample_files[:5]  # Limit to 5 samples
-            }
-            folders_data.append(folder_data)
+        for folder in (job_store.load_result(job['job_id']).get('media_folders', []) if job else []):
+            folder['sample_files'] = folder['sample_files'][:5]  # Limit to 5 samples
+            folders_data.append(folder)
         
         return jsonify({
             'success': True,
@@ -191,12 +707,15 @@ def scan_files():
         scan_path = data.get('scan_path', '')
         scan_all_folders = data.get('scan_all_folders', False)
         
+        discovery = job_store.latest_job('discovery', COMPLETED)
+        discovered_media_folders = job_store.load_result(discovery['job_id']).get('media_folders', []) if discovery else []
+        
         # If scan_all_folders is True, scan all discovered media folders
         if scan_all_folders and discovered_media_folders:
             scan_paths = []
             for folder in discovered_media_folders:
-                if folder.detected_type == media_type or folder.detected_type == 'mixed':
-                    scan_paths.append(folder.folder_path)
+                if folder['detected_type'] == media_type or folder['detected_type'] == 'mixed':
+                    scan_paths.append(folder['path'])
             
             if not scan_paths:
                 return jsonify({'success': False, 'error': f'No {media_type} folders found'}), 400
@@ -213,339 +732,539 @@ def scan_files():
             
             scan_paths = [scan_path]
         
-        # Start scanning in a separate thread
-        def scan_thread():
-            global current_scan_results, scan_status, current_rename_operations
-            try:
-                scan_status['is_scanning'] = True
-                scan_status['message'] = 'Scanning files...'
-                scan_status['progress'] = 0
-                
-                # Scan for media files across all paths
-                all_media_files = []
-                for i, path in enumerate(scan_paths):
-                    scan_status['message'] = f'Scanning {os.path.basename(path)}...'
-                    scan_status['progress'] = int((i / len(scan_paths)) * 40)
-                    
-                    media_files = file_parser.scan_directory(path, media_type)
-                    all_media_files.extend(media_files)
-                
-                current_scan_results = all_media_files
-                
-                scan_status['progress'] = 50
-                scan_status['message'] = 'Generating rename operations...'
-                
-                # Generate rename operations
-                operations = []
-                metadata_issues = []  # Track metadata issues
-                
-                for i, media_file in enumerate(all_media_files):
-                    try:
-                        if media_type == 'movies':
-                            metadata = media_renamer.get_movie_metadata(media_file)
-                            
-                            # Check metadata status
-                            if metadata and metadata.get('metadata_status') != 'found':
-                                metadata_issues.append({
-                                    'file': media_file.filename,
-                                    'issue': metadata.get('error_message', 'Unknown metadata issue'),
-                                    'status': metadata.get('metadata_status', 'unknown')
-                                })
-                            
-                            new_name = media_renamer.generate_movie_name(media_file, metadata)
-                            target_dir = os.path.dirname(media_file.file_path)
-                            if config.get_boolean('MOVIES', 'create_movie_folders', True):
-                                movie_folder = os.path.join(os.path.dirname(target_dir), new_name)
-                                target_path = os.path.join(movie_folder, f"{new_name}{media_file.extension}")
-                            else:
-                                target_path = os.path.join(target_dir, f"{new_name}{media_file.extension}")
-                        else:
-                            show_metadata, episode_metadata = media_renamer.get_tv_show_metadata(media_file)
-                            
-                            # Check metadata status
-                            if show_metadata and show_metadata.get('metadata_status') != 'found':
-                                metadata_issues.append({
-                                    'file': media_file.filename,
-                                    'issue': show_metadata.get('error_message', 'Unknown show metadata issue'),
-                                    'status': show_metadata.get('metadata_status', 'unknown'),
-                                    'type': 'show'
-                                })
-                            
-                            if episode_metadata and episode_metadata.get('metadata_status') != 'found':
-                                metadata_issues.append({
-                                    'file': media_file.filename,
-                                    'issue': episode_metadata.get('error_message', 'Unknown episode metadata issue'),
-                                    'status': episode_metadata.get('metadata_status', 'unknown'),
-                                    'type': 'episode'
-                                })
-                            
-                            new_name = media_renamer.generate_tv_episode_name(
-                                media_file, show_metadata, episode_metadata
-                            )
-                            
-                            # Generate folder structure
-                            if show_metadata and show_metadata.get('metadata_status') == 'found':
-                                show_folder = media_renamer.generate_tv_show_folder_name(show_metadata, media_file)
-                            else:
-                                show_folder = media_file.title
-                            
-                            season_folder = f"Season {media_file.season:02d}" if media_file.season else "Season 01"
-                            target_dir = os.path.join(config.tv_shows_path, show_folder, season_folder)
-                            target_path = os.path.join(target_dir, f"{new_name}{media_file.extension}")
-                        
-                        operation = RenameOperation(media_file.file_path, target_path)
-                        operation.metadata = {
-                            'movie_metadata': metadata if media_type == 'movies' else None,
-                            'show_metadata': show_metadata if media_type == 'tv_shows' else None,
-                            'episode_metadata': episode_metadata if media_type == 'tv_shows' else None,
-                            'media_info': {
-                                'title': media_file.title,
-                                'year': media_file.year,
-                                'season': media_file.season,
-                                'episode': media_file.episode,
-                                'extension': media_file.extension
-                            }
-                        }
-                        operations.append(operation)
-                        
-                        # Update progress
-                        progress = 50 + (i + 1) / len(all_media_files) * 50
-                        scan_status['progress'] = int(progress)
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing {media_file.file_path}: {e}")
-                        metadata_issues.append({
-                            'file': media_file.filename,
-                            'issue': f'Processing error: {str(e)}',
-                            'status': 'error'
-                        })
-                
-                current_rename_operations = operations
-                scan_status['is_scanning'] = False
-                scan_status['progress'] = 100
-                
-                # Create summary message
-                message_parts = [f'Scan complete. Found {len(all_media_files)} files, {len(operations)} operations ready.']
-                if metadata_issues:
-                    message_parts.append(f'{len(metadata_issues)} metadata issues detected.')
-                
-                scan_status['message'] = ' '.join(message_parts)
-                scan_status['metadata_issues'] = metadata_issues
-                
-            except Exception as e:
-                logger.error(f"Error during scan: {e}")
-                scan_status['is_scanning'] = False
-                scan_status['message'] = f'Scan error: {str(e)}'
-        
-        Thread(target=scan_thread, daemon=True).start()
-        
-        return jsonify({'success': True, 'message': 'Scan started'})
+        if profile_requested(data.get('profile')) and not admin_authorized():
+            return admin_denied()
+        
+        # The same scan already in progress is joined rather than started twice
+        params = {'media_type': media_type, 'scan_paths': scan_paths}
+        active = job_store.find_active('scan', params)
+        if active is not None:
+            return jsonify({'success': True, 'job_id': active['job_id'], 'message': 'Scan already running'})
+        
+        # A profiled scan also profiles every pipeline stage thread
+        profiler = start_profile(data.get('profile'), 'scan')
+        body = lambda job: run_scan(job, media_type, scan_paths, profiler)
+        if profiler is not None:
+            job = jobs.submit('scan', lambda job: run_profiled(job, profiler, body), params)
+        else:
+            job = jobs.submit('scan', body, params)
+        
+        return jsonify({'success': True, 'job_id': job.id, 'message': 'Scan started'})
     except Exception as e:
         logger.error(f"Error starting scan: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/scan/status', methods=['GET'])
 def get_scan_status():
-    """Get current scan status."""
-    return jsonify({
-        'success': True,
-        'status': scan_status,
-        'files_count': len(current_scan_results),
-        'operations_count': len(current_rename_operations)
-    })
+    """Get the status of a job (?job_id=) or of the most recent one."""
+    job_id = request.args.get('job_id')
+    if job_id:
+        job = job_store.get_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+    else:
+        job = job_store.latest_job()
+    
+    snapshot = job_snapshot(job)
+    snapshot['success'] = True
+    return jsonify(snapshot)
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List retained jobs, newest first (optionally ?kind=scan|discovery)."""
+    kind = request.args.get('kind')
+    return jsonify({'success': True, 'jobs': [job_snapshot(job) for job in job_store.list_jobs(kind)]})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get one job's status."""
+    job = job_store.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    snapshot = job_snapshot(job)
+    snapshot['success'] = True
+    return jsonify(snapshot)
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Ask a queued or running job to stop (whichever worker runs it)."""
+    # Jobs running in this worker stop right away; others see the flag on their next update
+    jobs.cancel(job_id)
+    if not job_store.request_cancel(job_id):
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    snapshot = job_snapshot(job_store.get_job(job_id))
+    snapshot['success'] = True
+    return jsonify(snapshot)
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Stream status, progress and newly planned results as Server-Sent Events."""
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_id = None
+    def generate():
+        yield 'retry: 3000\n\n'
+        if last_id is None:
+            # New clients start from a snapshot instead of the event history
+            yield format_sse('status', job_snapshot(job_store.latest_job()), event_bus.last_id)
+        for event in event_bus.subscribe(last_id, keepalive=15, max_duration=EVENT_STREAM_SECONDS):
+            yield event.to_sse() if event is not None else ': keep-alive\n\n'
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/api/scan/results', methods=['GET'])
 def get_scan_results():
-    """Get scan results."""
+    """
+    Get one page of scan results.
+    
+    Query parameters: job_id (default: latest completed scan), page,
+    per_page, metadata_status, media_type and status (comma-separated),
+    q (text search), sort and order.
+    
+    With since=<version> (the version of an earlier page or delta), only
+    the rows added, changed or removed since then are returned, for the
+    same filters.
+    """
     try:
-        results = []
-        for i, operation in enumerate(current_rename_operations):
-            media_info = operation.metadata.get('media_info', {})
-            
-            # Determine media type
-            media_type = 'unknown'
-            if operation.metadata.get('movie_metadata'):
-                media_type = 'movie'
-            elif operation.metadata.get('show_metadata'):
-                media_type = 'tv'
-            
-            # Extract metadata status information
-            metadata_status = 'unknown'
-            error_message = ''
-            
-            if operation.metadata.get('movie_metadata'):
-                movie_meta = operation.metadata['movie_metadata']
-                metadata_status = movie_meta.get('metadata_status', 'unknown')
-                error_message = movie_meta.get('error_message', '')
-            elif operation.metadata.get('show_metadata'):
-                show_meta = operation.metadata['show_metadata']
-                episode_meta = operation.metadata.get('episode_metadata', {})
-                
-                show_status = show_meta.get('metadata_status', 'unknown')
-                episode_status = episode_meta.get('metadata_status', 'unknown')
-                
-                if show_status == 'found' and episode_status == 'found':
-                    metadata_status = 'found'
-                elif show_status == 'found' and episode_status != 'found':
-                    metadata_status = 'partial'
-                    error_message = episode_meta.get('error_message', 'Episode metadata not found')
-                elif show_status != 'found':
-                    metadata_status = show_status
-                    error_message = show_meta.get('error_message', '')
-                else:
-                    # Both have issues, prioritize show metadata error
-                    metadata_status = show_status
-                    error_message = show_meta.get('error_message', '')
-            
-            result = {
-                'id': i,
-                'source_path': operation.source_path,
-                'target_path': operation.target_path,
-                'filename': os.path.basename(operation.source_path),
-                'new_filename': os.path.basename(operation.target_path),
-                'title': media_info.get('title', ''),
-                'year': media_info.get('year', ''),
-                'season': media_info.get('season', ''),
-                'episode': media_info.get('episode', ''),
-                'media_type': media_type,
-                'status': 'Ready',
-                'metadata_status': metadata_status,
-                'error_message': error_message,
-                'metadata': operation.metadata
-            }
-            results.append(result)
+        def csv_arg(name):
+            value = request.args.get(name, '')
+            return [part for part in value.split(',') if part] or None
         
-        return jsonify({
-            'success': True, 
-            'results': results,
-            'metadata_issues': scan_status.get('metadata_issues', [])
+        job_id = request.args.get('job_id')
+        job = find_scan_job(job_id)
+        if job_id and job is None:
+            return jsonify({'success': False, 'error': 'Scan not found'}), 404
+        
+        since = request.args.get('since', type=int)
+        if since is not None:
+            if job is None:
+                return jsonify({'success': False, 'error': 'No completed scan'}), 404
+            delta = job_store.changes(
+                job['job_id'], since,
+                metadata_status=csv_arg('metadata_status'),
+                media_type=csv_arg('media_type'),
+                status=csv_arg('status'),
+                text=request.args.get('q', '')
+            )
+            delta.update({'success': True, 'job_id': job['job_id']})
+            return jsonify(delta)
+        
+        query = dict(
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', 100, type=int),
+            metadata_status=csv_arg('metadata_status'),
+            media_type=csv_arg('media_type'),
+            status=csv_arg('status'),
+            text=request.args.get('q', ''),
+            sort=request.args.get('sort', 'id'),
+            order=request.args.get('order', 'asc')
+        )
+        if job is None:
+            page = {'results': [], 'total': 0, 'filtered': 0, 'page': 1,
+                    'per_page': query['per_page'], 'pages': 1, 'version': 0}
+        else:
+            page = job_store.query_results(job['job_id'], **query)
+        page.update({
+            'success': True,
+            'facets': job_store.facets(job['job_id']) if job else {},
+            'job_id': job['job_id'] if job else None,
+            'metadata_issue_count': job.get('metadata_issue_count', 0) if job else 0
         })
+        return jsonify(page)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error getting scan results: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/scan/results/<int:result_id>', methods=['GET'])
+def get_scan_result(result_id):
+    """Get one scan result with its full metadata."""
+    try:
+        job = find_scan_job(request.args.get('job_id'))
+        if job is None:
+            return jsonify({'success': False, 'error': 'Result not found'}), 404
+        return jsonify({'success': True, 'result': job_store.result_detail(job['job_id'], result_id)})
+    except IndexError:
+        return jsonify({'success': False, 'error': 'Result not found'}), 404
+    except Exception as e:
+        logger.error(f"Error getting scan result {result_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/scan/issues', methods=['GET'])
+def get_scan_issues():
+    """Get the metadata issues found by a scan (?job_id=, default the latest)."""
+    job = find_scan_job(request.args.get('job_id'))
+    issues = job_store.load_result(job['job_id']).get('metadata_issues', []) if job else []
+    return jsonify({'success': True, 'metadata_issues': issues})
+
 @app.route('/api/rename', methods=['POST'])
 def apply_rename():
-    """Apply rename operations."""
+    """
+    Apply rename operations and wait for the results.
+    
+    Runs the same job as /api/apply (selecting operations by index only)
+    and returns its results once it has finished.
+    """
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
         dry_run = data.get('dry_run', config.dry_run_mode)
-        selected_operations = data.get('operations', [])
+        operation_type = data.get('operation_type')
+        indices = data.get('operations') or None
         
-        if not selected_operations:
-            # Apply all operations if none specified
-            operations_to_apply = current_rename_operations
-        else:
-            # Apply only selected operations
-            operations_to_apply = [current_rename_operations[i] for i in selected_operations 
-                                 if i < len(current_rename_operations)]
+        if operation_type is not None and operation_type not in OPERATION_TYPES:
+            return jsonify({'success': False, 'error': f'Unknown operation type: {operation_type}'}), 400
+        if not all(isinstance(i, int) for i in indices or []):
+            return jsonify({'success': False, 'error': 'operations must be a list of result ids'}), 400
         
-        results = []
+        scan_id = data.get('job_id')
+        scan = find_scan_job(scan_id)
+        if scan is None:
+            return jsonify({'success': False, 'error': 'Scan not found' if scan_id else 'No completed scan'}), 404
+        if scan['state'] != COMPLETED:
+            return jsonify({'success': False, 'error': 'Scan has not finished'}), 409
+        scan_id = scan['job_id']
         
-        for operation in operations_to_apply:
-            try:
-                if dry_run:
-                    # Simulate the operation
-                    operation.success = True
-                    operation.error_message = None
-                    result = {
-                        'source_path': operation.source_path,
-                        'target_path': operation.target_path,
-                        'success': True,
-                        'message': 'Dry run - would rename file'
-                    }
-                else:
-                    # Actually perform the operation
-                    success, error = media_renamer.apply_rename_operation(operation)
-                    operation.success = success
-                    operation.error_message = error
-                    
-                    result = {
-                        'source_path': operation.source_path,
-                        'target_path': operation.target_path,
-                        'success': success,
-                        'message': 'Renamed successfully' if success else f'Error: {error}'
-                    }
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Error applying operation {operation.source_path}: {e}")
-                result = {
-                    'source_path': operation.source_path,
-                    'target_path': operation.target_path,
-                    'success': False,
-                    'message': f'Error: {str(e)}'
-                }
-                results.append(result)
-        
-        successful_operations = sum(1 for r in results if r['success'])
+        running = running_apply(scan_id)
+        if running is not None:
+            return jsonify({'success': False, 'error': 'An apply of this scan is already running',
+                            'job_id': running['job_id']}), 409
+        
+        selected = job_store.select_indices(scan_id, indices)
+        job = submit_apply(scan_id, selected, dry_run, operation_type)
+        try:
+            job.future.result()
+        except CancelledError:
+            # Cancelled through /api/jobs before a pool thread picked it up
+            return jsonify({'success': False, 'error': 'Apply was cancelled', 'job_id': job.id}), 409
+        if job.error:
+            return jsonify({'success': False, 'error': job.error, 'job_id': job.id}), 500
         
+        results = sorted(job_store.apply_results(job.id, limit=-1), key=lambda result: result['id'])
         return jsonify({
             'success': True,
+            'job_id': job.id,
             'results': results,
-            'summary': {
-                'total': len(results),
-                'successful': successful_operations,
-                'failed': len(results) - successful_operations,
-                'dry_run': dry_run
-            }
+            'summary': job.details['summary']
         })
         
     except Exception as e:
         logger.error(f"Error applying rename operations: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/apply', methods=['POST'])
+def start_apply():
+    """
+    Apply a scan's operations in a background job.
+    
+    The body names the scan (job_id, default the latest completed scan) and
+    selects operations by index (operations) and/or by filter (selector:
+    metadata_status, media_type, status as lists, q as text); with neither,
+    every operation is selected. Ids listed in exclude are left out (e.g.
+    rows unticked after "select all"). Results are read from
+    /api/apply/<job_id>/results.
+    """
+    try:
+        data = request.get_json() or {}
+        dry_run = data.get('dry_run', config.dry_run_mode)
+        operation_type = data.get('operation_type')
+        indices = data.get('operations') or None
+        selector = data.get('selector') or {}
+        exclude = data.get('exclude') or []
+        
+        if operation_type is not None and operation_type not in OPERATION_TYPES:
+            return jsonify({'success': False, 'error': f'Unknown operation type: {operation_type}'}), 400
+        if not all(isinstance(i, int) for i in (indices or []) + exclude):
+            return jsonify({'success': False, 'error': 'operations and exclude must be lists of result ids'}), 400
+        
+        scan_id = data.get('job_id')
+        scan = find_scan_job(scan_id)
+        if scan is None:
+            return jsonify({'success': False, 'error': 'Scan not found' if scan_id else 'No completed scan'}), 404
+        if scan['state'] != COMPLETED:
+            return jsonify({'success': False, 'error': 'Scan has not finished'}), 409
+        scan_id = scan['job_id']
+        
+        running = running_apply(scan_id)
+        if running is not None:
+            return jsonify({'success': False, 'error': 'An apply of this scan is already running',
+                            'job_id': running['job_id']}), 409
+        
+        def selector_list(name):
+            value = selector.get(name)
+            return [value] if isinstance(value, str) and value else value or None
+        
+        selected = job_store.select_indices(
+            scan_id, indices,
+            metadata_status=selector_list('metadata_status'),
+            media_type=selector_list('media_type'),
+            status=selector_list('status'),
+            text=selector.get('q') or ''
+        )
+        if exclude:
+            excluded = set(exclude)
+            selected = [i for i in selected if i not in excluded]
+        if not selected:
+            return jsonify({'success': False, 'error': 'No operations match the selection'}), 400
+        
+        job = submit_apply(scan_id, selected, dry_run, operation_type, selector)
+        return jsonify({'success': True, 'job_id': job.id, 'total': len(selected)}), 202
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error starting apply: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/apply/<job_id>/results', methods=['GET'])
+def stream_apply_results(job_id):
+    """
+    Stream an apply job's per-operation results as NDJSON.
+    
+    Each line is {"type": "result", ...} for one operation, {"type":
+    "progress", "status": ...} while waiting, and finally {"type":
+    "summary", "status": ...} once the job has finished. ?after=<seq>
+    resumes after the last result already received.
+    """
+    job = job_store.get_job(job_id)
+    if job is None or job['kind'] != 'apply':
+        return jsonify({'success': False, 'error': 'Apply job not found'}), 404
+    after = request.args.get('after', 0, type=int)
+    
+    def generate():
+        cursor = after
+        last_line = time.monotonic()
+        while True:
+            results = job_store.apply_results(job_id, cursor)
+            for result in results:
+                cursor = result['seq']
+                yield json.dumps(dict(result, type='result')) + '\n'
+            if results:
+                last_line = time.monotonic()
+                continue
+            
+            status = job_store.get_job(job_id)
+            if status is None or not status['is_running']:
+                # Results are stored before the job is marked finished; drain what is left
+                for result in job_store.apply_results(job_id, cursor, limit=-1):
+                    yield json.dumps(dict(result, type='result')) + '\n'
+                yield json.dumps({'type': 'summary', 'status': status}) + '\n'
+                return
+            if time.monotonic() - last_line >= 5:
+                # Keeps proxies from closing an idle stream during long copies
+                last_line = time.monotonic()
+                yield json.dumps({'type': 'progress', 'status': status}) + '\n'
+            time.sleep(0.25)
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/journal', methods=['GET'])
+def list_journals():
+    """List apply journals, newest first."""
+    try:
+        return jsonify({'success': True, 'journals': media_renamer.journals.list()})
+    except Exception as e:
+        logger.error(f"Error listing journals: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def start_journal_action(journal_id, action):
+    """Check a journal can be resumed or undone and start a job doing it."""
+    try:
+        summary = media_renamer.journals.open(journal_id).summary()
+    except FileNotFoundError:
+        return jsonify({'success': False, 'error': 'Journal not found'}), 404
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if summary['state'] == 'running':
+        return jsonify({'success': False, 'error': f'Journal {journal_id} is in use'}), 409
+    if action == 'resume' and summary['state'] == 'undone':
+        return jsonify({'success': False, 'error': f'Journal {journal_id} has been undone'}), 400
+    
+    job = jobs.submit(action, lambda job: run_journal_action(job, journal_id, action),
+                      {'journal_id': journal_id, 'scan_job_id': summary['info'].get('scan_job_id')})
+    return jsonify({'success': True, 'job_id': job.id}), 202
+
+@app.route('/api/journal/<journal_id>/resume', methods=['POST'])
+def resume_journal(journal_id):
+    """Finish an interrupted apply from its journal in a background job."""
+    try:
+        return start_journal_action(journal_id, 'resume')
+    except Exception as e:
+        logger.error(f"Error resuming journal {journal_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/journal/<journal_id>/undo', methods=['POST'])
+def undo_journal(journal_id):
+    """Roll back an apply by replaying its journal in reverse, in a background job."""
+    try:
+        return start_journal_action(journal_id, 'undo')
+    except Exception as e:
+        logger.error(f"Error undoing journal {journal_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/browse', methods=['POST'])
 def browse_directory():
-    """Browse directory contents."""
+    """
+    Browse directory contents, one page at a time.
+    
+    Entries come from a cached os.scandir listing (directories first, by
+    name), so no per-entry stat is needed unless include_size is set.
+    Request fields: path, cursor (next_cursor of the previous page), limit,
+    q (name filter), include_size, refresh (bypass the listing cache).
+    """
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
         path = data.get('path', '/media/plex')
+        cursor = data.get('cursor')
+        name_filter = (data.get('q') or '').strip().casefold()
+        include_size = bool(data.get('include_size', False))
+        try:
+            limit = min(max(int(data.get('limit', BROWSE_PAGE_SIZE)), 1), BROWSE_PAGE_SIZE)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'limit must be a number'}), 400
         
-        if not os.path.exists(path):
+        try:
+            listing = listing_cache.listing(path, refresh=bool(data.get('refresh', False)))
+        except FileNotFoundError:
             return jsonify({'success': False, 'error': 'Directory does not exist'}), 400
-        
-        if not os.path.isdir(path):
+        except NotADirectoryError:
             return jsonify({'success': False, 'error': 'Path is not a directory'}), 400
+        except PermissionError:
+            return jsonify({'success': False, 'error': 'Permission denied'}), 403
+        
+        # The cursor is the sort key of the last entry sent, so pages stay
+        # consistent even if the listing is re-read between requests
+        start = 0
+        if cursor:
+            if not isinstance(cursor, str):
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+            try:
+                kind, name = cursor.split(':', 1)
+                start = bisect.bisect_right(listing.keys, (0 if kind == 'd' else 1, name.casefold(), name))
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        
+        total = len(listing.entries)
+        entries = listing.entries[start:]
+        if name_filter:
+            total = sum(1 for entry in listing.entries if name_filter in entry.name.casefold())
+            entries = [entry for entry in entries if name_filter in entry.name.casefold()]
+        page = entries[:limit]
         
         directories = []
         files = []
+        for entry in page:
+            if entry.is_dir:
+                directories.append({'name': entry.name, 'path': entry.path, 'type': 'directory'})
+            else:
+                item = {'name': entry.name, 'path': entry.path, 'type': 'file'}
+                if include_size:
+                    item['size'] = entry.stat_size()
+                files.append(item)
         
-        try:
-            for item in os.listdir(path):
-                item_path = os.path.join(path, item)
-                if os.path.isdir(item_path):
-                    directories.append({
-                        'name': item,
-                        'path': item_path,
-                        'type': 'directory'
-                    })
-                elif os.path.isfile(item_path):
-                    files.append({
-                        'name': item,
-                        'path': item_path,
-                        'type': 'file',
-                        'size': os.path.getsize(item_path)
-                    })
-        except PermissionError:
-            return jsonify({'success': False, 'error': 'Permission denied'}), 403
-        
-        directories.sort(key=lambda x: x['name'].lower())
-        files.sort(key=lambda x: x['name'].lower())
+        next_cursor = None
+        if len(entries) > limit:
+            last = page[-1]
+            next_cursor = f"{'d' if last.is_dir else 'f'}:{last.name}"
         
         return jsonify({
             'success': True,
             'path': path,
             'parent': os.path.dirname(path) if path != '/' else None,
             'directories': directories,
-            'files': files
+            'files': files,
+            'total': total,
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
         logger.error(f"Error browsing directory: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics, summed over all web workers."""
+    if not METRICS_ENABLED:
+        return jsonify({'success': False, 'error': 'Metrics are disabled'}), 404
+    try:
+        def job_gauges():
+            counts = job_store.unfinished_counts()
+            kinds = sorted({'scan', 'discovery', 'apply'} | {kind for kind, _ in counts})
+            samples = [({'kind': kind, 'state': state}, counts.get((kind, state), 0))
+                       for kind in kinds for state in ('queued', 'running')]
+            return gauge_lines('plex_renamer_jobs', 'Queued and running background jobs', samples)
+        
+        return Response(REGISTRY.render(job_gauges), mimetype='text/plain; version=0.0.4')
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """List saved profiles, newest first."""
+    if not PROFILING_ENABLED:
+        return jsonify({'success': False, 'error': 'Profiling is disabled'}), 404
+    if not admin_authorized():
+        return admin_denied()
+    try:
+        return jsonify({'success': True, 'profiles': profile_store.list_profiles()})
+    except Exception as e:
+        logger.error(f"Error listing profiles: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/admin/profiles/<file_name>', methods=['GET'])
+def download_profile(file_name):
+    """Download one profile file (.pstats, .txt summary or .folded stack samples)."""
+    if not PROFILING_ENABLED:
+        return jsonify({'success': False, 'error': 'Profiling is disabled'}), 404
+    if not admin_authorized():
+        return admin_denied()
+    if not file_name.endswith(PROFILE_SUFFIXES):
+        return jsonify({'success': False, 'error': 'Not a profile file'}), 404
+    return send_from_directory(os.path.abspath(profile_store.directory), file_name,
+                               as_attachment=not file_name.endswith(SUMMARY_SUFFIX))
+
+@app.before_request
+def start_request_profile():
+    """Profile the request handler when ?profile=1 (or ?profile=sample) is given."""
+    if 'profile' not in request.args or not profile_requested(request.args['profile']):
+        return None
+    if request.endpoint in ('list_profiles', 'download_profile'):
+        return None
+    if not admin_authorized():
+        return admin_denied()
+    g.profiler = start_profile(request.args['profile'], f'request-{request.endpoint}')
+    g.profiler.enable()
+    return None
+
+@app.after_request
+def save_request_profile(response):
+    """Save a request profile and name it in the X-Profile response header."""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        name = f"request-{request.endpoint}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        try:
+            response.headers['X-Profile'] = profile_store.save(profiler, name)['name']
+        except OSError as e:
+            logger.warning(f"Could not save request profile: {e}")
+    return response
+
+@app.teardown_request
+def discard_request_profile(error=None):
+    """Stop a request profile that was not saved (the request failed)."""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        profiler.stop()
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -14,13 +14,14 @@ import logging
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.gui.main_window import PlexRenamerApp
+from src.utils.config import Config
 from src.utils.logger import setup_logging
 
 def main():
     """Main entry point for the Plex Media Renamer application."""
     try:
         # Setup logging
-        setup_logging()
+        setup_logging(config=Config())
         logger = logging.getLogger(__name__)
         logger.info("Starting Plex Media Renamer application")
         
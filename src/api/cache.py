@@ -0,0 +1,353 @@
+"""
+Metadata response cache with HTTP validator support.
+
+Successful API responses are stored together with their ``ETag`` and
+``Last-Modified`` validators. Once an entry expires the clients send a
+conditional request and a ``304 Not Modified`` simply extends the entry's
+lifetime instead of refetching the payload. An optional SQLite file makes
+the cache survive restarts and shares it between processes; only the most
+recently used entries are kept in memory, the rest are read back from the
+file when they are looked up again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from src.utils.jobreport import add_count
+from src.utils.logger import get_logger
+from src.utils.metrics import counter
+
+logger = get_logger(__name__)
+
+LOOKUPS = counter('plex_renamer_metadata_cache_lookups_total',
+                  'Metadata cache lookups by result (hit, stale or miss)', ('source', 'result'))
+# Job report counter for each lookup result
+REPORT_COUNTS = {'hit': 'cache_hits', 'stale': 'cache_stale', 'miss': 'cache_misses'}
+# Entries kept in memory by default
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class CacheEntry:
+    """A cached API response and the validators needed to revalidate it."""
+
+    def __init__(self, key: str, source: str, endpoint: str, params: Dict, body: str,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 fetched_at: float = 0.0, expires_at: float = 0.0, hits: int = 0):
+        self.key = key
+        self.source = source
+        self.endpoint = endpoint
+        self.params = params
+        self.body = body  # Raw JSON text; parsed per hit so callers get a private copy
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.hits = hits
+
+    def is_fresh(self) -> bool:
+        """Return True if the entry can be served without revalidation."""
+        return time.time() < self.expires_at
+
+    def has_validators(self) -> bool:
+        """Return True if a conditional request can be sent for this entry."""
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def json(self) -> Dict:
+        """Return a freshly parsed copy of the cached payload."""
+        return json.loads(self.body)
+
+
+class MetadataCache:
+    """Thread-safe response cache keyed by source, endpoint and parameters."""
+
+    # Query parameters that identify the caller rather than the resource
+    IGNORED_PARAMS = {'api_key'}
+
+    def __init__(self, ttl: float = 86400, path: Optional[str] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry is served without revalidation
+            path: Optional SQLite file for persistence; memory only if None
+            max_entries: Entries kept in memory; the least recently used are
+                evicted (they stay in the SQLite file, if any)
+        """
+        self.ttl = ttl
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.last_access = 0.0
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._db = None
+
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str):
+        """Open (and create if needed) the SQLite backing store."""
+        try:
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    source TEXT,
+                    endpoint TEXT,
+                    params TEXT,
+                    body TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL,
+                    expires_at REAL,
+                    hits INTEGER
+                )
+            ''')
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Could not open metadata cache {path}, using memory only: {e}")
+            self._db = None
+
+    def make_key(self, source: str, endpoint: str, params: Optional[Dict]) -> str:
+        """
+        Build a cache key for a request.
+
+        Args:
+            source: API name ("tmdb" or "tvdb")
+            endpoint: API endpoint
+            params: Query parameters
+
+        Returns:
+            Cache key string
+        """
+        items = sorted((k, str(v)) for k, v in (params or {}).items()
+                       if k not in self.IGNORED_PARAMS)
+        query = '&'.join(f"{k}={v}" for k, v in items)
+        return f"{source}:{endpoint.lstrip('/')}?{query}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up an entry, counting the access for hot-entry tracking.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            CacheEntry (fresh or stale) or None
+        """
+        with self._lock:
+            self.last_access = time.time()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(entry)
+            if entry is not None:
+                entry.hits += 1
+        result = 'miss' if entry is None else 'hit' if entry.is_fresh() else 'stale'
+        LOOKUPS.inc(source=key.split(':', 1)[0], result=result)
+        add_count(REPORT_COUNTS[result])
+        return entry
+
+    def _remember(self, entry: CacheEntry):
+        """Keep an entry in memory, evicting the least recently used ones."""
+        self._entries[entry.key] = entry
+        self._entries.move_to_end(entry.key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        """Read a single entry from the backing store."""
+        try:
+            row = self._db.execute(
+                'SELECT key, source, endpoint, params, body, etag, last_modified, '
+                'fetched_at, expires_at, hits FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Metadata cache read failed: {e}")
+            return None
+
+        if row is None:
+            return None
+        return CacheEntry(row[0], row[1], row[2], json.loads(row[3] or '{}'), row[4],
+                          row[5], row[6], row[7], row[8], row[9])
+
+    def _save(self, entry: CacheEntry):
+        """Write an entry through to the backing store."""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (entry.key, entry.source, entry.endpoint, json.dumps(entry.params), entry.body,
+                 entry.etag, entry.last_modified, entry.fetched_at, entry.expires_at, entry.hits)
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Metadata cache write failed: {e}")
+
+    def put(self, key: str, source: str, endpoint: str, params: Optional[Dict], body: str,
+            headers: Dict) -> CacheEntry:
+        """
+        Store a 200 response along with its validators.
+
+        Args:
+            key: Cache key
+            source: API name
+            endpoint: API endpoint
+            params: Query parameters (credentials are stripped)
+            body: Raw JSON response text
+            headers: Response headers
+
+        Returns:
+            The stored CacheEntry
+        """
+        now = time.time()
+        clean_params = {k: v for k, v in (params or {}).items() if k not in self.IGNORED_PARAMS}
+        with self._lock:
+            previous = self._entries.get(key)
+            entry = CacheEntry(
+                key, source, endpoint, clean_params, body,
+                etag=headers.get('ETag'),
+                last_modified=headers.get('Last-Modified'),
+                fetched_at=now,
+                expires_at=now + self.ttl,
+                hits=previous.hits if previous else 0
+            )
+            self._remember(entry)
+            self._save(entry)
+            return entry
+
+    def refresh(self, entry: CacheEntry, headers: Dict):
+        """
+        Extend an entry's lifetime after a 304 Not Modified response.
+
+        Args:
+            entry: Entry that was revalidated
+            headers: Headers of the 304 response (validators may be updated)
+        """
+        now = time.time()
+        with self._lock:
+            entry.etag = headers.get('ETag', entry.etag)
+            entry.last_modified = headers.get('Last-Modified', entry.last_modified)
+            entry.fetched_at = now
+            entry.expires_at = now + self.ttl
+            self._save(entry)
+
+    def hottest(self, limit: int) -> List[CacheEntry]:
+        """
+        Return the most frequently used of the entries held in memory.
+
+        Args:
+            limit: Maximum number of entries
+
+        Returns:
+            Entries sorted by hit count, highest first
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        entries.sort(key=lambda e: e.hits, reverse=True)
+        return entries[:limit]
+
+    def close(self):
+        """Close the backing store."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CacheRefresher:
+    """Background thread that revalidates the hottest entries while idle."""
+
+    def __init__(self, cache: MetadataCache, revalidators: Dict[str, Callable[[CacheEntry], None]],
+                 idle_seconds: float = 30, top_n: int = 50, interval: float = 60):
+        """
+        Initialize the refresher.
+
+        Args:
+            cache: Cache to keep warm
+            revalidators: Per-source callables that revalidate a single entry
+            idle_seconds: Only refresh when the cache has not been used for this long
+            top_n: Number of hot entries considered per pass
+            interval: Seconds between passes
+        """
+        self.cache = cache
+        self.revalidators = revalidators
+        self.idle_seconds = idle_seconds
+        self.top_n = top_n
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the refresher thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="metadata-cache-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Signal the refresher thread to exit."""
+        self._stop.set()
+
+    def _is_idle(self) -> bool:
+        return time.time() - self.cache.last_access >= self.idle_seconds
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self._is_idle():
+                continue
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.warning(f"Metadata cache refresh failed: {e}")
+
+    def refresh_once(self) -> int:
+        """
+        Revalidate hot entries that expire within the next refresh window.
+
+        Stops early as soon as interactive use of the cache resumes.
+
+        Returns:
+            Number of entries revalidated
+        """
+        horizon = time.time() + self.interval + self.idle_seconds
+        refreshed = 0
+        for entry in self.cache.hottest(self.top_n):
+            if self._stop.is_set():
+                break
+            if entry.expires_at > horizon:
+                continue
+            revalidate = self.revalidators.get(entry.source)
+            if revalidate is None:
+                continue
+            # Give way to interactive scans; last_access is bumped by their lookups
+            if refreshed and not self._is_idle():
+                break
+            revalidate(entry)
+            refreshed += 1
+
+        if refreshed:
+            logger.debug(f"Revalidated {refreshed} cached metadata entries")
+        return refreshed
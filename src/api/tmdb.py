@@ -2,9 +2,11 @@
 TMDB (The Movie Database) API integration.
 """
 
-import requests
-import time
 from typing import Dict, List, Optional, Tuple
+from src.api.cache import CacheEntry, MetadataCache
+from src.api.transport import HTTPTransport, RateLimiter
+from src.utils.jobreport import add_count
+from src.utils.tracing import span
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,30 +16,43 @@ class TMDBClient:
     
     BASE_URL = "https://api.themoviedb.org/3"
     
-    def __init__(self, api_key: str, language: str = "en-US"):
+    def __init__(self, api_key: str, language: str = "en-US",
+                 transport: Optional[HTTPTransport] = None,
+                 cache: Optional[MetadataCache] = None,
+                 base_url: Optional[str] = None,
+                 requests_per_second: float = 4):
         """
         Initialize TMDB client.
         
         Args:
             api_key: TMDB API key
             language: Preferred language for results
+            transport: Shared HTTP transport (a default one is created if omitted)
+            cache: Optional response cache used for conditional revalidation
+            base_url: Override for the API root (e.g. a local stand-in server)
+            requests_per_second: Client-side request rate limit
         """
         self.api_key = api_key
         self.language = language
-        self.session = requests.Session()
-        self.last_request_time = 0
-        self.rate_limit_delay = 0.25  # 4 requests per second max
+        self.transport = transport or HTTPTransport("TMDB")
+        self.session = self.transport.session
+        self.cache = cache
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
+        self.rate_limit_delay = 1.0 / requests_per_second if requests_per_second > 0 else 0
+        self.rate_limiter = RateLimiter(self.rate_limit_delay, "TMDB")
     
-    def _wait_for_rate_limit(self):
+    def _wait_for_rate_limit(self) -> float:
         """Ensure we don't exceed rate limits."""
-        time_since_last = time.time() - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
+        return self.rate_limiter.wait()
     
     def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
         """
         Make an API request to TMDB.
         
+        Fresh cached responses are returned without touching the network;
+        expired ones are revalidated with a conditional request.
+        
         Args:
             endpoint: API endpoint to call
             params: Additional parameters
@@ -45,8 +60,6 @@ class TMDBClient:
         Returns:
             JSON response or None if failed
         """
-        self._wait_for_rate_limit()
-        
         if params is None:
             params = {}
         
@@ -55,28 +68,87 @@ class TMDBClient:
             'language': self.language
         })
         
+        with span('tmdb.request', **{'api.endpoint': endpoint}) as request_span:
+            entry = None
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key('tmdb', endpoint, params)
+                entry = self.cache.get(cache_key)
+                if entry is not None and entry.is_fresh():
+                    request_span.set_attribute('cache.result', 'hit')
+                    return entry.json()
+                request_span.set_attribute('cache.result', 'miss' if entry is None else 'stale')
+            
+            return self._fetch(endpoint, params, cache_key, entry)
+    
+    def revalidate(self, entry: CacheEntry) -> Optional[Dict]:
+        """
+        Revalidate a cached response without counting it as a cache access.
+        
+        Args:
+            entry: Cache entry created by this client
+            
+        Returns:
+            JSON response or None if failed
+        """
+        params = dict(entry.params)
+        params['api_key'] = self.api_key
+        return self._fetch(entry.endpoint, params, entry.key, entry)
+    
+    def _fetch(self, endpoint: str, params: Dict, cache_key: Optional[str],
+               entry: Optional[CacheEntry]) -> Optional[Dict]:
+        """
+        Perform the HTTP request, conditionally if a cached entry exists.
+        
+        Throttling (429), transient server errors and connection resets are
+        retried by the transport with backoff, up to its retry budget.
+        
+        Args:
+            endpoint: API endpoint to call
+            params: Complete query parameters
+            cache_key: Key to store the response under, if caching
+            entry: Stale cache entry to revalidate, if any
+            
+        Returns:
+            JSON response; the stale entry's payload if revalidation
+            failed, or None if there is none
+        """
+        self._wait_for_rate_limit()
+        
         url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
+        headers = entry.conditional_headers() if entry is not None else {}
         
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            self.last_request_time = time.time()
+            response = self.transport.request('GET', url, params=params, headers=headers)
             
             if response.status_code == 200:
+                if cache_key is not None:
+                    self.cache.put(cache_key, 'tmdb', endpoint, params, response.text, response.headers)
                 return response.json()
+            elif response.status_code == 304 and entry is not None:
+                self.cache.refresh(entry, response.headers)
+                add_count('cache_revalidated')
+                return entry.json()
             elif response.status_code == 401:
                 logger.error("TMDB API: Invalid API key")
                 return None
             elif response.status_code == 429:
-                logger.warning("TMDB API: Rate limit exceeded, waiting...")
-                time.sleep(5)
-                return self._make_request(endpoint, params)
+                logger.error("TMDB API: Rate limit exceeded, retry budget exhausted")
             else:
                 logger.error(f"TMDB API error {response.status_code}: {response.text}")
-                return None
                 
         except Exception as e:
             logger.error(f"TMDB API request failed: {e}")
+        
+        return self._serve_stale(entry)
+    
+    def _serve_stale(self, entry: Optional[CacheEntry]) -> Optional[Dict]:
+        """Fall back to the expired cache entry, if any, when revalidation failed."""
+        if entry is None:
             return None
+        logger.warning("TMDB API unavailable, serving stale cached %s", entry.endpoint)
+        add_count('cache_stale_served')
+        return entry.json()
     
     def search_movie(self, title: str, year: Optional[int] = None) -> List[Dict]:
         """
@@ -0,0 +1,337 @@
+"""
+Shared HTTP transport for the metadata API clients.
+
+Provides a pooled ``requests`` session with bounded retries, jittered
+exponential backoff that honours ``Retry-After`` and per-request latency
+timing, plus a thread-safe rate limiter shared by concurrent callers.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.jobreport import add_count, current_report, wait_cancelled
+from src.utils.logger import get_logger
+from src.utils.metrics import counter, histogram
+from src.utils.tracing import KIND_CLIENT, current_span, span
+
+logger = get_logger(__name__)
+
+REQUEST_SECONDS = histogram('plex_renamer_api_request_seconds',
+                            'Metadata API request attempts by endpoint and status code',
+                            ('source', 'endpoint', 'status'))
+THROTTLED = counter('plex_renamer_api_throttled_total', 'Metadata API responses with HTTP 429', ('source',))
+RETRIES = counter('plex_renamer_api_retries_total', 'Metadata API request attempts that were retries', ('source',))
+RATE_LIMIT_WAIT = histogram('plex_renamer_rate_limit_wait_seconds',
+                            'Time callers waited for the client-side rate limiter', ('source',),
+                            buckets=(0.0, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+
+# Query parameters left out of request descriptions in job reports
+SECRET_PARAMS = {'api_key', 'apikey', 'token'}
+
+
+def endpoint_label(url: str) -> str:
+    """Reduce a URL to its path with IDs replaced, to keep metric labels bounded."""
+    segments = urlsplit(url).path.split('/')
+    # The first segment may be a numeric API version (TMDB's /3/...), which is kept
+    return '/'.join(
+        '{id}' if i > 1 and segment.isdigit() else segment for i, segment in enumerate(segments)
+    ) or '/'
+
+
+def public_query(params: Optional[Dict] = None) -> str:
+    """Return the non-secret query parameters, URL-encoded."""
+    return urlencode([(key, value) for key, value in (params or {}).items() if key.lower() not in SECRET_PARAMS])
+
+
+def describe_request(url: str, params: Optional[Dict] = None) -> str:
+    """Return a URL's path and its non-secret query parameters, for reports."""
+    query = public_query(params)
+    path = urlsplit(url).path or '/'
+    return f"{path}?{query}" if query else path
+
+
+class RequestCancelled(requests.RequestException):
+    """The job a request belongs to was cancelled while it waited to retry."""
+
+
+class RateLimiter:
+    """Spaces requests at least ``min_interval`` seconds apart across threads."""
+
+    def __init__(self, min_interval: float, name: str = ''):
+        self.min_interval = min_interval
+        self.name = name
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        """
+        Block until the caller may issue its request.
+
+        Each caller reserves the next free slot under the lock and sleeps
+        outside it, so concurrent threads queue up instead of bursting.
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next_allowed - now)
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval
+
+        if delay > 0:
+            time.sleep(delay)
+            add_count('rate_limit_wait_seconds', delay)
+        RATE_LIMIT_WAIT.observe(delay, source=self.name)
+        return delay
+
+
+class TransportStats:
+    """Running request counters for a transport."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, retried: bool = False, throttled: bool = False,
+               error: bool = False):
+        """Record the outcome of a single HTTP attempt."""
+        with self._lock:
+            self.requests += 1
+            self.total_latency += latency
+            if retried:
+                self.retries += 1
+            if throttled:
+                self.throttled += 1
+            if error:
+                self.errors += 1
+
+    def as_dict(self) -> Dict:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'errors': self.errors,
+                'avg_latency': self.total_latency / self.requests if self.requests else 0.0
+            }
+
+
+class HTTPTransport:
+    """Pooled HTTP session with a bounded, backoff-based retry policy."""
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(self, name: str, pool_maxsize: int = 8, max_retries: int = 5,
+                 backoff_factor: float = 0.5, backoff_max: float = 30.0,
+                 timeout: float = 10):
+        """
+        Initialize the transport.
+
+        Args:
+            name: Name used in log messages (e.g. "TMDB")
+            pool_maxsize: Connections kept per host; should match the number
+                of threads issuing requests concurrently
+            max_retries: Maximum number of retries after the first attempt
+            backoff_factor: Base delay in seconds for exponential backoff
+            backoff_max: Upper bound for a single backoff delay
+            timeout: Per-attempt request timeout in seconds
+        """
+        self.name = name
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.stats = TransportStats()
+        self.response_hooks: List[Callable[[str, str, Optional[int], float], None]] = []
+
+        self.session = requests.Session()
+        # Retries are handled here so they can honour Retry-After; the
+        # adapter itself never retries.
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize,
+                              pool_block=True, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_config(cls, config, name: str) -> 'HTTPTransport':
+        """
+        Build a transport sized from the [NETWORK] configuration section.
+
+        Args:
+            config: Configuration object
+            name: Name used in log messages
+
+        Returns:
+            HTTPTransport instance
+        """
+        max_workers = config.get_int('NETWORK', 'max_workers', 4)
+        return cls(
+            name,
+            # One connection per planner worker plus headroom for background work
+            pool_maxsize=max_workers + 2,
+            max_retries=config.get_int('NETWORK', 'max_retries', 5),
+            backoff_factor=config.get_float('NETWORK', 'backoff_factor', 0.5),
+            backoff_max=config.get_float('NETWORK', 'backoff_max', 30.0),
+            timeout=config.get_float('NETWORK', 'request_timeout', 10)
+        )
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt."""
+        ceiling = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _retry_after_delay(self, response: requests.Response) -> Optional[float]:
+        """
+        Parse a Retry-After header into a delay in seconds.
+
+        Args:
+            response: Response that may carry the header
+
+        Returns:
+            Delay in seconds, or None if the header is missing or invalid
+        """
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _notify(self, method: str, url: str, status: Optional[int], latency: float):
+        """Record a completed attempt in the metrics and pass it to the response hooks."""
+        REQUEST_SECONDS.observe(latency, source=self.name, endpoint=endpoint_label(url),
+                                status=status if status is not None else 'error')
+        if status == 429:
+            THROTTLED.inc(source=self.name)
+        for hook in self.response_hooks:
+            try:
+                hook(method, url, status, latency)
+            except Exception as e:
+                logger.debug(f"{self.name} response hook failed: {e}")
+
+    def _report(self, method: str, url: str, params: Optional[Dict], status: Optional[int],
+                attempts: int, began: float):
+        """Record a finished request, with its retries, on its span and in the active job report."""
+        request_span = current_span()
+        request_span.set_attribute('http.response.status_code', status)
+        if attempts > 1:
+            request_span.set_attribute('http.request.resend_count', attempts - 1)
+        report = current_report()
+        if report is None:
+            return
+        elapsed = time.perf_counter() - began
+        report.add('api_requests')
+        report.add('api_seconds', elapsed)
+        if attempts > 1:
+            report.add('api_retries', attempts - 1)
+        report.observe('queries', f"{self.name} {method} {describe_request(url, params)}", elapsed,
+                       status=status if status is not None else 'error', attempts=attempts)
+
+    def _wait_to_retry(self, delay: float, method: str, url: str, params: Optional[Dict],
+                       status: Optional[int], attempt: int, began: float):
+        """Wait before a retry, giving up early if the active job is cancelled."""
+        if wait_cancelled(delay):
+            self._report(method, url, params, status, attempt + 1, began)
+            raise RequestCancelled(f"{self.name} request cancelled while waiting to retry")
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Issue a request, retrying throttled, transient and connection failures.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Extra arguments passed to ``requests.Session.request``
+
+        Returns:
+            The final response; once the retry budget is spent this may still
+            be a 429 or 5xx response for the caller to handle
+
+        Raises:
+            requests.RequestException: If the last attempt failed to connect
+            RequestCancelled: If the active job was cancelled while waiting to retry
+        """
+        parts = urlsplit(url)
+        with span(f'HTTP {method}', KIND_CLIENT, **{
+            'http.request.method': method,
+            'server.address': parts.hostname,
+            'url.path': parts.path,
+            'url.query': public_query(kwargs.get('params')) or None,
+            'api.source': self.name
+        }):
+            return self._request(method, url, **kwargs)
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        began = time.perf_counter()
+
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                latency = time.perf_counter() - start
+                self.stats.record(latency, retried=attempt > 0, error=True)
+                self._notify(method, url, None, latency)
+                if attempt >= self.max_retries:
+                    self._report(method, url, kwargs.get('params'), None, attempt + 1, began)
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"{self.name} API: {e.__class__.__name__}, "
+                               f"retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})")
+                self._wait_to_retry(delay, method, url, kwargs.get('params'), None, attempt, began)
+                attempt += 1
+                RETRIES.inc(source=self.name)
+                continue
+
+            latency = time.perf_counter() - start
+            throttled = response.status_code == 429
+            self.stats.record(latency, retried=attempt > 0, throttled=throttled)
+            self._notify(method, url, response.status_code, latency)
+            logger.debug("%s %s %s -> %s in %.1fms", self.name, method, url, response.status_code, latency * 1000)
+
+            if throttled:
+                add_count('api_throttled')
+            if response.status_code not in self.RETRY_STATUS_CODES or attempt >= self.max_retries:
+                self._report(method, url, kwargs.get('params'), response.status_code, attempt + 1, began)
+                return response
+
+            delay = self._retry_after_delay(response)
+            if delay is None:
+                delay = self._backoff_delay(attempt)
+            elif delay > self.backoff_max:
+                # Not worth holding a worker thread that long; let the caller fall back
+                logger.warning(f"{self.name} API: HTTP {response.status_code} with Retry-After "
+                               f"{delay:.0f}s (over backoff_max {self.backoff_max:g}s), not retrying")
+                self._report(method, url, kwargs.get('params'), response.status_code, attempt + 1, began)
+                return response
+            else:
+                # Spread out callers that were all told to come back at the same time
+                delay = min(self.backoff_max, delay + random.uniform(0, self.backoff_factor))
+            logger.warning(f"{self.name} API: HTTP {response.status_code}, "
+                           f"retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})")
+            response.close()
+            self._wait_to_retry(delay, method, url, kwargs.get('params'), response.status_code, attempt, began)
+            attempt += 1
+            RETRIES.inc(source=self.name)
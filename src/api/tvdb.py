@@ -2,9 +2,12 @@
 TVDB (The Television Database) API integration.
 """
 
-import requests
 import time
 from typing import Dict, List, Optional, Tuple
+from src.api.cache import CacheEntry, MetadataCache
+from src.api.transport import HTTPTransport, RateLimiter
+from src.utils.jobreport import add_count
+from src.utils.tracing import span
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,25 +17,34 @@ class TVDBClient:
     
     BASE_URL = "https://api4.thetvdb.com/v4"
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, transport: Optional[HTTPTransport] = None,
+                 cache: Optional[MetadataCache] = None,
+                 base_url: Optional[str] = None,
+                 requests_per_second: float = 10):
         """
         Initialize TVDB client.
         
         Args:
             api_key: TVDB API key
+            transport: Shared HTTP transport (a default one is created if omitted)
+            cache: Optional response cache used for conditional revalidation
+            base_url: Override for the API root (e.g. a local stand-in server)
+            requests_per_second: Client-side request rate limit
         """
         self.api_key = api_key
-        self.session = requests.Session()
+        self.transport = transport or HTTPTransport("TVDB")
+        self.session = self.transport.session
+        self.cache = cache
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
         self.token = None
         self.token_expires = 0
-        self.last_request_time = 0
-        self.rate_limit_delay = 0.1  # Conservative rate limiting
+        self.rate_limit_delay = 1.0 / requests_per_second if requests_per_second > 0 else 0
+        self.rate_limiter = RateLimiter(self.rate_limit_delay, "TVDB")
     
-    def _wait_for_rate_limit(self):
+    def _wait_for_rate_limit(self) -> float:
         """Ensure we don't exceed rate limits."""
-        time_since_last = time.time() - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
+        return self.rate_limiter.wait()
     
     def _authenticate(self) -> bool:
         """
@@ -42,10 +54,10 @@ class TVDBClient:
             True if authentication successful, False otherwise
         """
         try:
-            response = self.session.post(
+            response = self.transport.request(
+                'POST',
                 f"{self.BASE_URL}/login",
-                json={"apikey": self.api_key},
-                timeout=10
+                json={"apikey": self.api_key}
             )
             
             if response.status_code == 200:
@@ -77,6 +89,9 @@ class TVDBClient:
         """
         Make an API request to TVDB.
         
+        Fresh cached responses are returned without authenticating or
+        touching the network; expired ones are revalidated conditionally.
+        
         Args:
             endpoint: API endpoint to call
             params: Additional parameters
@@ -84,40 +99,96 @@ class TVDBClient:
         Returns:
             JSON response or None if failed
         """
+        with span('tvdb.request', **{'api.endpoint': endpoint}) as request_span:
+            entry = None
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key('tvdb', endpoint, params)
+                entry = self.cache.get(cache_key)
+                if entry is not None and entry.is_fresh():
+                    request_span.set_attribute('cache.result', 'hit')
+                    return entry.json()
+                request_span.set_attribute('cache.result', 'miss' if entry is None else 'stale')
+            
+            return self._fetch(endpoint, params, cache_key, entry)
+    
+    def revalidate(self, entry: CacheEntry) -> Optional[Dict]:
+        """
+        Revalidate a cached response without counting it as a cache access.
+        
+        Args:
+            entry: Cache entry created by this client
+            
+        Returns:
+            JSON response or None if failed
+        """
+        return self._fetch(entry.endpoint, dict(entry.params) or None, entry.key, entry)
+    
+    def _fetch(self, endpoint: str, params: Optional[Dict], cache_key: Optional[str],
+               entry: Optional[CacheEntry]) -> Optional[Dict]:
+        """
+        Perform the HTTP request, conditionally if a cached entry exists.
+        
+        Throttling (429), transient server errors and connection resets are
+        retried by the transport with backoff, up to its retry budget.
+        
+        Args:
+            endpoint: API endpoint to call
+            params: Query parameters
+            cache_key: Key to store the response under, if caching
+            entry: Stale cache entry to revalidate, if any
+            
+        Returns:
+            JSON response; the stale entry's payload if revalidation
+            failed, or None if there is none
+        """
         if not self._ensure_authenticated():
-            return None
+            return self._serve_stale(entry)
         
         self._wait_for_rate_limit()
         
         url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
-        headers = {"Authorization": f"Bearer {self.token}"}
+        conditional = entry.conditional_headers() if entry is not None else {}
+        headers = {"Authorization": f"Bearer {self.token}", **conditional}
         
         try:
-            response = self.session.get(url, headers=headers, params=params, timeout=10)
-            self.last_request_time = time.time()
+            response = self.transport.request('GET', url, headers=headers, params=params)
+            
+            if response.status_code == 401:
+                logger.warning("TVDB token expired, re-authenticating...")
+                self.token = None
+                if not self._ensure_authenticated():
+                    return self._serve_stale(entry)
+                headers = {"Authorization": f"Bearer {self.token}", **conditional}
+                response = self.transport.request('GET', url, headers=headers, params=params)
             
             if response.status_code == 200:
+                if cache_key is not None:
+                    self.cache.put(cache_key, 'tvdb', endpoint, params, response.text, response.headers)
                 return response.json()
+            elif response.status_code == 304 and entry is not None:
+                self.cache.refresh(entry, response.headers)
+                add_count('cache_revalidated')
+                return entry.json()
             elif response.status_code == 401:
-                logger.warning("TVDB token expired, re-authenticating...")
-                self.token = None
-                if self._ensure_authenticated():
-                    headers = {"Authorization": f"Bearer {self.token}"}
-                    response = self.session.get(url, headers=headers, params=params, timeout=10)
-                    if response.status_code == 200:
-                        return response.json()
-                return None
+                logger.error("TVDB API: Authentication failed after token refresh")
             elif response.status_code == 429:
-                logger.warning("TVDB API: Rate limit exceeded, waiting...")
-                time.sleep(5)
-                return self._make_request(endpoint, params)
+                logger.error("TVDB API: Rate limit exceeded, retry budget exhausted")
             else:
                 logger.error(f"TVDB API error {response.status_code}: {response.text}")
-                return None
                 
         except Exception as e:
             logger.error(f"TVDB API request failed: {e}")
+        
+        return self._serve_stale(entry)
+    
+    def _serve_stale(self, entry: Optional[CacheEntry]) -> Optional[Dict]:
+        """Fall back to the expired cache entry, if any, when revalidation failed."""
+        if entry is None:
             return None
+        logger.warning("TVDB API unavailable, serving stale cached %s", entry.endpoint)
+        add_count('cache_stale_served')
+        return entry.json()
     
     def search_series(self, title: str, year: Optional[int] = None) -> List[Dict]:
         """
@@ -0,0 +1,264 @@
+"""
+Kernel-assisted file copy engine for cross-device moves and copies.
+
+Copies try, in order: a reflink clone (FICLONE, instant on btrfs/xfs),
+``os.copy_file_range`` and ``os.sendfile`` (in-kernel, no user-space
+buffers), and finally a buffered user-space copy. Data is written to a
+temporary file next to the target, verified by size and a sampled hash,
+and only then renamed into place; moves unlink the source last.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import time
+from typing import Callable, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl request number for FICLONE (_IOW(0x94, 9, int)) on Linux
+FICLONE = 0x40049409
+
+# errnos meaning "this copy mechanism is not available here", not a real I/O failure
+_UNSUPPORTED = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP,
+                errno.ENOTTY, errno.EBADF, errno.EPERM}
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class CopyVerificationError(OSError):
+    """Raised when a copied file does not match its source."""
+
+
+class CopyEngine:
+    """Copies and moves large files with the cheapest mechanism available."""
+
+    def __init__(self, chunk_size: int = 64 * 1024 * 1024, verify: bool = True,
+                 sample_size: int = 1024 * 1024, use_reflink: bool = True):
+        """
+        Initialize the copy engine.
+
+        Args:
+            chunk_size: Bytes transferred per system call (and per progress update)
+            verify: Compare size and a sampled hash before committing a copy
+            sample_size: Bytes hashed at the start, middle and end of each file
+            use_reflink: Try a copy-on-write clone before copying data
+        """
+        self.chunk_size = chunk_size
+        self.verify = verify
+        self.sample_size = sample_size
+        self.use_reflink = use_reflink and fcntl is not None
+
+    @classmethod
+    def from_config(cls, config) -> 'CopyEngine':
+        """Build a copy engine from the [EXECUTION] configuration section."""
+        return cls(
+            chunk_size=config.get_int('EXECUTION', 'copy_chunk_mb', 64) * 1024 * 1024,
+            verify=config.get_boolean('EXECUTION', 'verify_copies', True),
+            use_reflink=config.get_boolean('EXECUTION', 'use_reflink', True)
+        )
+
+    @staticmethod
+    def _advise(fd: int, advice_name: str):
+        """Pass a page-cache hint for the whole file, if the platform supports it."""
+        advice = getattr(os, advice_name, None)
+        if advice is not None and hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(fd, 0, 0, advice)
+            except OSError:
+                pass
+
+    def _reflink(self, src_fd: int, dst_fd: int) -> bool:
+        if not self.use_reflink:
+            return False
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return True
+        except OSError as e:
+            if e.errno in _UNSUPPORTED:
+                return False
+            raise
+
+    def _kernel_copy(self, copy_call, src_fd: int, dst_fd: int, total: int,
+                     progress: Optional[ProgressCallback], path: str) -> bool:
+        """
+        Run an in-kernel copy loop; return False if the mechanism is unsupported.
+
+        The first call decides support; once data has moved, errors propagate.
+        """
+        copied = 0
+        while copied < total:
+            try:
+                sent = copy_call(src_fd, dst_fd, copied, min(self.chunk_size, total - copied))
+            except OSError as e:
+                if copied == 0 and e.errno in _UNSUPPORTED:
+                    return False
+                raise
+            if sent == 0:
+                break
+            copied += sent
+            # Drop pages already written so a 40 GB copy does not evict the whole cache
+            self._advise(src_fd, 'POSIX_FADV_DONTNEED')
+            if progress:
+                progress(path, copied, total)
+        if copied != total:
+            raise OSError(errno.EIO, f"Short copy: {copied} of {total} bytes", path)
+        return True
+
+    @staticmethod
+    def _copy_file_range(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+        return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+    @staticmethod
+    def _sendfile(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+        return os.sendfile(dst_fd, src_fd, offset, count)
+
+    def _userspace_copy(self, src_fd: int, dst_fd: int, total: int,
+                        progress: Optional[ProgressCallback], path: str):
+        copied = 0
+        buffer_size = min(self.chunk_size, 8 * 1024 * 1024)
+        while True:
+            chunk = os.read(src_fd, buffer_size)
+            if not chunk:
+                break
+            view = memoryview(chunk)
+            while view:
+                written = os.write(dst_fd, view)
+                view = view[written:]
+            copied += len(chunk)
+            if progress and (copied % self.chunk_size < buffer_size or copied == total):
+                progress(path, copied, total)
+
+    def _copy_data(self, src: str, tmp: str, progress: Optional[ProgressCallback]) -> str:
+        """Copy file contents into tmp and return the mechanism used."""
+        with open(src, 'rb') as fsrc, open(tmp, 'wb') as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            total = os.fstat(src_fd).st_size
+            self._advise(src_fd, 'POSIX_FADV_SEQUENTIAL')
+
+            if self._reflink(src_fd, dst_fd):
+                method = 'reflink'
+            elif hasattr(os, 'copy_file_range') and self._kernel_copy(
+                    self._copy_file_range, src_fd, dst_fd, total, progress, src):
+                method = 'copy_file_range'
+            elif hasattr(os, 'sendfile') and self._kernel_copy(
+                    self._sendfile, src_fd, dst_fd, total, progress, src):
+                method = 'sendfile'
+            else:
+                os.lseek(src_fd, 0, os.SEEK_SET)
+                os.lseek(dst_fd, 0, os.SEEK_SET)
+                os.ftruncate(dst_fd, 0)
+                self._userspace_copy(src_fd, dst_fd, total, progress, src)
+                method = 'userspace'
+
+            if progress and method == 'reflink':
+                progress(src, total, total)
+            fdst.flush()
+            os.fsync(dst_fd)
+            self._advise(dst_fd, 'POSIX_FADV_DONTNEED')
+        return method
+
+    def _sample_hash(self, path: str, size: int) -> str:
+        """Hash sample blocks from the start, middle and end of a file."""
+        digest = hashlib.blake2b(digest_size=16)
+        offsets = sorted({0, max(0, size // 2 - self.sample_size // 2), max(0, size - self.sample_size)})
+        with open(path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                digest.update(f.read(self.sample_size))
+        return digest.hexdigest()
+
+    def verify_copy(self, src: str, dst: str):
+        """
+        Check that dst matches src by size and sampled content hash.
+
+        Raises:
+            CopyVerificationError: If the files differ
+        """
+        src_size = os.path.getsize(src)
+        dst_size = os.path.getsize(dst)
+        if src_size != dst_size:
+            raise CopyVerificationError(errno.EIO, f"Size mismatch after copy ({dst_size} != {src_size})", dst)
+        if self._sample_hash(src, src_size) != self._sample_hash(dst, dst_size):
+            raise CopyVerificationError(errno.EIO, "Content mismatch after copy", dst)
+
+    def _commit(self, tmp: str, dst: str):
+        """
+        Move a finished copy into place without replacing a file that appeared at dst.
+
+        A hard link fails atomically if dst exists; filesystems without hard
+        links fall back to a rename after an existence check.
+
+        Raises:
+            FileExistsError: If dst already exists
+        """
+        if hasattr(os, 'link'):
+            try:
+                os.link(tmp, dst)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+            else:
+                os.unlink(tmp)
+                return
+        if os.path.lexists(dst):
+            raise FileExistsError(errno.EEXIST, "Target appeared while copying", dst)
+        os.rename(tmp, dst)
+
+    def copy(self, src: str, dst: str, progress: Optional[ProgressCallback] = None) -> str:
+        """
+        Copy a file, preserving metadata, and commit it atomically at dst.
+
+        Args:
+            src: Source file
+            dst: Target file (must not exist)
+            progress: Optional callback(path, bytes_done, total_bytes)
+
+        Returns:
+            Name of the copy mechanism used
+
+        Raises:
+            FileExistsError: If a file appeared at dst while copying
+        """
+        target_dir = os.path.dirname(dst) or '.'
+        tmp = os.path.join(target_dir, f".{os.path.basename(dst)}.partial")
+        start = time.perf_counter()
+        try:
+            method = self._copy_data(src, tmp, progress)
+            shutil.copystat(src, tmp)
+            if self.verify:
+                self.verify_copy(src, tmp)
+            self._commit(tmp, dst)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+        logger.debug("Copied %s -> %s via %s in %.2fs", src, dst, method, time.perf_counter() - start)
+        return method
+
+    def move(self, src: str, dst: str, progress: Optional[ProgressCallback] = None) -> str:
+        """
+        Move a file across devices: copy, verify, then unlink the source.
+
+        Args:
+            src: Source file
+            dst: Target file (must not exist)
+            progress: Optional callback(path, bytes_done, total_bytes)
+
+        Returns:
+            Name of the copy mechanism used
+        """
+        method = self.copy(src, dst, progress)
+        os.unlink(src)
+        return method
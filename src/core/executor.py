@@ -0,0 +1,287 @@
+"""
+Parallel, device-aware executor for rename operations.
+
+Operations are grouped by the filesystems (``st_dev``) of their source and
+target. Same-device renames are metadata-only, so they are applied in
+sequential batches per device; cross-device moves and copies transfer
+data, so they run in parallel with a concurrency cap per device to avoid
+thrashing any single disk.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.utils.fscache import DirectoryCache
+from src.utils.jobreport import run_in_context
+from src.utils.logger import get_logger
+from src.utils.metrics import counter, histogram
+
+logger = get_logger(__name__)
+
+OPERATIONS = counter('plex_renamer_operations_total', 'Applied operations by type and outcome',
+                     ('operation_type', 'result'))
+BYTES_TRANSFERRED = counter('plex_renamer_bytes_transferred_total',
+                            'File data copied while applying operations', ('operation_type',))
+OPERATION_SECONDS = histogram('plex_renamer_operation_seconds', 'Duration of applied operations',
+                              ('operation_type',), buckets=(0.001, 0.01, 0.1, 0.5, 1, 5, 30, 120, 600))
+
+# Operation types that only touch metadata when source and target share a device
+# (a hardlink across devices falls back to a copy)
+RELOCATING_TYPES = {'rename', 'move', 'hardlink'}
+
+
+def device_of(path: str) -> Optional[int]:
+    """
+    Return the device ID of a path, or of its nearest existing ancestor.
+
+    Args:
+        path: File or directory path (need not exist yet)
+
+    Returns:
+        ``st_dev`` of the path, or None if nothing along it can be stat'ed
+    """
+    current = os.path.abspath(path)
+    while True:
+        try:
+            return os.stat(current).st_dev
+        except FileNotFoundError:
+            parent = os.path.dirname(current)
+            if parent == current:
+                return None
+            current = parent
+        except OSError:
+            return None
+
+
+def same_filesystem(source_path: str, target_path: str) -> bool:
+    """
+    Check whether a file and a (possibly not yet created) target share a device.
+
+    Args:
+        source_path: Existing file
+        target_path: Target path; its nearest existing ancestor is used
+
+    Returns:
+        True if both resolve to the same ``st_dev``
+    """
+    source_dev = device_of(source_path)
+    return source_dev is not None and source_dev == device_of(target_path)
+
+
+class OperationExecutor:
+    """Applies rename operations concurrently, grouped by source/target device."""
+
+    def __init__(self, renamer, max_workers: int = 8, per_device_workers: int = 2,
+                 batch_size: int = 64):
+        """
+        Initialize the executor.
+
+        Args:
+            renamer: MediaRenamer whose execute_operation performs each operation
+            max_workers: Total worker threads
+            per_device_workers: Maximum concurrent tasks touching any one device
+            batch_size: Same-device renames applied per task
+        """
+        self.renamer = renamer
+        self.max_workers = max(1, max_workers)
+        self.per_device_workers = max(1, per_device_workers)
+        self.batch_size = max(1, batch_size)
+        self._device_slots: Dict[Optional[int], threading.Semaphore] = {}
+        self._claimed_targets = set()
+        self._cancel_event: Optional[threading.Event] = None
+        self._cancelled = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, renamer, config) -> 'OperationExecutor':
+        """Build an executor sized from the [EXECUTION] configuration section."""
+        return cls(
+            renamer,
+            max_workers=config.get_int('EXECUTION', 'max_workers', 8),
+            per_device_workers=config.get_int('EXECUTION', 'per_device_workers', 2),
+            batch_size=config.get_int('EXECUTION', 'batch_size', 64)
+        )
+
+    def _slot(self, device: Optional[int]) -> threading.Semaphore:
+        with self._lock:
+            if device not in self._device_slots:
+                self._device_slots[device] = threading.Semaphore(self.per_device_workers)
+            return self._device_slots[device]
+
+    def _claim_target(self, operation) -> bool:
+        """Reserve a target path so two concurrent operations cannot race onto it."""
+        key = os.path.normcase(os.path.abspath(operation.target_path))
+        with self._lock:
+            if key in self._claimed_targets:
+                return False
+            self._claimed_targets.add(key)
+            return True
+
+    def group_operations(self, operations: List) -> Tuple[Dict[int, List], List[Tuple[Tuple, object]]]:
+        """
+        Split operations into same-device batches and cross-device tasks.
+
+        Args:
+            operations: RenameOperation objects
+
+        Returns:
+            Tuple of (same-device operations keyed by device,
+            list of ((source_device, target_device), operation) for the rest)
+        """
+        same_device: Dict[int, List] = {}
+        cross_device = []
+        # Files share their directory's device; stat each directory once
+        devices: Dict[str, Optional[int]] = {}
+
+        def directory_device(path: str) -> Optional[int]:
+            directory = os.path.dirname(os.path.abspath(path))
+            if directory not in devices:
+                devices[directory] = device_of(directory)
+            return devices[directory]
+
+        for operation in operations:
+            source_dev = directory_device(operation.source_path)
+            target_dev = directory_device(operation.target_path)
+            if (source_dev is not None and source_dev == target_dev
+                    and operation.operation_type in RELOCATING_TYPES):
+                same_device.setdefault(source_dev, []).append(operation)
+            elif operation.operation_type == 'symlink' and target_dev is not None:
+                # A symlink never moves data, wherever its source lives
+                same_device.setdefault(target_dev, []).append(operation)
+            else:
+                cross_device.append(((source_dev, target_dev), operation))
+        return same_device, cross_device
+
+    def _run_one(self, operation, dry_run: bool, on_complete: Optional[Callable],
+                 fs_cache: Optional[DirectoryCache] = None):
+        start = time.perf_counter()
+        # Set by the renamer when file data actually had to be copied
+        operation.bytes_transferred = 0
+
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            # Left without an outcome, so a journaled apply can be resumed
+            operation.success = False
+            operation.applied = False
+            operation.error_message = "Cancelled"
+            operation.duration = 0.0
+            with self._lock:
+                self._cancelled += 1
+            if not dry_run:
+                OPERATIONS.inc(operation_type=operation.operation_type, result='cancelled')
+            return
+
+        if not self._claim_target(operation):
+            operation.success = False
+            operation.error_message = "Another operation in this batch targets the same path"
+        else:
+            self.renamer.execute_operation(operation, dry_run, fs_cache)
+
+        operation.duration = time.perf_counter() - start
+        if not operation.success:
+            operation.bytes_transferred = 0
+        if not dry_run:
+            OPERATIONS.inc(operation_type=operation.operation_type,
+                           result='success' if operation.success else 'failed')
+            OPERATION_SECONDS.observe(operation.duration, operation_type=operation.operation_type)
+            if operation.bytes_transferred:
+                BYTES_TRANSFERRED.inc(operation.bytes_transferred, operation_type=operation.operation_type)
+        if on_complete is not None:
+            on_complete(operation)
+
+    def _run_batch(self, device: int, batch: List, dry_run: bool, on_complete: Optional[Callable],
+                   fs_cache: DirectoryCache):
+        with self._slot(device):
+            for operation in batch:
+                self._run_one(operation, dry_run, on_complete, fs_cache)
+
+    def _run_cross_device(self, devices: Tuple, operation, dry_run: bool,
+                          on_complete: Optional[Callable], fs_cache: DirectoryCache):
+        # Acquire in a fixed order so two tasks with swapped devices cannot deadlock
+        slots = [self._slot(d) for d in sorted(set(devices), key=lambda d: (d is None, d or 0))]
+        for slot in slots:
+            slot.acquire()
+        try:
+            self._run_one(operation, dry_run, on_complete, fs_cache)
+        finally:
+            for slot in reversed(slots):
+                slot.release()
+
+    def execute(self, operations: List, dry_run: bool = True,
+                on_complete: Optional[Callable] = None,
+                fs_cache: Optional[DirectoryCache] = None,
+                cancel_event: Optional[threading.Event] = None) -> Dict:
+        """
+        Execute operations and report timing and throughput.
+
+        Target directories are created once, parents first, before any
+        operation runs; existence checks are then answered from one listing
+        per directory.
+
+        Args:
+            operations: RenameOperation objects
+            dry_run: If True, only simulate the operations
+            on_complete: Optional callback invoked with each finished operation
+                (called from worker threads)
+            fs_cache: Optional directory cache already holding listings
+                (e.g. from validation)
+            cancel_event: When set, operations not yet started are skipped
+                (marked failed with "Cancelled", without calling on_complete)
+
+        Returns:
+            Dictionary with success/failed/skipped counts, elapsed seconds,
+            operations and bytes per second, and per-operation timings
+        """
+        start = time.perf_counter()
+        self._claimed_targets = set()
+        self._cancel_event = cancel_event
+        self._cancelled = 0
+
+        if dry_run:
+            # Nothing touches the disk, so there is no point in fanning out
+            for operation in operations:
+                self._run_one(operation, True, on_complete)
+        else:
+            fs_cache = fs_cache or DirectoryCache()
+            fs_cache.ensure_directories(os.path.dirname(op.target_path) for op in operations)
+            same_device, cross_device = self.group_operations(operations)
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='rename') as pool:
+                futures = []
+                for device, device_ops in same_device.items():
+                    for i in range(0, len(device_ops), self.batch_size):
+                        batch = device_ops[i:i + self.batch_size]
+                        futures.append(pool.submit(run_in_context(self._run_batch), device, batch, dry_run,
+                                                   on_complete, fs_cache))
+                for devices, operation in cross_device:
+                    futures.append(pool.submit(run_in_context(self._run_cross_device), devices, operation,
+                                               dry_run, on_complete, fs_cache))
+                for future in futures:
+                    future.result()
+
+        elapsed = time.perf_counter() - start
+        succeeded = sum(1 for op in operations if op.success)
+        moved = sum(getattr(op, 'bytes_transferred', 0) for op in operations)
+        results = {
+            "success": succeeded,
+            "failed": len(operations) - succeeded - self._cancelled,
+            "skipped": 0,
+            "cancelled": self._cancelled,
+            "elapsed": round(elapsed, 3),
+            "operations_per_second": round(len(operations) / elapsed, 1) if elapsed else 0.0,
+            "bytes_transferred": moved,
+            "bytes_per_second": round(moved / elapsed, 1) if elapsed else 0.0,
+            "timings": [
+                {
+                    'source_path': op.source_path,
+                    'target_path': op.target_path,
+                    'success': op.success,
+                    'seconds': round(getattr(op, 'duration', 0.0), 4)
+                }
+                for op in operations
+            ]
+        }
+        logger.info(f"Executed {len(operations)} operations in {elapsed:.2f}s "
+                    f"({results['operations_per_second']} ops/s, {moved} bytes moved)")
+        return results
@@ -4,7 +4,9 @@ File parsing utilities to extract metadata from media filenames.
 
 import re
 import os
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Dict, Iterator, List, Optional, Tuple, Set
+from src.utils.jobreport import add_count
+from src.utils.tracing import span
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -81,8 +83,22 @@ class FileParser:
         '__pycache__', '.vscode', '.idea', 'System Volume Information'
     }
     
-    def __init__(self):
+    def __init__(self, listings=None):
+        """
+        Initialize the parser.
+        
+        Args:
+            listings: Optional ListingCache; directory walks then reuse
+                listings read recently (e.g. while browsing)
+        """
         self.logger = get_logger(__name__)
+        self.listings = listings
+    
+    def walk(self, directory: str):
+        """Walk a directory tree like os.walk, through the listing cache if there is one."""
+        if self.listings is not None:
+            return self.listings.walk(directory)
+        return os.walk(directory)
     
     def is_video_file(self, file_path: str) -> bool:
         """
@@ -131,7 +147,7 @@ class FileParser:
         
         try:
             # Quick scan to get basic stats
-            for root, dirs, files in os.walk(folder_path):
+            for root, dirs, files in self.walk(folder_path):
                 # Limit depth
                 depth = root[len(folder_path):].count(os.sep)
                 if depth >= max_depth:
@@ -223,11 +239,12 @@ class FileParser:
         self.logger.info(f"Scanning Plex directory: {base_path}")
         
         try:
-            # Get all subdirectories
-            for item in os.listdir(base_path):
+            # Get all subdirectories (one directory read, no stat per entry)
+            _, subdirectories, _ = next(iter(self.walk(base_path)), (base_path, [], []))
+            for item in subdirectories:
                 item_path = os.path.join(base_path, item)
                 
-                if not os.path.isdir(item_path) or self.should_ignore_folder(item):
+                if self.should_ignore_folder(item):
                     continue
                 
                 # Analyze each subdirectory
@@ -237,10 +254,9 @@ class FileParser:
                 if folder_info.media_file_count > 0:
                     media_folders.append(folder_info)
                     self.logger.info(
-                        f"Found media folder: {item} "
-                        f"(Type: {folder_info.detected_type}, "
-                        f"Files: {folder_info.media_file_count}, "
-                        f"Confidence: {folder_info.confidence_score:.2f})"
+                        "Found media folder: %s (Type: %s, Files: %d, Confidence: %.2f)",
+                        item, folder_info.detected_type, folder_info.media_file_count,
+                        folder_info.confidence_score
                     )
         
         except Exception as e:
@@ -386,7 +402,7 @@ class FileParser:
         info.quality = self.extract_quality(info.name)
         info.source = self.extract_source(info.name)
         
-        self.logger.debug(f"Parsed movie: {info.title} ({info.year})")
+        self.logger.debug("Parsed movie: %s (%s)", info.title, info.year)
         return info
     
     def parse_tv_file(self, file_path: str) -> MediaFileInfo:
@@ -433,16 +449,60 @@ class FileParser:
         info.quality = self.extract_quality(info.name)
         info.source = self.extract_source(info.name)
         
-        self.logger.debug(f"Parsed TV: {info.title} S{info.season:02d}E{info.episode:02d}")
+        self.logger.debug("Parsed TV: %s S%02dE%02d", info.title, info.season, info.episode)
         return info
     
-    def scan_directory(self, directory: str, media_type: str = 'auto') -> List[MediaFileInfo]:
+    def iter_media_paths(self, directory: str) -> Iterator[str]:
+        """
+        Walk a directory and yield the paths of video files as they are found.
+        
+        Args:
+            directory: Directory to walk
+            
+        Yields:
+            Paths of video files, joined onto the scanned directory
+        """
+        for root, dirs, files in self.walk(directory):
+            add_count('directories')
+            video_files = [file for file in files if self.is_video_file(file)]
+            add_count('files', len(video_files))
+            for file in video_files:
+                yield os.path.join(root, file)
+    
+    def parse_file(self, file_path: str, media_type: str = 'auto') -> MediaFileInfo:
+        """
+        Parse a single media file.
+        
+        Args:
+            file_path: Path to the media file
+            media_type: Type of media ('movie', 'tv', or 'auto')
+            
+        Returns:
+            MediaFileInfo object with parsed information
+        """
+        with span('parse_file', **{'file.path': file_path, 'media.type': media_type}):
+            if media_type == 'movie':
+                return self.parse_movie_file(file_path)
+            elif media_type == 'tv':
+                return self.parse_tv_file(file_path)
+            
+            # Auto-detect based on filename patterns
+            season, episode, _ = self.extract_tv_info(os.path.basename(file_path))
+            if season is not None or episode is not None:
+                return self.parse_tv_file(file_path)
+            return self.parse_movie_file(file_path)
+    
+    def scan_directory(self, directory: str, media_type: str = 'auto',
+                       on_file=None, cancel_event=None) -> List[MediaFileInfo]:
         """
         Scan a directory for media files and parse them.
         
         Args:
             directory: Directory to scan
             media_type: Type of media ('movie', 'tv', or 'auto')
+            on_file: Optional callback invoked with each MediaFileInfo as it is parsed
+            cancel_event: Optional threading.Event; once set, the scan stops
+                and returns the files parsed so far
             
         Returns:
             List of MediaFileInfo objects
@@ -455,30 +515,20 @@ class FileParser:
         
         self.logger.info(f"Scanning directory: {directory}")
         
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                
-                if not self.is_video_file(file_path):
-                    continue
-                
+        with span('scan_directory', **{'file.directory': directory, 'media.type': media_type}) as scan_span:
+            for file_path in self.iter_media_paths(directory):
+                if cancel_event is not None and cancel_event.is_set():
+                    self.logger.info(f"Scan of {directory} cancelled")
+                    break
                 try:
-                    if media_type == 'movie':
-                        info = self.parse_movie_file(file_path)
-                    elif media_type == 'tv':
-                        info = self.parse_tv_file(file_path)
-                    else:  # auto-detect
-                        # Try to detect based on filename patterns
-                        season, episode, _ = self.extract_tv_info(file)
-                        if season is not None or episode is not None:
-                            info = self.parse_tv_file(file_path)
-                        else:
-                            info = self.parse_movie_file(file_path)
-                    
-                    media_files.append(info)
-                    
+                    media_file = self.parse_file(file_path, media_type)
                 except Exception as e:
                     self.logger.error(f"Error parsing file {file_path}: {e}")
+                    continue
+                media_files.append(media_file)
+                if on_file is not None:
+                    on_file(media_file)
+            scan_span.set_attribute('files.count', len(media_files))
         
         self.logger.info(f"Found {len(media_files)} media files")
-        return media_files 
\ No newline at end of file
+        return media_files
\ No newline at end of file
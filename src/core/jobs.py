@@ -0,0 +1,322 @@
+"""
+Background jobs for the web application.
+
+Scans, folder discovery and other long-running work run as jobs on a
+bounded thread pool. Each job has an ID, its own status and results, and a
+cancellation flag, so several scans can run side by side without sharing
+process-wide state. Finished jobs are kept for a while so their results
+can still be browsed and applied.
+
+With a JobStore attached, every status change is written through to the
+shared database, which is what other web workers read; cancellation
+requested through another worker is picked up on the next update. A
+heartbeat thread renews the lease on this process's unfinished jobs and
+marks jobs whose owner stopped renewing theirs as interrupted.
+
+Every job runs with a JobReport active; when it finishes, the report's
+stage timings and costs are added to its status as ``report``.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.jobreport import JobReport, cancellation
+from src.utils.logger import get_logger
+from src.utils.tracing import span
+
+logger = get_logger(__name__)
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+# Missed heartbeats after which another worker treats a job as abandoned
+LEASE_HEARTBEATS = 6
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been asked to stop."""
+
+
+class Job:
+    """A unit of background work with its own status and results."""
+
+    def __init__(self, kind: str, params: Optional[Dict] = None):
+        """
+        Initialize a job.
+
+        Args:
+            kind: Job kind, e.g. 'scan' or 'discovery'
+            params: Parameters the job was started with (reported back to clients)
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params or {}
+        self.state = QUEUED
+        self.progress = 0
+        self.message = 'Queued'
+        self.details: Dict[str, Any] = {}  # Job-specific status such as pipeline stages
+        self.result: Dict[str, Any] = {}  # Job-specific results, not serialized
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.report: Optional[JobReport] = None  # Created when the job starts running
+        self.future = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """
+        Stop the job if cancellation was requested.
+
+        Raises:
+            JobCancelled: If the job has been cancelled
+        """
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def update(self, progress: Optional[float] = None, message: Optional[str] = None, **details):
+        """Update progress, message and job-specific status fields."""
+        if progress is not None:
+            self.progress = progress
+        if message is not None:
+            self.message = message
+        self.details.update(details)
+
+    def to_dict(self) -> Dict:
+        """Return the job's status as a JSON-serializable dictionary."""
+        status = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'is_running': self.state in (QUEUED, RUNNING),
+            'progress': self.progress,
+            'message': self.message,
+            'params': self.params,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        status.update(self.details)
+        return status
+
+
+class JobManager:
+    """Runs jobs on a bounded pool and keeps recent ones for lookup."""
+
+    def __init__(self, max_workers: int = 2, max_retained: int = 20, retention_seconds: float = 3600,
+                 on_update: Optional[Callable[[Job], None]] = None, store=None,
+                 heartbeat_seconds: float = 10):
+        """
+        Initialize the job manager.
+
+        Args:
+            max_workers: Jobs that may run at once; further jobs wait in the queue
+            max_retained: Finished jobs kept per kind
+            retention_seconds: Finished jobs older than this are discarded
+            on_update: Called with the job whenever its state changes
+            store: Optional JobStore that job status is persisted to
+            heartbeat_seconds: How often the lease on unfinished jobs in the
+                store is renewed; jobs are considered abandoned after
+                LEASE_HEARTBEATS missed renewals
+        """
+        self.max_workers = max_workers
+        self.max_retained = max_retained
+        self.retention_seconds = retention_seconds
+        self.on_update = on_update
+        self.store = store
+        self.heartbeat_seconds = heartbeat_seconds
+        self._jobs: Dict[str, Job] = {}  # Insertion order is creation order
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._stop = threading.Event()
+        if store is not None:
+            self._recover_interrupted()
+            threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True).start()
+
+    @classmethod
+    def from_config(cls, config, on_update: Optional[Callable[[Job], None]] = None,
+                    store=None) -> 'JobManager':
+        """Build a job manager from the [JOBS] configuration section."""
+        return cls(
+            max_workers=max(1, config.get_int('JOBS', 'max_concurrent_jobs', 2)),
+            max_retained=max(1, config.get_int('JOBS', 'retained_jobs', 20)),
+            retention_seconds=config.get_float('JOBS', 'retention_minutes', 60) * 60,
+            on_update=on_update,
+            store=store,
+            heartbeat_seconds=max(1.0, config.get_float('JOBS', 'heartbeat_seconds', 10))
+        )
+
+    def _recover_interrupted(self):
+        try:
+            self.store.recover_interrupted(self.heartbeat_seconds * LEASE_HEARTBEATS)
+        except Exception as e:
+            logger.warning(f"Could not recover interrupted jobs: {e}")
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.heartbeat_seconds):
+            with self._lock:
+                unfinished = [job.id for job in self._jobs.values() if not job.finished]
+            try:
+                if unfinished:
+                    self.store.heartbeat(unfinished)
+            except Exception as e:
+                logger.warning(f"Job heartbeat failed: {e}")
+            self._recover_interrupted()
+
+    def notify(self, job: Job):
+        """
+        Report a change to a job's status.
+
+        Persists the status, picks up cancellation requested through the
+        store and calls on_update.
+        """
+        if self.store is not None:
+            try:
+                self.store.save_job(job)
+                if not job.finished and self.store.cancel_requested(job.id):
+                    job.cancel_event.set()
+            except Exception as e:
+                logger.warning(f"Could not persist job {job.id}: {e}")
+        if self.on_update is not None:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                logger.debug(f"Job update callback failed: {e}")
+
+    def submit(self, kind: str, target: Callable[[Job], Any], params: Optional[Dict] = None) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            kind: Job kind
+            target: Called with the Job on a pool thread; may raise JobCancelled
+            params: Parameters to report with the job's status
+
+        Returns:
+            The queued Job
+        """
+        job = Job(kind, params)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        # Recorded as queued before a pool thread can mark it running, and
+        # before pruning, so the scan it refers to is kept
+        self.notify(job)
+        if self.store is not None:
+            scan_job_id = job.params.get('scan_job_id')
+            try:
+                self.store.prune(self.max_retained, self.retention_seconds,
+                                 keep=[scan_job_id] if scan_job_id else ())
+            except Exception as e:
+                logger.warning(f"Could not prune stored jobs: {e}")
+        job.future = self._pool.submit(self._run, job, target)
+        return job
+
+    def _run(self, job: Job, target: Callable[[Job], Any]):
+        if self.store is not None and self.store.cancel_requested(job.id):
+            job.cancel_event.set()
+        if job.cancelled:
+            job.state = CANCELLED
+            job.message = 'Cancelled'
+            job.finished_at = time.time()
+            self.notify(job)
+            return
+        job.state = RUNNING
+        job.started_at = time.time()
+        job.message = 'Running'
+        job.report = JobReport()
+        self.notify(job)
+        try:
+            # The job's span is the root of its trace; work it starts becomes its children
+            with job.report.activate(), cancellation(job.cancel_event), \
+                    span(f'job.{job.kind}', **{'job.id': job.id}):
+                target(job)
+            job.state = CANCELLED if job.cancelled else COMPLETED
+            if job.cancelled:
+                job.message = 'Cancelled'
+            else:
+                job.progress = 100
+        except JobCancelled:
+            job.state = CANCELLED
+            job.message = 'Cancelled'
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.state = FAILED
+            job.error = str(e)
+            job.message = f'{job.kind.capitalize()} error: {e}'
+        finally:
+            job.finished_at = time.time()
+            job.report.finish()
+            job.details['report'] = job.report.as_dict()
+            self.notify(job)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Ask a job to stop.
+
+        Queued jobs are cancelled immediately; running jobs stop at their
+        next cancellation check.
+
+        Returns:
+            The job, or None if there is no such job
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.state = CANCELLED
+            job.message = 'Cancelled'
+            job.finished_at = time.time()
+            self.notify(job)
+        return job
+
+    def _prune(self):
+        """
+        Drop expired finished jobs and keep at most max_retained per kind.
+
+        The most recent completed job of each kind is kept regardless of age.
+        """
+        now = time.time()
+        kept_per_kind: Dict[str, int] = {}
+        newest_completed = set()
+        for job in reversed(list(self._jobs.values())):
+            if not job.finished:
+                continue
+            kept = kept_per_kind.get(job.kind, 0)
+            newest = job.state == COMPLETED and job.kind not in newest_completed
+            if newest:
+                newest_completed.add(job.kind)
+            if kept >= self.max_retained or (not newest and now - job.finished_at > self.retention_seconds):
+                del self._jobs[job.id]
+            else:
+                kept_per_kind[job.kind] = kept + 1
+
+    def shutdown(self, cancel: bool = True):
+        """Stop the pool, optionally cancelling all unfinished jobs."""
+        self._stop.set()
+        if cancel:
+            with self._lock:
+                job_ids = list(self._jobs)
+            for job_id in job_ids:
+                self.cancel(job_id)
+        self._pool.shutdown(wait=False)
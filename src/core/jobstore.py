@@ -0,0 +1,725 @@
+"""
+Persistent job and scan result store shared by all web workers.
+
+Job status and planned operations are written to a local SQLite database
+in WAL mode, so every gunicorn worker (and a restarted one) sees the same
+jobs and results. Result pages, facets and single results are answered
+with SQL queries, and only the operations being applied are loaded back
+into RenameOperation objects, so large scans are never held in memory.
+
+Every unfinished job carries the instance token of the process running
+it and a heartbeat that process refreshes; a job whose heartbeat is older
+than the lease is marked as interrupted, whichever worker notices first.
+PIDs are not used for this since a restarted container reuses them.
+
+Each scan's operation set carries a version that increases with every
+write; rows remember the version that added and last changed them, and
+removed rows leave a tombstone, so clients can fetch just what changed
+since the version they already have.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+from src.core.renamer import RenameOperation
+from src.core.results import MAX_PAGE_SIZE, SORT_FIELDS, build_result_row
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Row columns stored for every planned operation (see build_result_row)
+ROW_COLUMNS = ('source_path', 'target_path', 'filename', 'new_filename', 'title', 'year', 'season',
+               'episode', 'media_type', 'operation_type', 'status', 'metadata_status', 'error_message')
+
+UNFINISHED_STATES = ('queued', 'running')
+
+# Seconds an unfinished job stays owned without a heartbeat
+DEFAULT_LEASE_SECONDS = 60.0
+
+# Identifies this process as the owner of the jobs it runs; renewed in
+# forked children so preloaded gunicorn workers do not share it
+INSTANCE_ID = uuid.uuid4().hex
+
+
+def _new_instance_id():
+    global INSTANCE_ID
+    INSTANCE_ID = uuid.uuid4().hex
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_new_instance_id)
+
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT,
+        state TEXT,
+        progress REAL,
+        message TEXT,
+        params TEXT,
+        details TEXT,
+        error TEXT,
+        created_at REAL,
+        started_at REAL,
+        finished_at REAL,
+        owner TEXT,
+        heartbeat_at REAL,
+        cancel_requested INTEGER DEFAULT 0,
+        result TEXT,
+        results_version INTEGER DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS jobs_kind ON jobs (kind, created_at);
+    CREATE TABLE IF NOT EXISTS operations (
+        job_id TEXT,
+        idx INTEGER,
+        source_path TEXT,
+        target_path TEXT,
+        filename TEXT,
+        new_filename TEXT,
+        title TEXT,
+        year,
+        season,
+        episode,
+        media_type TEXT,
+        operation_type TEXT,
+        status TEXT,
+        metadata_status TEXT,
+        error_message TEXT,
+        issues TEXT,
+        metadata TEXT,
+        search_text TEXT,
+        applied INTEGER,
+        success INTEGER,
+        exec_error TEXT,
+        added_version INTEGER DEFAULT 0,
+        version INTEGER DEFAULT 0,
+        PRIMARY KEY (job_id, idx)
+    );
+    CREATE INDEX IF NOT EXISTS operations_metadata_status ON operations (job_id, metadata_status);
+    CREATE INDEX IF NOT EXISTS operations_media_type ON operations (job_id, media_type);
+    CREATE INDEX IF NOT EXISTS operations_status ON operations (job_id, status);
+    CREATE TABLE IF NOT EXISTS operation_removals (
+        job_id TEXT,
+        idx INTEGER,
+        version INTEGER,
+        PRIMARY KEY (job_id, idx)
+    );
+    CREATE TABLE IF NOT EXISTS apply_results (
+        job_id TEXT,
+        seq INTEGER,
+        result TEXT,
+        PRIMARY KEY (job_id, seq)
+    );
+'''
+
+# Columns added since the first release of the store: (table, column, declaration)
+MIGRATIONS = (
+    ('jobs', 'results_version', 'INTEGER DEFAULT 0'),
+    ('operations', 'added_version', 'INTEGER DEFAULT 0'),
+    ('operations', 'version', 'INTEGER DEFAULT 0'),
+    ('jobs', 'owner', 'TEXT'),
+    ('jobs', 'heartbeat_at', 'REAL'),
+)
+
+
+class JobStore:
+    """SQLite-backed job status and planned operation storage."""
+
+    def __init__(self, path: str = 'cache/jobs.db'):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as db:
+            db.executescript(SCHEMA)
+            for table, column, declaration in MIGRATIONS:
+                columns = {row['name'] for row in db.execute(f'PRAGMA table_info({table})')}
+                if column not in columns:
+                    db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {declaration}')
+
+    @classmethod
+    def from_config(cls, config) -> 'JobStore':
+        """Build a store from the [JOBS] configuration section."""
+        return cls(config.get('JOBS', 'store_path', 'cache/jobs.db') or 'cache/jobs.db')
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run while a scan is written
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+        return db
+
+    # Jobs
+
+    def save_job(self, job):
+        """
+        Insert or update a job's status.
+
+        Args:
+            job: Job whose status to store (its result payload is stored separately)
+        """
+        with self._connection() as db:
+            db.execute('''
+                INSERT INTO jobs (id, kind, state, progress, message, params, details, error,
+                                  created_at, started_at, finished_at, owner, heartbeat_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    state = excluded.state, progress = excluded.progress, message = excluded.message,
+                    details = excluded.details, error = excluded.error, started_at = excluded.started_at,
+                    finished_at = excluded.finished_at, heartbeat_at = excluded.heartbeat_at
+            ''', (job.id, job.kind, job.state, job.progress, job.message, json.dumps(job.params),
+                  json.dumps(job.details, default=str), job.error, job.created_at, job.started_at,
+                  job.finished_at, INSTANCE_ID, time.time()))
+
+    def save_result(self, job_id: str, result: Dict):
+        """Store a job's small JSON result (e.g. metadata issues or discovered folders)."""
+        with self._connection() as db:
+            db.execute('UPDATE jobs SET result = ? WHERE id = ?', (json.dumps(result, default=str), job_id))
+
+    def load_result(self, job_id: str) -> Dict:
+        """Return a job's JSON result, or an empty dict."""
+        row = self._connection().execute('SELECT result FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return json.loads(row['result']) if row and row['result'] else {}
+
+    @staticmethod
+    def _job_dict(row: sqlite3.Row) -> Dict:
+        status = {
+            'job_id': row['id'],
+            'kind': row['kind'],
+            'state': row['state'],
+            'is_running': row['state'] in UNFINISHED_STATES,
+            'progress': row['progress'],
+            'message': row['message'],
+            'params': json.loads(row['params'] or '{}'),
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+        status.update(json.loads(row['details'] or '{}'))
+        return status
+
+    _JOB_COLUMNS = ('id, kind, state, progress, message, params, details, error, '
+                    'created_at, started_at, finished_at')
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Return a job's status dictionary, or None."""
+        row = self._connection().execute(
+            f'SELECT {self._JOB_COLUMNS} FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        return self._job_dict(row) if row else None
+
+    def list_jobs(self, kind: Optional[str] = None, state: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """
+        Return job status dictionaries, newest first.
+
+        Args:
+            kind: Only jobs of this kind
+            state: Only jobs in this state
+            limit: Maximum number of jobs
+
+        Returns:
+            List of status dictionaries
+        """
+        clauses, params = [], []
+        if kind:
+            clauses.append('kind = ?')
+            params.append(kind)
+        if state:
+            clauses.append('state = ?')
+            params.append(state)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._connection().execute(
+            f'SELECT {self._JOB_COLUMNS} FROM jobs {where} ORDER BY created_at DESC LIMIT ?',
+            (*params, limit)
+        ).fetchall()
+        return [self._job_dict(row) for row in rows]
+
+    def latest_job(self, kind: Optional[str] = None, state: Optional[str] = None) -> Optional[Dict]:
+        """Return the newest job matching kind and state, or None."""
+        jobs = self.list_jobs(kind, state, limit=1)
+        return jobs[0] if jobs else None
+
+    def unfinished_counts(self) -> Dict[tuple, int]:
+        """Return the number of queued and running jobs, keyed by (kind, state), across all workers."""
+        rows = self._connection().execute(
+            f'SELECT kind, state, COUNT(*) FROM jobs WHERE state IN {UNFINISHED_STATES} GROUP BY kind, state'
+        ).fetchall()
+        return {(row[0], row[1]): row[2] for row in rows}
+
+    def find_active(self, kind: str, params: Dict) -> Optional[Dict]:
+        """Return an unfinished job of this kind with the same parameters, from any worker."""
+        rows = self._connection().execute(
+            f'SELECT {self._JOB_COLUMNS} FROM jobs WHERE kind = ? AND state IN {UNFINISHED_STATES}', (kind,)
+        ).fetchall()
+        for row in rows:
+            if json.loads(row['params'] or '{}') == params:
+                return self._job_dict(row)
+        return None
+
+    def request_cancel(self, job_id: str) -> bool:
+        """
+        Flag an unfinished job for cancellation by whichever worker runs it.
+
+        Returns:
+            True if the job exists
+        """
+        with self._connection() as db:
+            db.execute(
+                f"UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND state IN {UNFINISHED_STATES}", (job_id,)
+            )
+        return self.get_job(job_id) is not None
+
+    def cancel_requested(self, job_id: str) -> bool:
+        """Return True if another worker asked for this job to be cancelled."""
+        row = self._connection().execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def heartbeat(self, job_ids: Sequence[str]):
+        """Renew this process's lease on its unfinished jobs."""
+        wanted = list(job_ids)
+        with self._connection() as db:
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start:start + 500]
+                db.execute(
+                    f"UPDATE jobs SET heartbeat_at = ? WHERE owner = ? "
+                    f"AND id IN ({', '.join('?' * len(chunk))})", (time.time(), INSTANCE_ID, *chunk)
+                )
+
+    def recover_interrupted(self, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        """
+        Mark unfinished jobs whose owner stopped renewing their lease as failed.
+
+        Args:
+            lease_seconds: Seconds without a heartbeat after which a job is
+                considered abandoned (its worker died or was restarted)
+
+        Returns:
+            Number of jobs marked
+        """
+        now = time.time()
+        with self._connection() as db:
+            lost = db.execute(
+                "UPDATE jobs SET state = 'failed', error = 'Interrupted by a restart', "
+                "message = 'Interrupted by a restart', finished_at = ? "
+                f"WHERE state IN {UNFINISHED_STATES} AND COALESCE(heartbeat_at, 0) < ?",
+                (now, now - lease_seconds)
+            ).rowcount
+        if lost:
+            logger.info(f"Marked {lost} interrupted jobs as failed")
+        return lost
+
+    def prune(self, max_retained: int, retention_seconds: float, keep: Sequence[str] = ()) -> int:
+        """
+        Delete finished jobs beyond the retention limits, with their operations.
+
+        The newest completed job of each kind is only subject to the count
+        limit, not to the age limit, so the last scan stays available however
+        long it is reviewed. Jobs named in keep, and scans an unfinished job
+        (e.g. an apply) refers to through its scan_job_id, are never deleted.
+
+        Args:
+            max_retained: Finished jobs kept per kind
+            retention_seconds: Finished jobs older than this are deleted
+            keep: IDs of jobs that must not be deleted
+
+        Returns:
+            Number of jobs deleted
+        """
+        db = self._connection()
+        protected = set(keep)
+        for row in db.execute(f'SELECT params FROM jobs WHERE state IN {UNFINISHED_STATES}'):
+            scan_job_id = json.loads(row['params'] or '{}').get('scan_job_id')
+            if scan_job_id:
+                protected.add(scan_job_id)
+        rows = db.execute(
+            f'SELECT id, kind, state, finished_at FROM jobs WHERE state NOT IN {UNFINISHED_STATES} '
+            'ORDER BY created_at DESC'
+        ).fetchall()
+        cutoff = time.time() - retention_seconds
+        kept: Dict[str, int] = {}
+        newest_completed = set()
+        doomed = []
+        for row in rows:
+            count = kept.get(row['kind'], 0)
+            newest = row['state'] == 'completed' and row['kind'] not in newest_completed
+            if newest:
+                newest_completed.add(row['kind'])
+            if row['id'] in protected:
+                kept[row['kind']] = count + 1
+            elif count >= max_retained or (not newest and (row['finished_at'] or 0) < cutoff):
+                doomed.append((row['id'],))
+            else:
+                kept[row['kind']] = count + 1
+        if doomed:
+            with db:
+                db.executemany('DELETE FROM operations WHERE job_id = ?', doomed)
+                db.executemany('DELETE FROM operation_removals WHERE job_id = ?', doomed)
+                db.executemany('DELETE FROM apply_results WHERE job_id = ?', doomed)
+                db.executemany('DELETE FROM jobs WHERE id = ?', doomed)
+        return len(doomed)
+
+    # Planned operations
+
+    _OPERATION_INSERT = (f"INSERT OR REPLACE INTO operations "
+                         f"(job_id, idx, {', '.join(ROW_COLUMNS)}, issues, metadata, search_text, applied, "
+                         f"success, exec_error, added_version, version) "
+                         f"VALUES ({', '.join('?' * (len(ROW_COLUMNS) + 10))})")
+
+    @staticmethod
+    def _operation_values(job_id: str, index: int, operation, added_version: int, version: int) -> tuple:
+        row = build_result_row(index, operation)
+        search_text = ' '.join(str(row[key]) for key in ('filename', 'new_filename', 'title', 'source_path'))
+        return (
+            job_id, index, *(row[column] for column in ROW_COLUMNS),
+            json.dumps(row['issues']), json.dumps(operation.metadata, default=str), search_text.casefold(),
+            int(operation.applied), int(operation.success), operation.error_message, added_version, version
+        )
+
+    @staticmethod
+    def _next_version(db: sqlite3.Connection, job_id: str) -> int:
+        # Runs inside the writing transaction, so concurrent writers get distinct versions
+        db.execute('UPDATE jobs SET results_version = COALESCE(results_version, 0) + 1 WHERE id = ?', (job_id,))
+        row = db.execute('SELECT results_version FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row[0] if row else 1
+
+    def results_version(self, job_id: str) -> int:
+        """Return the current version of a scan's operation set (0 if none stored)."""
+        row = self._connection().execute('SELECT results_version FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return (row[0] or 0) if row else 0
+
+    def save_operations(self, job_id: str, operations: Sequence):
+        """
+        Store a scan's planned operations, replacing any stored before.
+
+        Args:
+            job_id: Scan job ID
+            operations: RenameOperation objects in result order
+        """
+        with self._connection() as db:
+            version = self._next_version(db, job_id)
+            # Rows beyond the new set are gone; the rest are re-added at this version
+            db.execute(
+                'INSERT OR REPLACE INTO operation_removals (job_id, idx, version) '
+                'SELECT job_id, idx, ? FROM operations WHERE job_id = ? AND idx >= ?',
+                (version, job_id, len(operations))
+            )
+            db.execute('DELETE FROM operations WHERE job_id = ?', (job_id,))
+            db.execute('DELETE FROM operation_removals WHERE job_id = ? AND idx < ?', (job_id, len(operations)))
+            db.executemany(
+                self._OPERATION_INSERT,
+                (self._operation_values(job_id, i, op, version, version) for i, op in enumerate(operations))
+            )
+
+    def update_operations(self, job_id: str, indices: Sequence[int], operations: Sequence):
+        """Rewrite stored operations after they were applied or changed."""
+        db = self._connection()
+        added = {}
+        wanted = list(indices)
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            added.update(db.execute(
+                f"SELECT idx, added_version FROM operations WHERE job_id = ? "
+                f"AND idx IN ({', '.join('?' * len(chunk))})", (job_id, *chunk)
+            ).fetchall())
+        with db:
+            version = self._next_version(db, job_id)
+            db.executemany(
+                self._OPERATION_INSERT,
+                (self._operation_values(job_id, i, op, added.get(i, version), version)
+                 for i, op in zip(indices, operations))
+            )
+            db.execute(
+                f"DELETE FROM operation_removals WHERE job_id = ? AND idx IN "
+                f"(SELECT idx FROM operations WHERE job_id = ? AND version = ?)", (job_id, job_id, version)
+            )
+
+    def indices_for_sources(self, job_id: str, source_paths: Sequence[str]) -> Dict[str, int]:
+        """Return the index of each stored operation of a scan with one of the given source paths."""
+        db = self._connection()
+        indices = {}
+        wanted = sorted(set(source_paths))
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            indices.update(db.execute(
+                f"SELECT source_path, idx FROM operations WHERE job_id = ? "
+                f"AND source_path IN ({', '.join('?' * len(chunk))})", (job_id, *chunk)
+            ).fetchall())
+        return indices
+
+    def operation_count(self, job_id: str) -> int:
+        """Return the number of operations stored for a scan."""
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM operations WHERE job_id = ?', (job_id,)
+        ).fetchone()[0]
+
+    def load_operations(self, job_id: str, indices: Optional[Sequence[int]] = None) -> Dict[int, RenameOperation]:
+        """
+        Rebuild RenameOperation objects for applying.
+
+        Args:
+            job_id: Scan job ID
+            indices: Operations to load (None: all)
+
+        Returns:
+            Dictionary of index -> RenameOperation, for the indices that exist
+        """
+        db = self._connection()
+        query = ('SELECT idx, source_path, target_path, operation_type, issues, metadata, applied, '
+                 'success, exec_error FROM operations WHERE job_id = ?')
+        if indices is None:
+            rows = db.execute(query + ' ORDER BY idx', (job_id,)).fetchall()
+        else:
+            rows = []
+            wanted = sorted(set(indices))
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start:start + 500]
+                rows += db.execute(
+                    query + f" AND idx IN ({', '.join('?' * len(chunk))})", (job_id, *chunk)
+                ).fetchall()
+
+        operations = {}
+        for row in rows:
+            operation = RenameOperation(row['source_path'], row['target_path'], row['operation_type'])
+            operation.issues = json.loads(row['issues'] or '[]')
+            operation.metadata = json.loads(row['metadata'] or '{}')
+            operation.applied = bool(row['applied'])
+            operation.success = bool(row['success'])
+            operation.error_message = row['exec_error']
+            operations[row['idx']] = operation
+        return operations
+
+    @staticmethod
+    def _row_dict(row: sqlite3.Row) -> Dict:
+        result = {'id': row['idx']}
+        for column in ROW_COLUMNS:
+            result[column] = row[column]
+        result['issues'] = json.loads(row['issues'] or '[]')
+        return result
+
+    _ROW_COLUMNS = f"idx, {', '.join(ROW_COLUMNS)}, issues"
+
+    def query_results(self, job_id: str, page: int = 1, per_page: int = 100,
+                      metadata_status: Optional[List[str]] = None, media_type: Optional[List[str]] = None,
+                      status: Optional[List[str]] = None, text: str = '', sort: str = 'id',
+                      order: str = 'asc') -> Dict:
+        """
+        Return one page of a scan's filtered, sorted result rows.
+
+        Args:
+            job_id: Scan job ID
+            page: 1-based page number
+            per_page: Rows per page (capped at MAX_PAGE_SIZE)
+            metadata_status: Keep rows with one of these metadata statuses
+            media_type: Keep rows with one of these media types
+            status: Keep rows with one of these statuses (Ready, Conflict, ...)
+            text: Case-insensitive substring matched against names and paths
+            sort: One of SORT_FIELDS
+            order: 'asc' or 'desc'
+
+        Returns:
+            Dictionary with results, total, filtered, page, per_page and pages
+
+        Raises:
+            ValueError: If sort or order is not recognized
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort}")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Invalid sort order: {order}")
+        per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+        page = max(1, page)
+
+        where, params = self._filter(job_id, metadata_status, media_type, status, text)
+
+        # Numbers sort numerically, text case-insensitively, blanks last
+        column = 'idx' if sort == 'id' else sort
+        direction = order.upper()
+        order_by = (f"({column} IS NULL OR {column} = '') ASC, {column} COLLATE NOCASE {direction}, "
+                    f"idx {direction}")
+
+        db = self._connection()
+        # Read first: rows fetched below are at least this new, so a later
+        # changes(since=version) call cannot miss anything
+        version = self.results_version(job_id)
+        total = self.operation_count(job_id)
+        filtered = db.execute(f'SELECT COUNT(*) FROM operations WHERE {where}', params).fetchone()[0]
+        rows = db.execute(
+            f'SELECT {self._ROW_COLUMNS} FROM operations WHERE {where} ORDER BY {order_by} LIMIT ? OFFSET ?',
+            (*params, per_page, (page - 1) * per_page)
+        ).fetchall()
+        return {
+            'results': [self._row_dict(row) for row in rows],
+            'total': total,
+            'filtered': filtered,
+            'page': page,
+            'per_page': per_page,
+            'pages': max(1, -(-filtered // per_page)),
+            'version': version
+        }
+
+    def changes(self, job_id: str, since: int, metadata_status: Optional[List[str]] = None,
+                media_type: Optional[List[str]] = None, status: Optional[List[str]] = None,
+                text: str = '', limit: int = MAX_PAGE_SIZE) -> Dict:
+        """
+        Return what changed in a scan's result rows after a version.
+
+        Rows written after ``since`` are reported as added (new since then)
+        or changed if they match the filter, and as removed if they no longer
+        do or were deleted, so a filtered view can be patched in place.
+
+        Args:
+            job_id: Scan job ID
+            since: Version the client already has (from a page or an earlier delta)
+            metadata_status, media_type, status, text: The client's filter (see query_results)
+            limit: Most rows reported; beyond that the client should reload
+
+        Returns:
+            Dictionary with version, since, added and changed rows, removed
+            ids, total, filtered, and reset (True when the client should
+            reload instead of patching)
+        """
+        db = self._connection()
+        version = self.results_version(job_id)
+        where, params = self._filter(job_id, metadata_status, media_type, status, text)
+        total = self.operation_count(job_id)
+        filtered = db.execute(f'SELECT COUNT(*) FROM operations WHERE {where}', params).fetchone()[0]
+        delta = {'version': version, 'since': since, 'added': [], 'changed': [], 'removed': [],
+                 'total': total, 'filtered': filtered, 'reset': False}
+        if since >= version:
+            delta['reset'] = since > version  # A version from a replaced or unknown store
+            return delta
+
+        count = db.execute(
+            'SELECT COUNT(*) FROM operations WHERE job_id = ? AND version > ?', (job_id, since)
+        ).fetchone()[0]
+        if since <= 0 or count > limit:
+            delta['reset'] = True
+            return delta
+
+        rows = db.execute(
+            f'SELECT {self._ROW_COLUMNS}, added_version FROM operations WHERE {where} AND version > ? ORDER BY idx',
+            (*params, since)
+        ).fetchall()
+        matching = set()
+        for row in rows:
+            matching.add(row['idx'])
+            delta['added' if row['added_version'] > since else 'changed'].append(self._row_dict(row))
+        delta['removed'] = [
+            row[0] for row in db.execute(
+                'SELECT idx FROM operations WHERE job_id = ? AND version > ? AND added_version <= ? '
+                'UNION SELECT idx FROM operation_removals WHERE job_id = ? AND version > ? ORDER BY idx',
+                (job_id, since, since, job_id, since)
+            ) if row[0] not in matching
+        ]
+        return delta
+
+    @staticmethod
+    def _filter(job_id: str, metadata_status: Optional[List[str]], media_type: Optional[List[str]],
+                status: Optional[List[str]], text: str):
+        """Build the WHERE clause and parameters for a result filter."""
+        clauses, params = ['job_id = ?'], [job_id]
+        for column, values in (('metadata_status', metadata_status), ('media_type', media_type),
+                               ('status', status)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        needle = (text or '').casefold().strip()
+        if needle:
+            clauses.append('instr(search_text, ?) > 0')
+            params.append(needle)
+        return ' AND '.join(clauses), params
+
+    def select_indices(self, job_id: str, indices: Optional[Sequence[int]] = None,
+                       metadata_status: Optional[List[str]] = None, media_type: Optional[List[str]] = None,
+                       status: Optional[List[str]] = None, text: str = '') -> List[int]:
+        """
+        Resolve a selector to operation indices, in result order.
+
+        Args:
+            job_id: Scan job ID
+            indices: Only these operations (None: any)
+            metadata_status: Only rows with one of these metadata statuses
+            media_type: Only rows with one of these media types
+            status: Only rows with one of these statuses
+            text: Only rows whose names or paths contain this text
+
+        Returns:
+            Matching operation indices
+        """
+        where, params = self._filter(job_id, metadata_status, media_type, status, text)
+        rows = self._connection().execute(f'SELECT idx FROM operations WHERE {where} ORDER BY idx', params)
+        if indices is None:
+            return [row[0] for row in rows]
+        wanted = set(indices)
+        return [row[0] for row in rows if row[0] in wanted]
+
+    def facets(self, job_id: str) -> Dict[str, Dict[str, int]]:
+        """Count a scan's rows by metadata_status, media_type and status."""
+        db = self._connection()
+        facets = {}
+        for column in ('metadata_status', 'media_type', 'status'):
+            rows = db.execute(
+                f'SELECT {column}, COUNT(*) FROM operations WHERE job_id = ? GROUP BY {column}', (job_id,)
+            ).fetchall()
+            facets[column] = {row[0]: row[1] for row in rows}
+        return facets
+
+    def result_detail(self, job_id: str, index: int) -> Dict:
+        """
+        Return one result row with its full metadata.
+
+        Raises:
+            IndexError: If there is no such result
+        """
+        row = self._connection().execute(
+            f'SELECT {self._ROW_COLUMNS}, metadata FROM operations WHERE job_id = ? AND idx = ?',
+            (job_id, index)
+        ).fetchone()
+        if row is None:
+            raise IndexError(index)
+        result = self._row_dict(row)
+        result['metadata'] = json.loads(row['metadata'] or '{}')
+        return result
+
+    # Apply results
+
+    def add_apply_results(self, job_id: str, results: Sequence[Dict]):
+        """
+        Append per-operation results of an apply job.
+
+        Args:
+            job_id: Apply job ID
+            results: Result dictionaries, each with a 'seq' increasing from 1
+        """
+        with self._connection() as db:
+            db.executemany(
+                'INSERT OR REPLACE INTO apply_results (job_id, seq, result) VALUES (?, ?, ?)',
+                ((job_id, result['seq'], json.dumps(result, default=str)) for result in results)
+            )
+
+    def apply_results(self, job_id: str, after: int = 0, limit: int = 1000) -> List[Dict]:
+        """Return an apply job's results with seq greater than after, in order."""
+        rows = self._connection().execute(
+            'SELECT result FROM apply_results WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?',
+            (job_id, after, limit)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
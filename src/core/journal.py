@@ -0,0 +1,398 @@
+"""
+Write-ahead journal for applying rename operations.
+
+Before anything touches the disk, every planned operation is appended to
+a JSON-lines journal and fsynced. Completed operations are recorded in
+batches (one fsync per batch), so an apply that is killed midway can be
+resumed from the journal without rescanning, and a finished apply can be
+undone by replaying it in reverse.
+
+While an apply, resume or undo is working on a journal it holds an
+exclusive lock on a ``<journal>.lock`` file next to it. The lock is
+released by the kernel if the process dies, so an uncommitted journal
+whose lock is free really was interrupted, and resume/undo refuse a
+journal that is still locked.
+
+Record types, one JSON object per line:
+
+    begin   {"type": "begin", "id", "created", "count", "info"}
+    op      {"type": "op", "seq", "source", "target", "op"}
+    done    {"type": "done", "seq", "ok", "error", "bytes"}
+    commit  {"type": "commit", "at"}
+    undo    {"type": "undo", "seq", "ok", "error"}
+    undone  {"type": "undone", "at"}
+"""
+
+import errno
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Operation types that leave the source in place
+KEEPS_SOURCE_TYPES = {'copy', 'hardlink', 'symlink'}
+
+
+class JournalBusy(RuntimeError):
+    """Raised when another apply, resume or undo is working on a journal."""
+
+
+class JournalEntry:
+    """One planned operation and what the journal knows about it."""
+
+    def __init__(self, seq: int, source: str, target: str, operation_type: str):
+        self.seq = seq
+        self.source = source
+        self.target = target
+        self.operation_type = operation_type
+        self.ok: Optional[bool] = None  # None until a done record is seen
+        self.error: Optional[str] = None
+        self.bytes = 0
+        self.undone = False
+
+    def reconcile(self) -> Optional[bool]:
+        """
+        Infer from the filesystem whether an unrecorded operation completed.
+
+        Done records are fsynced per batch, so a crash can lose the tail of
+        the last batch; the filesystem is the tie-breaker for those.
+
+        Returns:
+            True if the operation evidently completed, False if it can still
+            be run, None if neither source nor target exists
+        """
+        source_exists = os.path.exists(self.source)
+        target_exists = os.path.lexists(self.target)
+        if self.operation_type in KEEPS_SOURCE_TYPES:
+            if target_exists:
+                return True
+            return False if source_exists else None
+        if target_exists and not source_exists:
+            return True
+        return False if source_exists else None
+
+
+class Journal:
+    """An append-only, fsynced JSON-lines journal for one apply."""
+
+    def __init__(self, path: str, batch_size: int = 64):
+        """
+        Initialize a journal bound to a file.
+
+        Args:
+            path: Journal file path
+            batch_size: Completion records buffered between fsyncs
+        """
+        self.path = path
+        self.journal_id = os.path.splitext(os.path.basename(path))[0]
+        self.batch_size = max(1, batch_size)
+        self.created: Optional[str] = None
+        self.info: Dict = {}  # Caller-defined details from the begin record
+        self.entries: List[JournalEntry] = []
+        self.committed = False
+        self.undone = False
+        self._pending: List[Dict] = []
+        self._truncate_to: Optional[int] = None  # Drops a torn last line before appending
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # Keeps concurrent batches from interleaving
+        self._lock_file = None  # Open <path>.lock while this process owns the journal
+
+    @property
+    def lock_path(self) -> str:
+        return self.path + '.lock'
+
+    def acquire(self):
+        """
+        Take the journal's lock for this process.
+
+        Raises:
+            JournalBusy: If another apply, resume or undo holds it
+        """
+        if fcntl is None or self._lock_file is not None:
+            return
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise JournalBusy(f"Journal {self.journal_id} is in use by another apply, resume or undo")
+        self._lock_file = lock_file
+
+    def release(self):
+        """Release the journal's lock, if held."""
+        lock_file, self._lock_file = self._lock_file, None
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def is_locked(self) -> bool:
+        """Whether some process (this one included) is working on the journal."""
+        if self._lock_file is not None:
+            return True
+        if fcntl is None or not os.path.exists(self.lock_path):
+            return False
+        with open(self.lock_path, 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return False
+
+    @classmethod
+    def create(cls, directory: str, operations: List, batch_size: int = 64,
+               info: Optional[Dict] = None) -> 'Journal':
+        """
+        Start a journal and durably write the plan before any operation runs.
+
+        Args:
+            directory: Directory to hold journal files
+            operations: RenameOperation objects about to be applied
+            batch_size: Completion records buffered between fsyncs
+            info: JSON-serializable details to keep with the journal
+                (e.g. the scan the operations came from)
+
+        Returns:
+            Journal ready to record completions, locked by this process
+        """
+        os.makedirs(directory, exist_ok=True)
+        journal_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        journal = cls(os.path.join(directory, f"{journal_id}.jsonl"), batch_size)
+        journal.acquire()
+        journal.created = datetime.now().isoformat(timespec='seconds')
+        journal.info = dict(info or {})
+
+        records = [{'type': 'begin', 'id': journal_id, 'created': journal.created, 'count': len(operations),
+                    'info': journal.info}]
+        for seq, operation in enumerate(operations):
+            operation.journal_seq = seq
+            journal.entries.append(JournalEntry(seq, operation.source_path, operation.target_path,
+                                                operation.operation_type))
+            records.append({'type': 'op', 'seq': seq, 'source': operation.source_path,
+                            'target': operation.target_path, 'op': operation.operation_type})
+        journal._write(records)
+        return journal
+
+    @classmethod
+    def load(cls, path: str, batch_size: int = 64, lock: bool = False) -> 'Journal':
+        """
+        Read a journal back, tolerating a torn final line from a crash.
+
+        Args:
+            path: Journal file path
+            batch_size: Completion records buffered between fsyncs
+            lock: Take the journal's lock before reading it, to resume or undo it
+
+        Returns:
+            Journal with entries and their recorded outcomes
+
+        Raises:
+            JournalBusy: If lock is set and another process holds the lock
+        """
+        journal = cls(path, batch_size)
+        if lock:
+            if not os.path.exists(path):
+                raise FileNotFoundError(errno.ENOENT, "No such journal", path)
+            journal.acquire()
+        try:
+            with open(path, 'rb') as f:
+                lines = f.readlines()
+            journal._parse(lines)
+        except BaseException:
+            journal.release()
+            raise
+        return journal
+
+    def _parse(self, lines: List[bytes]):
+        """Apply the records read from the journal file."""
+        offset = 0
+        for number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if number == len(lines) - 1:
+                    logger.warning(f"Ignoring incomplete last record in journal {self.path}")
+                    self._truncate_to = offset
+                    break
+                raise
+            offset += len(line)
+
+            kind = record.get('type')
+            if kind == 'begin':
+                self.created = record.get('created')
+                self.info = record.get('info') or {}
+            elif kind == 'op':
+                self.entries.append(JournalEntry(record['seq'], record['source'],
+                                                    record['target'], record['op']))
+            elif kind == 'done':
+                entry = self.entries[record['seq']]
+                entry.ok = record['ok']
+                entry.error = record.get('error')
+                entry.bytes = record.get('bytes', 0)
+            elif kind == 'commit':
+                self.committed = True
+            elif kind == 'undo':
+                if record['ok']:
+                    self.entries[record['seq']].undone = True
+            elif kind == 'undone':
+                self.undone = True
+
+    def _write(self, records: List[Dict]):
+        """Append records and fsync them."""
+        with self._write_lock:
+            if self._truncate_to is not None:
+                os.truncate(self.path, self._truncate_to)
+                self._truncate_to = None
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in records))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _append(self, record: Dict):
+        with self._lock:
+            self._pending.append(record)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def flush(self):
+        """Fsync any buffered records."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def record(self, operation):
+        """
+        Record the outcome of an operation (safe to call from worker threads).
+
+        Args:
+            operation: RenameOperation created from this journal
+        """
+        entry = self.entries[operation.journal_seq]
+        entry.ok = bool(operation.success)
+        entry.error = operation.error_message
+        entry.bytes = getattr(operation, 'bytes_transferred', 0)
+        self._append({'type': 'done', 'seq': entry.seq, 'ok': entry.ok,
+                      'error': entry.error, 'bytes': entry.bytes})
+
+    def record_undo(self, entry: JournalEntry, ok: bool, error: Optional[str] = None):
+        """Record the outcome of undoing one entry."""
+        entry.undone = ok
+        self._append({'type': 'undo', 'seq': entry.seq, 'ok': ok, 'error': error})
+
+    def commit(self):
+        """Mark every operation as settled."""
+        self.flush()
+        self.committed = True
+        self._write([{'type': 'commit', 'at': datetime.now().isoformat(timespec='seconds')}])
+
+    def mark_undone(self):
+        """Mark the journal as fully rolled back."""
+        self.flush()
+        self.undone = True
+        self._write([{'type': 'undone', 'at': datetime.now().isoformat(timespec='seconds')}])
+
+    def unsettled(self) -> List[JournalEntry]:
+        """Entries with no recorded outcome (the apply stopped before them)."""
+        return [entry for entry in self.entries if entry.ok is None]
+
+    def summary(self) -> Dict:
+        """Return a JSON-friendly overview of the journal."""
+        if self.undone:
+            state = 'undone'
+        elif self.committed:
+            state = 'committed'
+        elif self.is_locked():
+            state = 'running'
+        else:
+            state = 'interrupted'
+        return {
+            'id': self.journal_id,
+            'created': self.created,
+            'state': state,
+            'total': len(self.entries),
+            'completed': sum(1 for entry in self.entries if entry.ok),
+            'failed': sum(1 for entry in self.entries if entry.ok is False),
+            'pending': sum(1 for entry in self.entries if entry.ok is None),
+            'undone': sum(1 for entry in self.entries if entry.undone),
+            'info': self.info
+        }
+
+
+class JournalStore:
+    """Finds and opens the journals in a directory."""
+
+    def __init__(self, directory: str = 'journals', batch_size: int = 64):
+        """
+        Initialize the journal store.
+
+        Args:
+            directory: Directory holding journal files
+            batch_size: Completion records buffered between fsyncs
+        """
+        self.directory = directory
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_config(cls, config) -> 'JournalStore':
+        """Build a journal store from the [EXECUTION] configuration section."""
+        return cls(
+            directory=config.get('EXECUTION', 'journal_dir', 'journals'),
+            batch_size=config.get_int('EXECUTION', 'journal_batch_size', 64)
+        )
+
+    def begin(self, operations: List, info: Optional[Dict] = None) -> Journal:
+        """Create a journal for operations about to be applied."""
+        return Journal.create(self.directory, operations, self.batch_size, info)
+
+    def path_for(self, journal_id: str) -> str:
+        # Journal IDs are generated by us; reject anything that could escape the directory
+        if os.path.basename(journal_id) != journal_id or not journal_id:
+            raise ValueError(f"Invalid journal id: {journal_id}")
+        return os.path.join(self.directory, f"{journal_id}.jsonl")
+
+    def open(self, journal_id: str, lock: bool = False) -> Journal:
+        """
+        Load a journal by ID, optionally locking it to resume or undo it.
+
+        Raises:
+            FileNotFoundError: If no such journal exists
+            JournalBusy: If lock is set and the journal is in use
+        """
+        return Journal.load(self.path_for(journal_id), self.batch_size, lock=lock)
+
+    def delete(self, journal_id: str):
+        """Remove a journal file and its lock file."""
+        path = self.path_for(journal_id)
+        os.remove(path)
+        try:
+            os.remove(path + '.lock')
+        except FileNotFoundError:
+            pass
+
+    def list(self) -> List[Dict]:
+        """Return summaries of all journals, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        summaries = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith('.jsonl'):
+                continue
+            try:
+                summaries.append(Journal.load(os.path.join(self.directory, name)).summary())
+            except (OSError, ValueError, KeyError, IndexError) as e:
+                logger.warning(f"Skipping unreadable journal {name}: {e}")
+        return summaries
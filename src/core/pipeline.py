@@ -0,0 +1,296 @@
+"""
+Staged scan pipeline that overlaps filesystem walking, parsing and lookup.
+
+A walker thread, a pool of parse workers and a pool of lookup workers are
+connected by bounded queues. Slow metadata lookups therefore start as soon
+as the first file is parsed, and a fast walker is held back (backpressure)
+instead of buffering an entire library in memory.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.utils.jobreport import current_report, run_in_context
+from src.utils.logger import get_logger
+from src.utils.tracing import span
+from src.utils.metrics import counter, histogram
+
+logger = get_logger(__name__)
+
+ITEMS = counter('plex_renamer_scan_items_total',
+                'Items handled by each scan stage (files walked, files parsed, lookups done)', ('stage',))
+ERRORS = counter('plex_renamer_scan_errors_total', 'Items that failed in each scan stage', ('stage',))
+STAGE_SECONDS = histogram('plex_renamer_scan_stage_seconds', 'Wall-clock duration of each scan stage', ('stage',),
+                          buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600))
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class StageStats:
+    """Counters for a single pipeline stage."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.errors = 0
+        self.finished = False
+        self.started_at = None
+        self.finished_at = None
+
+    def as_dict(self) -> Dict:
+        """Return the stage counters as a JSON-friendly dict."""
+        end = self.finished_at or time.time()
+        return {
+            'processed': self.processed,
+            'errors': self.errors,
+            'workers': self.workers,
+            'finished': self.finished,
+            'seconds': round(end - self.started_at, 3) if self.started_at else 0.0
+        }
+
+
+class ScanPipeline:
+    """Runs walk -> parse -> lookup as concurrent stages joined by bounded queues."""
+
+    def __init__(self, walk: Callable[[], Iterable[Any]], parse: Callable[[Any], Any],
+                 lookup: Callable[[Any], Any], parse_workers: int = 1, lookup_workers: int = 4,
+                 queue_size: int = 256, on_progress: Optional[Callable[[Dict], None]] = None,
+                 on_result: Optional[Callable[[int, Any], None]] = None,
+                 cancel_event: Optional[threading.Event] = None,
+                 progress_interval: float = 0.25, profiler=None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            walk: Callable returning an iterable of discovered items (file paths)
+            parse: Callable turning a walked item into a parsed item, or None to drop it
+            lookup: Callable turning a parsed item into a final result, or None to drop it
+            parse_workers: Number of parse threads
+            lookup_workers: Number of lookup threads (usually the API concurrency)
+            queue_size: Capacity of each inter-stage queue
+            on_progress: Called with a stage snapshot at most every progress_interval
+            on_result: Called with (sequence, result) as each result is produced
+            cancel_event: Event that stops the pipeline early when set
+            progress_interval: Minimum seconds between on_progress calls
+            profiler: Optional ProfileSession enabled on every stage thread
+        """
+        self.walk = walk
+        self.parse = parse
+        self.lookup = lookup
+        self.on_progress = on_progress
+        self.on_result = on_result
+        self.cancel_event = cancel_event or threading.Event()
+        self.progress_interval = progress_interval
+        self.profiler = profiler
+
+        self.stages = {
+            'walk': StageStats('walk', 1),
+            'parse': StageStats('parse', max(1, parse_workers)),
+            'lookup': StageStats('lookup', max(1, lookup_workers)),
+        }
+        self._parse_queue = queue.Queue(maxsize=queue_size)
+        self._lookup_queue = queue.Queue(maxsize=queue_size)
+        self._results: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+        self._parse_remaining = self.stages['parse'].workers
+        self._dropped = 0
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def snapshot(self) -> Dict:
+        """
+        Return per-stage counters and an overall completion estimate.
+
+        Until the walk has finished the total is unknown, so the estimate
+        is capped below 100%.
+        """
+        with self._lock:
+            stages = {name: stats.as_dict() for name, stats in self.stages.items()}
+            dropped = self._dropped
+
+        walked = stages['walk']['processed']
+        completed = (stages['lookup']['processed'] + stages['lookup']['errors']
+                     + stages['parse']['errors'] + dropped)
+        progress = int(completed * 100 / walked) if walked else 0
+        if not stages['walk']['finished']:
+            progress = min(progress, 95)
+        return {
+            'stages': stages,
+            'progress': min(progress, 100),
+            'queued': {
+                'parse': self._parse_queue.qsize(),
+                'lookup': self._lookup_queue.qsize()
+            }
+        }
+
+    def _report_progress(self, force: bool = False):
+        if self.on_progress is None:
+            return
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_progress < self.progress_interval:
+                return
+            self._last_progress = now
+        try:
+            self.on_progress(self.snapshot())
+        except Exception as e:
+            logger.debug(f"Pipeline progress callback failed: {e}")
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Block on a full queue (backpressure) but give up on cancellation."""
+        while not self.cancelled:
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        while not self.cancelled:
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _start(self, stage: StageStats):
+        with self._lock:
+            if stage.started_at is None:
+                stage.started_at = time.time()
+
+    def _finish(self, stage: StageStats):
+        with self._lock:
+            stage.finished = True
+            stage.finished_at = time.time()
+
+    def _count(self, stage: StageStats, error: bool = False):
+        with self._lock:
+            if error:
+                stage.errors += 1
+            else:
+                stage.processed += 1
+        (ERRORS if error else ITEMS).inc(stage=stage.name)
+
+    def _drop(self):
+        with self._lock:
+            self._dropped += 1
+
+    def _walk_worker(self):
+        stage = self.stages['walk']
+        self._start(stage)
+        # Includes time the walker is held back by a full parse queue
+        walk_span = span('walk')
+        try:
+            with walk_span:
+                for sequence, item in enumerate(self.walk()):
+                    if not self._put(self._parse_queue, (sequence, item)):
+                        break
+                    self._count(stage)
+                    self._report_progress()
+                walk_span.set_attribute('files.count', stage.processed)
+        except Exception as e:
+            logger.error(f"Error walking media directories: {e}")
+            self._count(stage, error=True)
+        finally:
+            self._finish(stage)
+            for _ in range(self.stages['parse'].workers):
+                self._put(self._parse_queue, _DONE)
+
+    def _parse_worker(self):
+        stage = self.stages['parse']
+        self._start(stage)
+        try:
+            while True:
+                item = self._get(self._parse_queue)
+                if item is _DONE:
+                    break
+                sequence, path = item
+                try:
+                    parsed = self.parse(path)
+                except Exception as e:
+                    logger.error(f"Error parsing file {path}: {e}")
+                    self._count(stage, error=True)
+                    continue
+                self._count(stage)
+                if parsed is None:
+                    self._drop()
+                    continue
+                if not self._put(self._lookup_queue, (sequence, parsed)):
+                    break
+        finally:
+            with self._lock:
+                self._parse_remaining -= 1
+                last = self._parse_remaining == 0
+            if last:
+                self._finish(stage)
+                for _ in range(self.stages['lookup'].workers):
+                    self._put(self._lookup_queue, _DONE)
+
+    def _lookup_worker(self):
+        stage = self.stages['lookup']
+        self._start(stage)
+        while True:
+            item = self._get(self._lookup_queue)
+            if item is _DONE:
+                break
+            sequence, parsed = item
+            try:
+                result = self.lookup(parsed)
+            except Exception as e:
+                logger.error(f"Error looking up metadata: {e}")
+                self._count(stage, error=True)
+                continue
+            self._count(stage)
+            if result is None:
+                continue
+            with self._lock:
+                self._results[sequence] = result
+            if self.on_result is not None:
+                try:
+                    self.on_result(sequence, result)
+                except Exception as e:
+                    logger.debug(f"Pipeline result callback failed: {e}")
+            self._report_progress()
+
+    def run(self) -> List[Any]:
+        """
+        Run all stages to completion (or cancellation).
+
+        Returns:
+            Results in the order their inputs were walked
+        """
+        # Stage threads record into the caller's job report (and profile, if any)
+        if self.profiler is not None:
+            wrap = lambda target: run_in_context(self.profiler.wrap(target))
+        else:
+            wrap = run_in_context
+        threads = [threading.Thread(target=wrap(self._walk_worker), name='scan-walk', daemon=True)]
+        threads += [threading.Thread(target=wrap(self._parse_worker), name=f'scan-parse-{i}', daemon=True)
+                    for i in range(self.stages['parse'].workers)]
+        lookup_threads = [threading.Thread(target=wrap(self._lookup_worker), name=f'scan-lookup-{i}', daemon=True)
+                          for i in range(self.stages['lookup'].workers)]
+        threads += lookup_threads
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._finish(self.stages['lookup'])
+        self._report_progress(force=True)
+        report = current_report()
+        for stage in self.stages.values():
+            if stage.started_at is not None:
+                STAGE_SECONDS.observe(stage.finished_at - stage.started_at, stage=stage.name)
+                if report is not None:
+                    report.set_stage(stage.name, stage.finished_at - stage.started_at)
+
+        return [self._results[sequence] for sequence in sorted(self._results)]
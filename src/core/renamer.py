@@ -2,41 +2,84 @@
 Media renaming engine that applies Plex naming conventions.
 """
 
+import errno
 import os
 import re
-import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from src.core.file_parser import MediaFileInfo
+from src.core.copy_engine import CopyEngine
+from src.core.executor import OperationExecutor, same_filesystem
+from src.core.journal import KEEPS_SOURCE_TYPES, Journal, JournalStore
+from src.core.validation import OperationValidator, ValidationReport
+from src.utils.fscache import DirectoryCache
+from src.utils.jobreport import add_count, observe_slow, run_in_context, timed_stage
+from src.utils.tracing import span
 from src.api.tmdb import TMDBClient
 from src.api.tvdb import TVDBClient
+from src.api.transport import HTTPTransport
+from src.api.cache import CacheRefresher, MetadataCache
 from src.utils.config import Config
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Supported values for RenameOperation.operation_type and [GENERAL] operation_mode
+OPERATION_TYPES = ("rename", "move", "copy", "hardlink", "symlink")
+
+# os.link errors that mean "a hardlink is impossible here", so copying is the answer
+LINK_FALLBACK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP, errno.ENOTSUP}
+
 class RenameOperation:
     """Represents a single file rename operation."""
     
     def __init__(self, source_path: str, target_path: str, operation_type: str = "rename"):
         self.source_path = source_path
         self.target_path = target_path
-        self.operation_type = operation_type  # "rename", "move", "copy"
+        self.operation_type = operation_type  # one of OPERATION_TYPES
         self.success = False
         self.error_message = None
         self.metadata = {}  # Store metadata used for the operation
+        self.duration = 0.0  # Seconds spent executing
+        self.bytes_transferred = 0  # Bytes copied when data had to move
+        self.journal_seq = None  # Position in the apply journal, if journaled
+        self.issues = []  # Validation issues (dicts) found before execution
+        self.applied = False  # True once executed for real (success says how it went)
 
 class MediaRenamer:
     """Main renaming engine for media files."""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, progress_callback=None):
         """
         Initialize the media renamer.
         
         Args:
             config: Configuration object
+            progress_callback: Optional callback(path, bytes_done, total_bytes)
+                for files whose data has to be copied
         """
         self.config = config
         self.logger = get_logger(__name__)
+        self.progress_callback = progress_callback
+        self.copy_engine = CopyEngine.from_config(config)
+        self.journals = JournalStore.from_config(config)
+        
+        self.operation_mode = config.operation_mode
+        if self.operation_mode not in OPERATION_TYPES:
+            self.logger.warning(f"Unknown operation mode '{self.operation_mode}', using 'rename'")
+            self.operation_mode = "rename"
+        
+        # Initialize the shared metadata cache
+        self.metadata_cache = None
+        self.cache_refresher = None
+        
+        if config.get_boolean('CACHE', 'enabled', True):
+            self.metadata_cache = MetadataCache(
+                ttl=config.get_float('CACHE', 'ttl_hours', 168) * 3600,
+                path=config.get('CACHE', 'path', 'cache/metadata_cache.db') or None,
+                max_entries=config.get_int('CACHE', 'max_entries', 10000)
+            )
         
         # Initialize API clients
         self.tmdb_client = None
@@ -45,11 +88,44 @@ class MediaRenamer:
         if config.tmdb_api_key:
             self.tmdb_client = TMDBClient(
                 config.tmdb_api_key,
-                config.get('API', 'preferred_language', 'en-US')
+                config.get('API', 'preferred_language', 'en-US'),
+                transport=HTTPTransport.from_config(config, "TMDB"),
+                cache=self.metadata_cache,
+                base_url=config.get('API', 'tmdb_base_url', ''),
+                requests_per_second=config.get_float('NETWORK', 'tmdb_requests_per_second', 4)
             )
         
         if config.tvdb_api_key:
-            self.tvdb_client = TVDBClient(config.tvdb_api_key)
+            self.tvdb_client = TVDBClient(
+                config.tvdb_api_key,
+                transport=HTTPTransport.from_config(config, "TVDB"),
+                cache=self.metadata_cache,
+                base_url=config.get('API', 'tvdb_base_url', ''),
+                requests_per_second=config.get_float('NETWORK', 'tvdb_requests_per_second', 10)
+            )
+        
+        if self.metadata_cache and config.get_boolean('CACHE', 'background_refresh', True):
+            revalidators = {}
+            if self.tmdb_client:
+                revalidators['tmdb'] = self.tmdb_client.revalidate
+            if self.tvdb_client:
+                revalidators['tvdb'] = self.tvdb_client.revalidate
+            if revalidators:
+                self.cache_refresher = CacheRefresher(
+                    self.metadata_cache,
+                    revalidators,
+                    idle_seconds=config.get_float('CACHE', 'refresh_idle_seconds', 30),
+                    top_n=config.get_int('CACHE', 'refresh_top_n', 50),
+                    interval=config.get_float('CACHE', 'refresh_interval', 60)
+                )
+                self.cache_refresher.start()
+    
+    def close(self):
+        """Stop background work and release the metadata cache."""
+        if self.cache_refresher:
+            self.cache_refresher.stop()
+        if self.metadata_cache:
+            self.metadata_cache.close()
     
     def sanitize_filename(self, filename: str) -> str:
         """
@@ -210,7 +286,7 @@ class MediaRenamer:
                 details = self.tmdb_client.get_movie_details(movie['id'])
                 if details:
                     details['metadata_status'] = 'found'
-                    self.logger.info(f"Found metadata for movie: {details.get('title', media_info.title)}")
+                    self.logger.info("Found metadata for movie: %s", details.get('title', media_info.title))
                     return details
                 else:
                     self.logger.warning(f"Could not get details for movie: {media_info.title}")
@@ -291,7 +367,7 @@ class MediaRenamer:
                             except Exception as e:
                                 self.logger.warning(f"Error getting episode metadata: {e}")
                         
-                        self.logger.info(f"Found TMDB metadata for TV show: {show_metadata.get('name', media_info.title)}")
+                        self.logger.info("Found TMDB metadata for TV show: %s", show_metadata.get('name', media_info.title))
                     else:
                         self.logger.warning(f"Could not get TMDB details for show: {media_info.title}")
                         show_metadata = {
@@ -346,7 +422,7 @@ class MediaRenamer:
                                 except Exception as e:
                                     self.logger.warning(f"Error getting TVDB episode metadata: {e}")
                             
-                            self.logger.info(f"Found TVDB metadata for TV show: {show_metadata.get('name', media_info.title)}")
+                            self.logger.info("Found TVDB metadata for TV show: %s", show_metadata.get('name', media_info.title))
                         else:
                             self.logger.warning(f"Could not get TVDB details for show: {media_info.title}")
                             if not show_metadata:  # Only set if we don't have TMDB data
@@ -415,7 +491,7 @@ class MediaRenamer:
             # Place directly in movies folder
             target_path = os.path.join(movies_path, new_filename)
         
-        operation = RenameOperation(media_info.file_path, target_path)
+        operation = RenameOperation(media_info.file_path, target_path, self.operation_mode)
         operation.metadata = metadata
         
         return operation
@@ -449,7 +525,7 @@ class MediaRenamer:
         
         target_path = os.path.join(tv_shows_path, show_folder, season_folder, new_filename)
         
-        operation = RenameOperation(media_info.file_path, target_path)
+        operation = RenameOperation(media_info.file_path, target_path, self.operation_mode)
         operation.metadata = {
             'show': show_metadata,
             'episode': episode_metadata
@@ -457,44 +533,89 @@ class MediaRenamer:
         
         return operation
     
-    def execute_operation(self, operation: RenameOperation, dry_run: bool = True) -> bool:
+    def execute_operation(self, operation: RenameOperation, dry_run: bool = True,
+                          fs_cache: Optional[DirectoryCache] = None) -> bool:
         """
         Execute a rename operation.
         
         Args:
             operation: RenameOperation to execute
             dry_run: If True, don't actually perform the operation
+            fs_cache: Optional batch directory cache that answers directory and
+                target existence checks without touching the filesystem
             
         Returns:
             True if successful, False otherwise
         """
+        with span('execute_operation', **{
+            'operation.type': operation.operation_type,
+            'operation.source': operation.source_path,
+            'operation.target': operation.target_path,
+            'operation.dry_run': dry_run
+        }) as operation_span:
+            succeeded = self._execute_operation(operation, dry_run, fs_cache)
+            if not succeeded:
+                operation_span.record_error(operation.error_message)
+            return succeeded
+    
+    def _execute_operation(self, operation: RenameOperation, dry_run: bool,
+                           fs_cache: Optional[DirectoryCache]) -> bool:
         try:
             if dry_run:
-                self.logger.info(f"DRY RUN: Would rename {operation.source_path} -> {operation.target_path}")
+                self.logger.info("DRY RUN: Would %s %s -> %s", operation.operation_type,
+                                 operation.source_path, operation.target_path)
                 operation.success = True
                 return True
             
             # Create target directory if it doesn't exist
             target_dir = os.path.dirname(operation.target_path)
-            if not os.path.exists(target_dir):
-                os.makedirs(target_dir)
-                self.logger.info(f"Created directory: {target_dir}")
+            if fs_cache is not None:
+                if not fs_cache.ensure_directory(target_dir):
+                    raise OSError(f"Cannot create {target_dir}: {fs_cache.error_for(target_dir)}")
+                target_exists = fs_cache.exists(operation.target_path)
+            else:
+                if not os.path.exists(target_dir):
+                    # exist_ok: a concurrent operation may create the same folder
+                    os.makedirs(target_dir, exist_ok=True)
+                    self.logger.info("Created directory: %s", target_dir)
+                # lexists: a dangling symlink still occupies the name
+                target_exists = os.path.lexists(operation.target_path)
             
             # Check if target already exists
-            if os.path.exists(operation.target_path):
+            if target_exists:
                 self.logger.warning(f"Target file already exists: {operation.target_path}")
                 operation.error_message = "Target file already exists"
                 return False
             
             # Perform the operation
-            if operation.operation_type == "move":
-                shutil.move(operation.source_path, operation.target_path)
-            elif operation.operation_type == "copy":
-                shutil.copy2(operation.source_path, operation.target_path)
-            else:  # rename (default)
-                os.rename(operation.source_path, operation.target_path)
+            if operation.operation_type == "copy":
+                method = self.copy_engine.copy(operation.source_path, operation.target_path,
+                                               self.progress_callback)
+                operation.bytes_transferred = os.path.getsize(operation.target_path)
+                self.logger.info("Copied (%s): %s -> %s", method, operation.source_path, operation.target_path)
+            elif operation.operation_type == "hardlink":
+                self._hardlink(operation)
+            elif operation.operation_type == "symlink":
+                os.symlink(os.path.abspath(operation.source_path), operation.target_path)
+                self.logger.info("Symlinked: %s -> %s", operation.target_path, operation.source_path)
+            else:  # rename (default) or move
+                try:
+                    os.rename(operation.source_path, operation.target_path)
+                    self.logger.info("Renamed: %s -> %s", operation.source_path, operation.target_path)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    # Target is on another filesystem: copy, verify, then unlink the source
+                    method = self.copy_engine.move(operation.source_path, operation.target_path,
+                                                   self.progress_callback)
+                    operation.bytes_transferred = os.path.getsize(operation.target_path)
+                    self.logger.info("Moved (%s): %s -> %s", method, operation.source_path, operation.target_path)
+            
+            if fs_cache is not None:
+                fs_cache.add(operation.target_path)
+                if operation.operation_type not in KEEPS_SOURCE_TYPES:
+                    fs_cache.discard(operation.source_path)
             
-            self.logger.info(f"Renamed: {operation.source_path} -> {operation.target_path}")
             operation.success = True
             return True
             
@@ -505,57 +626,364 @@ class MediaRenamer:
             operation.success = False
             return False
     
-    def plan_operations(self, media_files: List[MediaFileInfo]) -> List[RenameOperation]:
+    def _hardlink(self, operation: RenameOperation):
         """
-        Plan rename operations for a list of media files.
+        Hardlink the source into place, copying when a link is impossible.
         
         Args:
-            media_files: List of MediaFileInfo objects
+            operation: RenameOperation with operation_type "hardlink"
+        """
+        if same_filesystem(operation.source_path, operation.target_path):
+            try:
+                os.link(operation.source_path, operation.target_path)
+                self.logger.info("Hardlinked: %s -> %s", operation.source_path, operation.target_path)
+                return
+            except OSError as e:
+                if e.errno not in LINK_FALLBACK_ERRNOS:
+                    raise
+                reason = e.strerror
+        else:
+            reason = "source and target are on different filesystems"
+        
+        self.logger.warning(f"Cannot hardlink {operation.source_path} ({reason}); copying instead")
+        method = self.copy_engine.copy(operation.source_path, operation.target_path, self.progress_callback)
+        operation.bytes_transferred = os.path.getsize(operation.target_path)
+        self.logger.info("Copied (%s): %s -> %s", method, operation.source_path, operation.target_path)
+    
+    def plan_operation(self, media_info: MediaFileInfo) -> Optional[RenameOperation]:
+        """
+        Plan the rename operation for a single media file.
+        
+        Args:
+            media_info: Parsed media file information
             
         Returns:
-            List of RenameOperation objects
+            RenameOperation, or None if the file could not be planned
         """
-        operations = []
-        
-        for media_info in media_files:
+        start = time.perf_counter()
+        with span('plan_operation', **{'file.path': media_info.file_path,
+                                       'media.type': media_info.media_type}) as plan_span:
             try:
                 if media_info.media_type == 'movie':
-                    operation = self.plan_movie_rename(media_info)
+                    return self.plan_movie_rename(media_info)
                 elif media_info.media_type == 'tv':
-                    operation = self.plan_tv_rename(media_info)
-                else:
-                    self.logger.warning(f"Unknown media type for {media_info.file_path}")
-                    continue
+                    return self.plan_tv_rename(media_info)
                 
-                operations.append(operation)
+                self.logger.warning(f"Unknown media type for {media_info.file_path}")
                 
             except Exception as e:
                 self.logger.error(f"Error planning operation for {media_info.file_path}: {e}")
+                plan_span.record_error(e)
+            
+            finally:
+                observe_slow('files', media_info.file_path, time.perf_counter() - start)
         
-        return operations
+        return None
+    
+    def plan_operations(self, media_files: List[MediaFileInfo], max_workers: int = 1,
+                        on_complete=None, cancel_event=None) -> List[RenameOperation]:
+        """
+        Plan rename operations for a list of media files.
+        
+        Args:
+            media_files: List of MediaFileInfo objects
+            max_workers: Number of files planned concurrently; metadata
+                lookups are network bound, so this usually matches the
+                [NETWORK] max_workers setting
+            on_complete: Optional callback invoked with (media_info, operation)
+                as each file is planned, in completion order (from worker
+                threads; operation is None if the file could not be planned)
+            cancel_event: Optional threading.Event; once set, files not yet
+                started are not planned
+            
+        Returns:
+            List of RenameOperation objects, in input order
+        """
+        def plan(media_info: MediaFileInfo) -> Optional[RenameOperation]:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            operation = self.plan_operation(media_info)
+            if on_complete is not None:
+                on_complete(media_info, operation)
+            return operation
+        
+        with span('plan_operations', **{'files.count': len(media_files)}):
+            if max_workers <= 1:
+                planned = [plan(media_info) for media_info in media_files]
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # Each task carries the caller's context, so lookups count toward its
+                    # job report and trace
+                    futures = [executor.submit(run_in_context(plan), media_info)
+                               for media_info in media_files]
+                    planned = [future.result() for future in futures]
+        
+        return [operation for operation in planned if operation is not None]
     
     def execute_operations(self, operations: List[RenameOperation], 
-                          dry_run: bool = True) -> Dict[str, int]:
+                          dry_run: bool = True, on_complete=None, cancel_event=None,
+                          journal_info: Optional[Dict] = None) -> Dict:
         """
         Execute a list of rename operations.
         
+        Operations are validated first; ones with conflicts and no-ops are
+        skipped. The rest are grouped by source/target device and applied in
+        parallel; see OperationExecutor.
+        
         Args:
             operations: List of RenameOperation objects
             dry_run: If True, don't actually perform the operations
+            on_complete: Optional callback invoked with each executed operation
+                (from worker threads; skipped and cancelled operations are not reported)
+            cancel_event: Optional threading.Event; once set, operations not yet
+                started are left undone and the journal stays resumable
+            journal_info: Details kept with the apply's journal (see Journal.create)
             
         Returns:
-            Dictionary with success/failure counts
+            Dictionary with success/failure counts, timing and throughput
+        """
+        # One listing per target directory serves validation and execution
+        fs_cache = DirectoryCache()
+        with timed_stage('validate'), span('validate_operations', **{'operations.count': len(operations)}):
+            report = self.validate_operations(operations, fs_cache)
+        runnable = []
+        for index, operation in enumerate(operations):
+            if index in report.blocked:
+                operation.success = False
+                operation.error_message = '; '.join(issue['message'] for issue in operation.issues)
+            elif index in report.noops:
+                # Already where it belongs; nothing to do
+                operation.success = True
+                operation.error_message = None
+            else:
+                runnable.append(operation)
+                operation.applied = not dry_run
+        
+        with timed_stage('execute'), span('execute_operations', **{'operations.count': len(runnable),
+                                                                    'operation.dry_run': dry_run}):
+            if dry_run or not runnable:
+                results = OperationExecutor.from_config(self, self.config).execute(
+                    runnable, dry_run, on_complete=on_complete, cancel_event=cancel_event
+                )
+            else:
+                results = self._execute_journaled(self.journals.begin(runnable, journal_info), runnable, fs_cache,
+                                                  on_complete=on_complete, cancel_event=cancel_event)
+        results['skipped'] = len(operations) - len(runnable)
+        add_count('operations', len(runnable))
+        add_count('directories', len({os.path.dirname(op.target_path) for op in runnable}))
+        add_count('bytes', results['bytes_transferred'])
+        for timing in results['timings']:
+            observe_slow('operations', timing['source_path'], timing['seconds'],
+                         target_path=timing['target_path'], success=timing['success'])
+        results['validation'] = report.summary()
+        
+        self.logger.info(
+            f"Operation results: success={results['success']}, "
+            f"failed={results['failed']}, skipped={results['skipped']}"
+        )
+        return results
+    
+    def validate_operations(self, operations: List[RenameOperation],
+                            fs_cache: Optional[DirectoryCache] = None) -> ValidationReport:
         """
-        results = {"success": 0, "failed": 0, "skipped": 0}
+        Check planned operations for conflicts in one pass and annotate them.
         
+        Args:
+            operations: List of RenameOperation objects
+            fs_cache: Optional directory cache to read target listings through
+            
+        Returns:
+            ValidationReport; each operation's issues are also stored on it
+        """
+        report = OperationValidator.from_config(self.config).validate(operations, fs_cache)
         for operation in operations:
-            if self.execute_operation(operation, dry_run):
-                results["success"] += 1
-            else:
-                results["failed"] += 1
+            operation.issues = []
+        for issue in report.issues:
+            operations[issue.index].issues.append(issue.to_dict())
+        return report
+    
+    def _execute_journaled(self, journal: Journal, operations: List[RenameOperation],
+                           fs_cache: Optional[DirectoryCache] = None, on_complete=None,
+                           cancel_event=None) -> Dict:
+        """Execute operations, recording each outcome in the journal, then release its lock."""
+        try:
+            return self._run_journaled(journal, operations, fs_cache, on_complete, cancel_event)
+        finally:
+            journal.release()
+    
+    def _run_journaled(self, journal: Journal, operations: List[RenameOperation],
+                       fs_cache: Optional[DirectoryCache], on_complete, cancel_event) -> Dict:
+        def record(operation):
+            journal.record(operation)
+            if on_complete is not None:
+                on_complete(operation)
+        
+        executor = OperationExecutor.from_config(self, self.config)
+        try:
+            results = executor.execute(operations, False, on_complete=record, fs_cache=fs_cache,
+                                       cancel_event=cancel_event)
+        finally:
+            journal.flush()
+        
+        results['journal_id'] = journal.journal_id
+        if results['cancelled']:
+            # Operations that never ran stay unsettled, so the apply can be resumed
+            return results
+        journal.commit()
+        
+        if not self.config.get_boolean('GENERAL', 'backup_original_names', True) and results['failed'] == 0:
+            # The journal doubles as the record of original names; without backups it is only crash insurance
+            self.journals.delete(journal.journal_id)
+            results['journal_id'] = None
+        return results
+    
+    def resume_journal(self, journal_id: str, on_complete=None, cancel_event=None) -> Dict:
+        """
+        Finish an interrupted apply from its journal, without rescanning.
+        
+        Operations the journal has no outcome for are checked against the
+        filesystem: ones that evidently completed are recorded as done, the
+        rest are executed.
         
-        self.logger.info(f"Operation results: {results}")
+        Args:
+            journal_id: ID of the journal to resume
+            on_complete: Optional callback invoked with each operation the
+                resume settles, including ones found already applied or missing
+                (from worker threads)
+            cancel_event: Optional threading.Event; once set, operations not yet
+                started are left for another resume
+            
+        Returns:
+            Execution results for the operations that were still pending,
+            plus 'recovered' (completed before the interruption) and 'missing'
+            
+        Raises:
+            JournalBusy: If an apply, resume or undo is still working on it
+        """
+        journal = self.journals.open(journal_id, lock=True)
+        try:
+            return self._resume(journal, on_complete, cancel_event)
+        finally:
+            journal.release()
+    
+    def _resume(self, journal: Journal, on_complete, cancel_event) -> Dict:
+        journal_id = journal.journal_id
+        if journal.undone:
+            raise ValueError(f"Journal {journal_id} has been undone")
+        pending = []
+        recovered = missing = 0
+        
+        for entry in journal.unsettled():
+            operation = RenameOperation(entry.source, entry.target, entry.operation_type)
+            operation.journal_seq = entry.seq
+            operation.applied = True
+            state = entry.reconcile()
+            if state is None:
+                operation.error_message = "Neither source nor target exists"
+                missing += 1
+            elif state:
+                operation.success = True
+                recovered += 1
+            else:
+                pending.append(operation)
+                continue
+            journal.record(operation)
+            if on_complete is not None:
+                on_complete(operation)
+        
+        self.logger.info(f"Resuming journal {journal_id}: {len(pending)} pending, "
+                         f"{recovered} already applied, {missing} missing")
+        results = self._execute_journaled(journal, pending, on_complete=on_complete, cancel_event=cancel_event)
+        results['recovered'] = recovered
+        results['missing'] = missing
         return results
+    
+    def undo_operation(self, source_path: str, target_path: str, operation_type: str):
+        """
+        Reverse one applied operation.
+        
+        Args:
+            source_path: Original location of the file
+            target_path: Location the operation produced
+            operation_type: Type of the applied operation
+            
+        Raises:
+            OSError: If the operation cannot be reversed safely
+        """
+        if operation_type in KEEPS_SOURCE_TYPES:
+            if operation_type != 'symlink' and not os.path.exists(source_path):
+                # The target is now the only copy of the data; keep it
+                raise OSError(errno.ENOENT, "Original is gone; keeping the target", source_path)
+            if os.path.lexists(target_path):
+                os.unlink(target_path)
+            return
+        
+        if os.path.lexists(source_path):
+            raise OSError(errno.EEXIST, "Original path is occupied", source_path)
+        os.makedirs(os.path.dirname(source_path) or '.', exist_ok=True)
+        try:
+            os.rename(target_path, source_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            self.copy_engine.move(target_path, source_path, self.progress_callback)
+    
+    def undo_journal(self, journal_id: str, on_complete=None, cancel_event=None) -> Dict:
+        """
+        Roll back an apply by replaying its journal in reverse.
+        
+        Args:
+            journal_id: ID of the journal to undo
+            on_complete: Optional callback invoked with a RenameOperation for
+                each operation reverted (applied is False again)
+            cancel_event: Optional threading.Event; once set, the remaining
+                operations are left applied and the undo can be run again
+            
+        Returns:
+            Dictionary with undone/failed counts and per-file errors
+            
+        Raises:
+            JournalBusy: If an apply, resume or undo is still working on it
+        """
+        journal = self.journals.open(journal_id, lock=True)
+        try:
+            return self._undo(journal, on_complete, cancel_event)
+        finally:
+            journal.release()
+    
+    def _undo(self, journal: Journal, on_complete, cancel_event) -> Dict:
+        journal_id = journal.journal_id
+        undone = 0
+        errors = []
+        cancelled = False
+        
+        for entry in reversed(journal.entries):
+            if not entry.ok or entry.undone:
+                continue
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+            try:
+                self.undo_operation(entry.source, entry.target, entry.operation_type)
+                journal.record_undo(entry, True)
+                undone += 1
+            except OSError as e:
+                self.logger.error(f"Error undoing {entry.target}: {e}")
+                journal.record_undo(entry, False, str(e))
+                errors.append({'source_path': entry.source, 'target_path': entry.target, 'error': str(e)})
+                continue
+            if on_complete is not None:
+                on_complete(RenameOperation(entry.source, entry.target, entry.operation_type))
+        
+        if errors or cancelled:
+            journal.flush()
+        else:
+            journal.mark_undone()
+        
+        self.logger.info(f"Undo of journal {journal_id}: {undone} reverted, {len(errors)} failed"
+                         + (" (cancelled)" if cancelled else ""))
+        return {'journal_id': journal_id, 'undone': undone, 'failed': len(errors), 'errors': errors,
+                'cancelled': cancelled}
 
     def apply_rename_operation(self, operation: RenameOperation) -> Tuple[bool, Optional[str]]:
         """
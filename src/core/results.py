@@ -0,0 +1,90 @@
+"""
+Result rows for the web API.
+
+Planned operations are turned into slim row dictionaries once, when a
+scan is stored (see JobStore), and pages of rows are served from there
+with filtering and sorting. Full metadata payloads are only sent for the
+single-result detail view.
+"""
+
+import os
+from typing import Dict, Tuple
+
+# Columns rows can be sorted by
+SORT_FIELDS = ('id', 'filename', 'new_filename', 'title', 'year', 'season', 'episode',
+               'media_type', 'metadata_status', 'status')
+
+MAX_PAGE_SIZE = 1000
+
+
+def summarize_metadata(operation) -> Tuple[str, str, str]:
+    """
+    Work out the media type and metadata status of a planned operation.
+
+    Args:
+        operation: RenameOperation with scan metadata
+
+    Returns:
+        Tuple of (media_type, metadata_status, error_message)
+    """
+    metadata = operation.metadata or {}
+    movie_meta = metadata.get('movie_metadata')
+    show_meta = metadata.get('show_metadata')
+
+    if movie_meta:
+        return 'movie', movie_meta.get('metadata_status', 'unknown'), movie_meta.get('error_message', '')
+
+    if show_meta:
+        # Episode lookups are skipped when the show is unknown, leaving None
+        episode_meta = metadata.get('episode_metadata') or {}
+        show_status = show_meta.get('metadata_status', 'unknown')
+        episode_status = episode_meta.get('metadata_status', 'unknown')
+
+        if show_status != 'found':
+            return 'tv', show_status, show_meta.get('error_message', '')
+        if episode_status != 'found':
+            return 'tv', 'partial', episode_meta.get('error_message', 'Episode metadata not found')
+        return 'tv', 'found', ''
+
+    return 'unknown', 'unknown', ''
+
+
+def operation_status(operation) -> str:
+    """Return the display status of a planned (or applied) operation."""
+    if operation.applied:
+        return 'Applied' if operation.success else 'Failed'
+    if any(issue['blocking'] for issue in operation.issues):
+        return 'Conflict'
+    return 'Ready'
+
+
+def build_result_row(index: int, operation) -> Dict:
+    """
+    Build the slim row sent to the results table.
+
+    Args:
+        index: Position of the operation in the current scan
+        operation: RenameOperation
+
+    Returns:
+        Row dictionary without raw metadata payloads
+    """
+    media_info = (operation.metadata or {}).get('media_info') or {}
+    media_type, metadata_status, error_message = summarize_metadata(operation)
+    return {
+        'id': index,
+        'source_path': operation.source_path,
+        'target_path': operation.target_path,
+        'filename': os.path.basename(operation.source_path),
+        'new_filename': os.path.basename(operation.target_path),
+        'title': media_info.get('title') or '',
+        'year': media_info.get('year') or '',
+        'season': media_info.get('season') or '',
+        'episode': media_info.get('episode') or '',
+        'media_type': media_type,
+        'operation_type': operation.operation_type,
+        'status': operation_status(operation),
+        'issues': operation.issues,
+        'metadata_status': metadata_status,
+        'error_message': error_message or ''
+    }
@@ -0,0 +1,169 @@
+"""
+Planning-time validation of rename operations.
+
+A single pass over the planned operations builds a hash index of
+normalized target paths and checks each target against a case-folded
+listing of its directory (read once per directory). It finds duplicate
+targets, case-only collisions (which clash on SMB and other
+case-insensitive shares), targets that already exist, overlong paths and
+no-op renames before anything touches the disk.
+"""
+
+import os
+from typing import Dict, List, Optional, Set
+
+from src.utils.fscache import DirectoryCache
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Issue kinds that stop an operation from being executed
+BLOCKING_ISSUES = {'duplicate_target', 'case_collision', 'target_exists', 'path_too_long'}
+
+# Platform limits; MAX_PATH on Windows, PATH_MAX on POSIX
+DEFAULT_MAX_PATH_LENGTH = 260 if os.name == 'nt' else 4096
+DEFAULT_MAX_NAME_LENGTH = 255
+
+
+class ValidationIssue:
+    """A problem found with one planned operation."""
+
+    def __init__(self, index: int, kind: str, message: str, other: Optional[int] = None):
+        self.index = index  # Position of the operation in the validated list
+        self.kind = kind
+        self.message = message
+        self.other = other  # Index of the conflicting operation, if any
+
+    @property
+    def blocking(self) -> bool:
+        return self.kind in BLOCKING_ISSUES
+
+    def to_dict(self) -> Dict:
+        return {
+            'index': self.index,
+            'kind': self.kind,
+            'message': self.message,
+            'other': self.other,
+            'blocking': self.blocking
+        }
+
+
+class ValidationReport:
+    """Issues found by OperationValidator, indexed by operation."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.issues: List[ValidationIssue] = []
+        self.blocked: Set[int] = set()
+        self.noops: Set[int] = set()
+
+    def add(self, issue: ValidationIssue):
+        self.issues.append(issue)
+        if issue.blocking:
+            self.blocked.add(issue.index)
+        elif issue.kind == 'noop':
+            self.noops.add(issue.index)
+
+    def summary(self) -> Dict:
+        """Return issue counts by kind plus blocked/no-op totals."""
+        counts: Dict[str, int] = {}
+        for issue in self.issues:
+            counts[issue.kind] = counts.get(issue.kind, 0) + 1
+        return {
+            'total': self.total,
+            'blocked': len(self.blocked),
+            'noops': len(self.noops),
+            'counts': counts
+        }
+
+
+class OperationValidator:
+    """Detects conflicts among planned operations in one O(n) pass."""
+
+    def __init__(self, max_path_length: int = DEFAULT_MAX_PATH_LENGTH,
+                 max_name_length: int = DEFAULT_MAX_NAME_LENGTH):
+        """
+        Initialize the validator.
+
+        Args:
+            max_path_length: Longest allowed target path, in characters
+            max_name_length: Longest allowed path component, in characters
+        """
+        self.max_path_length = max_path_length
+        self.max_name_length = max_name_length
+
+    @classmethod
+    def from_config(cls, config) -> 'OperationValidator':
+        """Build a validator from the [EXECUTION] configuration section."""
+        return cls(
+            max_path_length=config.get_int('EXECUTION', 'max_path_length', DEFAULT_MAX_PATH_LENGTH),
+            max_name_length=config.get_int('EXECUTION', 'max_name_length', DEFAULT_MAX_NAME_LENGTH)
+        )
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+    def validate(self, operations: List, fs_cache: Optional[DirectoryCache] = None) -> ValidationReport:
+        """
+        Check planned operations for conflicts.
+
+        Args:
+            operations: RenameOperation objects, in execution order
+            fs_cache: Optional directory cache to share listings with execution
+
+        Returns:
+            ValidationReport; later operations lose to earlier ones on conflicts
+        """
+        report = ValidationReport(len(operations))
+        fs_cache = fs_cache or DirectoryCache()
+        targets: Dict[str, int] = {}  # case-folded normalized target -> first operation index
+        exact_targets: Dict[str, str] = {}  # case-folded -> normalized target as planned
+
+        for index, operation in enumerate(operations):
+            source = self._normalize(operation.source_path)
+            target = self._normalize(operation.target_path)
+            folded = target.casefold()
+
+            if source == target:
+                report.add(ValidationIssue(index, 'noop', "Source and target are the same"))
+                continue
+
+            if len(operation.target_path) > self.max_path_length:
+                report.add(ValidationIssue(
+                    index, 'path_too_long',
+                    f"Target path is {len(operation.target_path)} characters (limit {self.max_path_length})"
+                ))
+            else:
+                longest = max((len(part) for part in operation.target_path.replace('\\', '/').split('/')), default=0)
+                if longest > self.max_name_length:
+                    report.add(ValidationIssue(
+                        index, 'path_too_long',
+                        f"A path component is {longest} characters (limit {self.max_name_length})"
+                    ))
+
+            directory, name = os.path.split(os.path.abspath(operation.target_path))
+            existing = fs_cache.listing(directory).get(name.casefold())
+            # A case-only rename of the file itself finds its own source in the listing
+            if existing is not None and source.casefold() != folded:
+                if existing == name:
+                    report.add(ValidationIssue(index, 'target_exists', "Target file already exists"))
+                else:
+                    report.add(ValidationIssue(
+                        index, 'case_collision', f"Differs only in case from existing '{existing}'"
+                    ))
+
+            first = targets.get(folded)
+            if first is None:
+                targets[folded] = index
+                exact_targets[folded] = target
+            else:
+                kind = 'duplicate_target' if exact_targets[folded] == target else 'case_collision'
+                report.add(ValidationIssue(
+                    index, kind, f"Same target as {os.path.basename(operations[first].source_path)}", first
+                ))
+
+        if report.issues:
+            logger.info(f"Validation found {len(report.issues)} issues in {len(operations)} operations "
+                        f"({len(report.blocked)} blocked)")
+        return report
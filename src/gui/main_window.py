@@ -5,18 +5,57 @@ Main GUI window for the Plex Media Renamer application.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
+import queue
 import threading
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.utils.config import Config
+from src.utils.events import EventBatcher
+from src.utils.jobreport import JobReport, cancellation
 from src.utils.logger import get_logger
+from src.utils.profiling import ProfileSession, ProfileStore
+from src.utils.tracing import configure_tracing
 from src.core.file_parser import FileParser, MediaFileInfo
-from src.core.renamer import MediaRenamer, RenameOperation
+from src.core.renamer import OPERATION_TYPES, MediaRenamer, RenameOperation
 from src.gui.settings_dialog import SettingsDialog
 from src.gui.preview_dialog import PreviewDialog
+from src.gui.virtual_tree import VirtualTreeview
 
 logger = get_logger(__name__)
 
+# How often the Tk loop applies events queued by worker threads
+UI_POLL_MS = 100
+# Worker threads queue files and operations in batches of this size, or after this many seconds
+UI_BATCH_SIZE = 500
+UI_BATCH_DELAY = 0.2
+
+
+class UIEventQueue:
+    """
+    Thread-safe queue of (event type, data) pairs drained by the Tk loop.
+    
+    It has EventBus's publish method, so an EventBatcher can coalesce a
+    worker's per-file items into batches on it.
+    """
+    
+    def __init__(self):
+        self._queue = queue.Queue()
+    
+    def publish(self, event_type: str, data: Any):
+        """Queue an event (from any thread)."""
+        self._queue.put((event_type, data))
+    
+    def drain(self, limit: int = 100) -> List[Tuple[str, Any]]:
+        """Return up to limit queued events without waiting."""
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+
 class PlexRenamerApp:
     """Main application window."""
     
@@ -29,14 +68,23 @@ class PlexRenamerApp:
         """
         self.root = root
         self.config = Config()
+        configure_tracing(self.config)
         self.file_parser = FileParser()
         self.media_renamer = MediaRenamer(self.config)
         
         self.media_files: List[MediaFileInfo] = []
         self.rename_operations: List[RenameOperation] = []
+        self.media_types: Dict[str, str] = {}  # Source path -> media type, for the file list icons
+        self.show_outcome = False  # File list shows execution results instead of validation
         self.is_processing = False
+        self.cancel_event: Optional[threading.Event] = None
+        self.progress = {'done': 0, 'total': 0}
+        # Worker threads never touch widgets; they queue events applied by _poll_ui_events
+        self.ui_events = UIEventQueue()
+        self.profile_var = tk.BooleanVar(value=False)
         
         self.setup_ui()
+        self.root.after(UI_POLL_MS, self._poll_ui_events)
         self.check_configuration()
     
     def setup_ui(self):
@@ -96,10 +144,18 @@ class PlexRenamerApp:
         
         ttk.Button(control_frame, text="Scan Files", command=self.scan_files).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(control_frame, text="Preview Changes", command=self.preview_changes).pack(side=tk.LEFT, padx=(0, 10))
+        self.cancel_button = ttk.Button(control_frame, text="Cancel", command=self.cancel_task, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=(0, 10))
         
         self.dry_run_var = tk.BooleanVar(value=self.config.dry_run_mode)
         ttk.Checkbutton(control_frame, text="Dry Run Mode", variable=self.dry_run_var).pack(side=tk.LEFT, padx=(20, 10))
         
+        ttk.Label(control_frame, text="Mode:").pack(side=tk.LEFT, padx=(10, 5))
+        self.operation_mode_var = tk.StringVar(value=self.media_renamer.operation_mode)
+        mode_combo = ttk.Combobox(control_frame, textvariable=self.operation_mode_var, width=10, state="readonly")
+        mode_combo['values'] = OPERATION_TYPES
+        mode_combo.pack(side=tk.LEFT)
+        
         ttk.Button(control_frame, text="Apply Changes", command=self.apply_changes).pack(side=tk.RIGHT)
         
         # File list frame
@@ -127,6 +183,8 @@ class PlexRenamerApp:
         v_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.file_tree.yview)
         h_scrollbar = ttk.Scrollbar(list_frame, orient=tk.HORIZONTAL, command=self.file_tree.xview)
         self.file_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        # Rows are media files after a scan and rename operations after planning
+        self.file_list = VirtualTreeview(self.file_tree, v_scrollbar, self._format_file_row)
         
         # Grid treeview and scrollbars
         self.file_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -150,6 +208,14 @@ class PlexRenamerApp:
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
         
+        # Tools menu
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Undo Last Apply", command=self.undo_last_apply)
+        tools_menu.add_command(label="Resume Interrupted Apply", command=self.resume_interrupted_apply)
+        tools_menu.add_separator()
+        tools_menu.add_checkbutton(label="Profile Scans (saved to logs)", variable=self.profile_var)
+        
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
@@ -205,7 +271,9 @@ class PlexRenamerApp:
         dialog = SettingsDialog(self.root, self.config)
         if dialog.result:
             # Refresh the media renamer with new config
+            self.media_renamer.close()
             self.media_renamer = MediaRenamer(self.config)
+            self.operation_mode_var.set(self.media_renamer.operation_mode)
             self.update_path_display()
             self.status_var.set("Configuration updated")
     
@@ -230,49 +298,85 @@ class PlexRenamerApp:
             messagebox.showerror("Error", f"Path not found: {path}")
             return
         
-        self.is_processing = True
         self.status_var.set("Scanning files...")
         self.clear_file_list()
+        self.media_files = []
+        self.rename_operations = []
         
-        # Run scan in separate thread to avoid blocking UI
-        thread = threading.Thread(target=self._scan_files_thread, args=(path, media_type))
-        thread.daemon = True
-        thread.start()
+        # Files are shown as they are parsed; the scan runs in a separate thread to avoid blocking UI
+        self._start_task(self._scan_files_thread, path, media_type, self.profile_var.get())
     
-    def _scan_files_thread(self, path: str, media_type: str):
+    def _scan_files_thread(self, path: str, media_type: str, profile: bool, cancel_event: threading.Event):
         """Thread function for scanning files."""
+        report = JobReport()
+        files = EventBatcher(self.ui_events, 'files', max_items=UI_BATCH_SIZE, max_delay=UI_BATCH_DELAY)
+        media_files = []
         try:
             # Convert media type for parser
             parser_type = "movie" if media_type == "movies" else "tv"
-            self.media_files = self.file_parser.scan_directory(path, parser_type)
-            
-            # Update UI in main thread
-            self.root.after(0, self._update_file_list)
+            with report.activate(), report.stage('scan'):
+                media_files = self._run_profiled('scan', profile, lambda: self.file_parser.scan_directory(
+                    path, parser_type, on_file=files.add, cancel_event=cancel_event))
             
         except Exception as e:
             logger.error(f"Error scanning files: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Scan Error", f"Error scanning files: {e}"))
+            self.ui_events.publish('error', {'title': "Scan Error", 'message': f"Error scanning files: {e}"})
         
         finally:
-            self.is_processing = False
-            self.root.after(0, lambda: self.status_var.set(f"Found {len(self.media_files)} files"))
+            files.flush()
+            report.finish()
+            outcome = "Scan cancelled" if cancel_event.is_set() else "Found"
+            self.ui_events.publish('finished', {
+                'task': 'scan',
+                'result': media_files,
+                'status': f"{outcome} {len(media_files)} files - {report.summary()}"
+            })
+    
+    def _run_profiled(self, label: str, profile: bool, body):
+        """
+        Run body, profiling the calling thread if asked to.
+        
+        The report (pstats data, text summary and stack samples) is written
+        to the [PROFILING] directory, logs/profiles by default.
+        
+        Args:
+            label: Name of the profiled step
+            profile: Whether to profile; read from profile_var on the Tk thread
+            body: Callable to run
+            
+        Returns:
+            Whatever body returns
+        """
+        if not profile:
+            return body()
+        interval = max(0.001, self.config.get_float('PROFILING', 'sample_interval_ms', 5) / 1000)
+        session = ProfileSession(f'gui-{label}', sample_interval=interval)
+        try:
+            with session.profile_thread():
+                return body()
+        finally:
+            try:
+                ProfileStore.from_config(self.config).save(session)
+            except OSError as e:
+                logger.warning(f"Could not save {label} profile: {e}")
     
     def clear_file_list(self):
         """Clear the file list display."""
-        for item in self.file_tree.get_children():
-            self.file_tree.delete(item)
+        self.file_list.clear()
     
-    def _update_file_list(self):
-        """Update the file list display with scanned files."""
-        self.clear_file_list()
-        
-        for media_file in self.media_files:
-            file_type = "📽️" if media_file.media_type == "movie" else "📺"
-            relative_path = os.path.relpath(media_file.file_path)
-            
-            self.file_tree.insert("", tk.END, 
-                                text=file_type,
-                                values=(relative_path, "Pending analysis...", "Scanned"))
+    def _format_file_row(self, row) -> Tuple[str, Tuple[str, str, str]]:
+        """Return the icon and column values of a file list row (a media file or an operation)."""
+        if isinstance(row, MediaFileInfo):
+            file_type = "📽️" if row.media_type == "movie" else "📺"
+            return file_type, (os.path.relpath(row.file_path), "Pending analysis...", "Scanned")
+        
+        file_type = "📽️" if self.media_types.get(row.source_path) == "movie" else "📺"
+        if self.show_outcome:
+            status = "✅ Success" if row.success else "❌ Failed"
+        else:
+            blocking = [issue['message'] for issue in row.issues if issue['blocking']]
+            status = f"⚠️ {blocking[0]}" if blocking else "Ready"
+        return file_type, (os.path.relpath(row.source_path), os.path.relpath(row.target_path), status)
     
     def preview_changes(self):
         """Preview the planned rename operations."""
@@ -283,46 +387,55 @@ class PlexRenamerApp:
         if self.is_processing:
             return
         
-        self.is_processing = True
         self.status_var.set("Planning rename operations...")
+        # Operations replace the scanned files in the list as they are planned
+        self.media_types = {media_file.file_path: media_file.media_type for media_file in self.media_files}
+        self.show_outcome = False
+        self.file_list.clear()
+        self.rename_operations = []
+        self.progress = {'done': 0, 'total': len(self.media_files)}
         
         # Run planning in separate thread
-        thread = threading.Thread(target=self._plan_operations_thread)
-        thread.daemon = True
-        thread.start()
+        self._start_task(self._plan_operations_thread, list(self.media_files), self.profile_var.get())
     
-    def _plan_operations_thread(self):
+    def _plan_operations_thread(self, media_files: List[MediaFileInfo], profile: bool,
+                                cancel_event: threading.Event):
         """Thread function for planning rename operations."""
+        report = JobReport()
+        planned = EventBatcher(self.ui_events, 'planned', max_items=UI_BATCH_SIZE, max_delay=UI_BATCH_DELAY)
+        operations = []
         try:
-            self.rename_operations = self.media_renamer.plan_operations(self.media_files)
-            
-            # Update UI in main thread
-            self.root.after(0, self._update_preview)
+            with report.activate(), cancellation(cancel_event):
+                with report.stage('plan'):
+                    operations = self._run_profiled('plan', profile, lambda: self.media_renamer.plan_operations(
+                        media_files,
+                        max_workers=self.config.get_int('NETWORK', 'max_workers', 4),
+                        on_complete=lambda media_file, operation: planned.add(operation),
+                        cancel_event=cancel_event
+                    ))
+                if not cancel_event.is_set():
+                    with report.stage('validate'):
+                        self.media_renamer.validate_operations(operations)
             
         except Exception as e:
             logger.error(f"Error planning operations: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Planning Error", f"Error planning operations: {e}"))
+            self.ui_events.publish('error', {'title': "Planning Error",
+                                             'message': f"Error planning operations: {e}"})
         
         finally:
-            self.is_processing = False
-            self.root.after(0, lambda: self.status_var.set(f"Planned {len(self.rename_operations)} operations"))
+            planned.flush()
+            report.finish()
+            outcome = "Planning cancelled after" if cancel_event.is_set() else "Planned"
+            self.ui_events.publish('finished', {
+                'task': 'plan',
+                'result': operations,
+                'cancelled': cancel_event.is_set(),
+                'status': f"{outcome} {len(operations)} operations - {report.summary()}"
+            })
     
     def _update_preview(self):
-        """Update the file list with planned operations."""
-        # Clear current list
-        self.clear_file_list()
-        
-        # Add operations to list
-        for i, operation in enumerate(self.rename_operations):
-            media_file = self.media_files[i]
-            file_type = "📽️" if media_file.media_type == "movie" else "📺"
-            
-            relative_source = os.path.relpath(operation.source_path)
-            relative_target = os.path.relpath(operation.target_path)
-            
-            self.file_tree.insert("", tk.END,
-                                text=file_type,
-                                values=(relative_source, relative_target, "Ready"))
+        """Show the validation status of the planned operations and open the preview."""
+        self.file_list.refresh()
         
         # Show preview dialog
         if self.rename_operations:
@@ -336,10 +449,11 @@ class PlexRenamerApp:
         
         dry_run = self.dry_run_var.get()
         action = "simulate" if dry_run else "execute"
+        operation_mode = self.operation_mode_var.get()
         
         result = messagebox.askyesno(
             "Confirm Changes",
-            f"Are you sure you want to {action} {len(self.rename_operations)} rename operations?"
+            f"Are you sure you want to {action} {len(self.rename_operations)} {operation_mode} operations?"
         )
         
         if not result:
@@ -348,29 +462,186 @@ class PlexRenamerApp:
         if self.is_processing:
             return
         
-        self.is_processing = True
         self.status_var.set(f"{'Simulating' if dry_run else 'Executing'} operations...")
+        self.progress = {'done': 0, 'total': len(self.rename_operations)}
+        
+        for operation in self.rename_operations:
+            operation.operation_type = operation_mode
         
         # Run operations in separate thread
-        thread = threading.Thread(target=self._execute_operations_thread, args=(dry_run,))
-        thread.daemon = True
-        thread.start()
+        self._start_task(self._execute_operations_thread, dry_run)
     
-    def _execute_operations_thread(self, dry_run: bool):
+    def _execute_operations_thread(self, dry_run: bool, cancel_event: threading.Event):
         """Thread function for executing rename operations."""
+        report = JobReport()
+        applied = EventBatcher(self.ui_events, 'applied', max_items=UI_BATCH_SIZE, max_delay=UI_BATCH_DELAY)
+        results = None
         try:
-            results = self.media_renamer.execute_operations(self.rename_operations, dry_run)
-            
-            # Update UI in main thread
-            self.root.after(0, lambda: self._show_results(results, dry_run))
+            with report.activate():
+                results = self.media_renamer.execute_operations(
+                    self.rename_operations, dry_run, on_complete=applied.add, cancel_event=cancel_event)
             
         except Exception as e:
             logger.error(f"Error executing operations: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Execution Error", f"Error executing operations: {e}"))
+            self.ui_events.publish('error', {'title': "Execution Error",
+                                             'message': f"Error executing operations: {e}"})
         
         finally:
-            self.is_processing = False
-            self.root.after(0, lambda: self.status_var.set("Ready"))
+            applied.flush()
+            report.finish()
+            outcome = "cancelled" if cancel_event.is_set() else "finished"
+            self.ui_events.publish('finished', {
+                'task': 'apply',
+                'result': results,
+                'dry_run': dry_run,
+                'status': f"{'Dry run' if dry_run else 'Apply'} {outcome} - {report.summary()}"
+            })
+    
+    def _start_task(self, target, *args):
+        """
+        Run a scan, plan, apply or journal action in a worker thread.
+        
+        The worker gets a cancel event as its last argument and reports back
+        through self.ui_events, ending with a 'finished' event.
+        """
+        self.is_processing = True
+        self.cancel_event = threading.Event()
+        self.cancel_button.config(state=tk.NORMAL)
+        
+        thread = threading.Thread(target=target, args=args + (self.cancel_event,))
+        thread.daemon = True
+        thread.start()
+    
+    def cancel_task(self):
+        """Ask the running task to stop."""
+        if self.cancel_event is not None and not self.cancel_event.is_set():
+            self.cancel_event.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.status_var.set("Cancelling...")
+    
+    def _poll_ui_events(self):
+        """Apply the events worker threads queued since the last poll; runs on the Tk loop."""
+        for event_type, data in self.ui_events.drain():
+            try:
+                getattr(self, f'_on_{event_type}_event')(data)
+            except Exception as e:
+                logger.error(f"Error handling {event_type} event: {e}")
+        self.root.after(UI_POLL_MS, self._poll_ui_events)
+    
+    def _on_files_event(self, data: dict):
+        """Show a batch of scanned files."""
+        self.file_list.append_rows(data['items'])
+        self.status_var.set(f"Scanning files... {len(self.file_list)} found")
+    
+    def _on_planned_event(self, data: dict):
+        """Show a batch of planned operations (None for files that could not be planned)."""
+        self.progress['done'] += len(data['items'])
+        self.file_list.append_rows(operation for operation in data['items'] if operation is not None)
+        self.status_var.set(f"Planning rename operations... "
+                            f"{self.progress['done']} of {self.progress['total']} files")
+    
+    def _on_applied_event(self, data: dict):
+        """Count a batch of executed operations."""
+        self.progress['done'] += len(data['items'])
+        self.status_var.set(f"Applying operations... {self.progress['done']} of {self.progress['total']}")
+    
+    def _on_error_event(self, data: dict):
+        """Report a worker's error."""
+        messagebox.showerror(data['title'], data['message'])
+    
+    def _on_finished_event(self, data: dict):
+        """Take over a finished task's result and re-enable the controls."""
+        self.is_processing = False
+        self.cancel_event = None
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status_var.set(data['status'])
+        
+        if data['task'] == 'scan':
+            self.media_files = data['result']
+        elif data['task'] == 'plan':
+            # A cancelled plan is shown but not kept, as it was not validated
+            self.rename_operations = [] if data['cancelled'] else data['result']
+            self._update_preview()
+        elif data['task'] == 'journal':
+            if data['result'] is not None:
+                self._show_journal_results(data['result'])
+        elif data['result'] is not None:
+            self._show_results(data['result'], data['dry_run'])
+    
+    def _show_journal_results(self, results: dict):
+        """Show the outcome of a journal resume or undo."""
+        if 'undone' in results:
+            message = f"Reverted: {results['undone']}\nFailed: {results['failed']}"
+        else:
+            message = (f"Applied: {results['success']}\nFailed: {results['failed']}\n"
+                       f"Already applied: {results['recovered']}")
+        show = messagebox.showwarning if results['failed'] else messagebox.showinfo
+        show("Journal", message)
+    
+    def _find_journal(self, predicate) -> Optional[dict]:
+        """Return the newest journal summary matching predicate, if any."""
+        for summary in self.media_renamer.journals.list():
+            if predicate(summary):
+                return summary
+        return None
+    
+    def undo_last_apply(self):
+        """Roll back the most recent apply from its journal."""
+        if self.is_processing:
+            return
+        
+        journal = self._find_journal(lambda s: s['state'] not in ('undone', 'running') and s['completed'] > s['undone'])
+        if not journal:
+            messagebox.showinfo("Undo", "There is no apply to undo.")
+            return
+        
+        if not messagebox.askyesno(
+            "Confirm Undo",
+            f"Undo {journal['completed'] - journal['undone']} operations applied at {journal['created']}?"
+        ):
+            return
+        
+        self._run_journal_action(self.media_renamer.undo_journal, journal['id'], "Undoing")
+    
+    def resume_interrupted_apply(self):
+        """Finish the most recent interrupted apply from its journal."""
+        if self.is_processing:
+            return
+        
+        journal = self._find_journal(lambda s: s['state'] == 'interrupted')
+        if not journal:
+            messagebox.showinfo("Resume", "There is no interrupted apply to resume.")
+            return
+        
+        if not messagebox.askyesno(
+            "Confirm Resume",
+            f"Resume the apply started at {journal['created']} ({journal['pending']} operations pending)?"
+        ):
+            return
+        
+        self._run_journal_action(self.media_renamer.resume_journal, journal['id'], "Resuming")
+    
+    def _run_journal_action(self, action, journal_id: str, label: str):
+        """Run a journal resume/undo in a worker thread; the outcome arrives as a 'finished' event."""
+        self.status_var.set(f"{label} journal {journal_id}...")
+        self._start_task(self._journal_action_thread, action, journal_id)
+    
+    def _journal_action_thread(self, action, journal_id: str, cancel_event: threading.Event):
+        """Thread function for resuming or undoing an apply from its journal."""
+        results = None
+        try:
+            results = action(journal_id, cancel_event=cancel_event)
+        except Exception as e:
+            logger.error(f"Error processing journal {journal_id}: {e}")
+            self.ui_events.publish('error', {'title': "Journal Error",
+                                             'message': f"Error processing journal: {e}"})
+        finally:
+            outcome = "cancelled" if cancel_event.is_set() else "finished"
+            self.ui_events.publish('finished', {
+                'task': 'journal',
+                'result': results,
+                'status': f"Journal {journal_id} {outcome}"
+            })
     
     def _show_results(self, results: dict, dry_run: bool):
         """Show the results of the operations."""
@@ -380,6 +651,8 @@ class PlexRenamerApp:
                   f"✅ Successful: {results['success']}\n"
                   f"❌ Failed: {results['failed']}\n"
                   f"⏭️ Skipped: {results['skipped']}")
+        if results.get('cancelled'):
+            message += f"\n⏹️ Cancelled: {results['cancelled']}"
         
         if results['failed'] > 0:
             messagebox.showwarning("Results", message)
@@ -387,11 +660,5 @@ class PlexRenamerApp:
             messagebox.showinfo("Results", message)
         
         # Update status display
-        for i, operation in enumerate(self.rename_operations):
-            item_id = self.file_tree.get_children()[i]
-            status = "✅ Success" if operation.success else "❌ Failed"
-            
-            # Update the status column
-            current_values = list(self.file_tree.item(item_id, "values"))
-            current_values[2] = status
-            self.file_tree.item(item_id, values=current_values) 
\ No newline at end of file
+        self.show_outcome = True
+        self.file_list.refresh() 
\ No newline at end of file
@@ -5,8 +5,9 @@ Preview dialog for showing planned rename operations.
 import tkinter as tk
 from tkinter import ttk
 import os
-from typing import List
+from typing import List, Tuple
 from src.core.renamer import RenameOperation
+from src.gui.virtual_tree import VirtualTreeview
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -24,6 +25,7 @@ class PreviewDialog:
         """
         self.parent = parent
         self.operations = operations
+        self.shown_operation = None
         
         # Create dialog window
         self.dialog = tk.Toplevel(parent)
@@ -87,6 +89,7 @@ class PreviewDialog:
         v_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.operations_tree.yview)
         h_scrollbar = ttk.Scrollbar(list_frame, orient=tk.HORIZONTAL, command=self.operations_tree.xview)
         self.operations_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.operations_list = VirtualTreeview(self.operations_tree, v_scrollbar, self.format_operation)
         
         # Grid treeview and scrollbars
         self.operations_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -106,7 +109,7 @@ class PreviewDialog:
         details_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Bind selection event
-        self.operations_tree.bind('<<TreeviewSelect>>', self.on_selection_change)
+        self.operations_tree.bind('<<TreeviewSelect>>', self.on_selection_change, add='+')
         
         # Buttons frame
         button_frame = ttk.Frame(main_frame)
@@ -116,38 +119,29 @@ class PreviewDialog:
         ttk.Button(button_frame, text="Export List", command=self.export_list).pack(side=tk.LEFT)
     
     def populate_data(self):
-        """Populate the treeview with operation data."""
-        for i, operation in enumerate(self.operations):
-            # Determine operation type and status
-            op_type = "Movie" if "movies" in operation.target_path.lower() else "TV Show"
-            status = "Ready"
-            
-            # Get relative paths for display
-            source_rel = os.path.relpath(operation.source_path)
-            target_rel = os.path.relpath(operation.target_path)
-            
-            # Insert item
-            item_id = self.operations_tree.insert("", tk.END, 
-                                                 values=(source_rel, target_rel, op_type, status))
-            
-            # Color-code based on operation type
-            if op_type == "Movie":
-                self.operations_tree.set(item_id, "Type", "🎬 Movie")
-            else:
-                self.operations_tree.set(item_id, "Type", "📺 TV Show")
+        """Populate the treeview with operation data (rows are formatted as they are shown)."""
+        self.operations_list.set_rows(self.operations)
+    
+    def format_operation(self, operation: RenameOperation) -> Tuple[str, Tuple[str, str, str, str]]:
+        """Return the column values of an operation's row."""
+        # Determine operation type and status
+        op_type = "🎬 Movie" if "movies" in operation.target_path.lower() else "📺 TV Show"
+        status = "Ready"
+        
+        # Get relative paths for display
+        source_rel = os.path.relpath(operation.source_path)
+        target_rel = os.path.relpath(operation.target_path)
+        return "", (source_rel, target_rel, op_type, status)
     
     def on_selection_change(self, event):
         """Handle selection change in the treeview."""
-        selection = self.operations_tree.selection()
-        if not selection:
+        if not self.operations_tree.selection():
             return
         
-        # Get selected item index
-        item = selection[0]
-        item_index = self.operations_tree.index(item)
-        
-        if 0 <= item_index < len(self.operations):
-            operation = self.operations[item_index]
+        # Rows are reused while scrolling a long list, so map the item back to its operation
+        operation = self.operations_list.selected_row()
+        if operation is not None and operation is not self.shown_operation:
+            self.shown_operation = operation
             self.show_operation_details(operation)
     
     def show_operation_details(self, operation: RenameOperation):
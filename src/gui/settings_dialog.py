@@ -6,6 +6,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
 from src.utils.config import Config
+from src.core.renamer import OPERATION_TYPES
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -234,7 +235,7 @@ class SettingsDialog:
         ttk.Checkbutton(parent, text="Backup original filenames", 
                        variable=self.backup_original_names_var).grid(row=2, column=0, sticky=tk.W, pady=(0, 10))
         
-        ttk.Label(parent, text="Creates a text file with original filenames for reference", 
+        ttk.Label(parent, text="Keeps the apply journal with the original filenames so changes can be undone", 
                  foreground="gray").grid(row=3, column=0, sticky=tk.W, pady=(0, 20))
         
         # Log level
@@ -244,6 +245,17 @@ class SettingsDialog:
         log_combo['values'] = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
         log_combo.grid(row=5, column=0, sticky=tk.W, pady=(0, 10))
         
+        # Operation mode
+        ttk.Label(parent, text="Default Operation:", font=("", 10, "bold")).grid(row=6, column=0, sticky=tk.W, pady=(10, 5))
+        self.operation_mode_var = tk.StringVar()
+        mode_combo = ttk.Combobox(parent, textvariable=self.operation_mode_var, width=15, state="readonly")
+        mode_combo['values'] = OPERATION_TYPES
+        mode_combo.grid(row=7, column=0, sticky=tk.W, pady=(0, 5))
+        
+        ttk.Label(parent, text="Hardlink and symlink keep the originals in place (e.g. for seeding); "
+                               "hardlinks fall back to a copy across filesystems",
+                 foreground="gray").grid(row=8, column=0, sticky=tk.W, pady=(0, 10))
+        
         # Configure column weight
         parent.columnconfigure(0, weight=1)
     
@@ -308,6 +320,7 @@ class SettingsDialog:
         self.dry_run_mode_var.set(self.config.get_boolean('GENERAL', 'dry_run_mode', True))
         self.backup_original_names_var.set(self.config.get_boolean('GENERAL', 'backup_original_names', True))
         self.log_level_var.set(self.config.get('GENERAL', 'log_level', 'INFO'))
+        self.operation_mode_var.set(self.config.operation_mode)
         
         # Update previews
         self.update_movie_preview()
@@ -338,6 +351,7 @@ class SettingsDialog:
         self.config.set_boolean('GENERAL', 'dry_run_mode', self.dry_run_mode_var.get())
         self.config.set_boolean('GENERAL', 'backup_original_names', self.backup_original_names_var.get())
         self.config.set('GENERAL', 'log_level', self.log_level_var.get())
+        self.config.operation_mode = self.operation_mode_var.get()
         
         # Save to file
         self.config.save_config()
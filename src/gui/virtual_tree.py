@@ -0,0 +1,262 @@
+"""
+Treeview wrapper for long lists.
+
+VirtualTreeview keeps a list's rows (any objects) in Python and shows them in
+a ttk.Treeview, formatting a row only when it is displayed. Up to
+``virtual_threshold`` rows are inserted as real tree items, a chunk per turn
+of the Tk event loop, so the window keeps repainting and accepting input
+while thousands of rows are added. Longer lists switch to a windowed view:
+the tree only holds the rows that fit on screen, and the scrollbar, mouse
+wheel and navigation keys move that window over the list, so 100k rows
+cost about as much to show as one screenful.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Rows inserted per event-loop turn
+CHUNK_SIZE = 500
+# Row count above which only the visible rows are kept in the tree
+VIRTUAL_THRESHOLD = 5000
+# Rows moved per mouse wheel notch in the windowed view
+WHEEL_ROWS = 3
+DEFAULT_ROW_HEIGHT = 20
+
+
+class VirtualTreeview:
+    """Shows a list of rows in a Treeview, inserting in chunks or windowing large lists."""
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar,
+                 format_row: Callable[[Any], Tuple[str, Sequence]],
+                 chunk_size: int = CHUNK_SIZE, virtual_threshold: int = VIRTUAL_THRESHOLD):
+        """
+        Attach to a tree and its vertical scrollbar.
+
+        Args:
+            tree: Treeview to fill
+            scrollbar: The tree's vertical scrollbar
+            format_row: Returns (text, values) for a row object; text is
+                shown in the tree column (#0)
+            chunk_size: Rows inserted per event-loop turn
+            virtual_threshold: Rows above which the windowed view is used
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.format_row = format_row
+        self.chunk_size = max(1, chunk_size)
+        self.virtual_threshold = virtual_threshold
+        self.rows: List[Any] = []
+        self.virtual = False
+        self._row_items: Dict[int, str] = {}  # Row index -> displayed item ID
+        self._item_rows: Dict[str, int] = {}  # Displayed item ID -> row index
+        self._inserted = 0
+        self._offset = 0  # First row shown by the windowed view
+        self._selected: Optional[int] = None
+        self._row_height: Optional[int] = None
+        self._insert_job = None
+        self._render_job = None
+
+        tree.bind('<Configure>', self._on_configure, add='+')
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            tree.bind(sequence, self._on_wheel, add='+')
+        for sequence in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            tree.bind(sequence, self._on_key, add='+')
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def clear(self):
+        """Remove all rows."""
+        self._cancel_jobs()
+        self.rows = []
+        self._offset = 0
+        self._selected = None
+        self._delete_items()
+        self._set_virtual(False)
+
+    def set_rows(self, rows: Iterable[Any]):
+        """Replace the rows."""
+        self.clear()
+        self.append_rows(rows)
+
+    def append_rows(self, rows: Iterable[Any]):
+        """Add rows at the end; they are displayed from the event loop."""
+        self.rows.extend(rows)
+        if not self.virtual and len(self.rows) > self.virtual_threshold:
+            self._cancel_jobs()
+            self._delete_items()
+            self._set_virtual(True)
+        if self.virtual:
+            self._schedule_render()
+        elif self._insert_job is None and self._inserted < len(self.rows):
+            self._insert_job = self.tree.after(1, self._insert_chunk)
+
+    def refresh(self):
+        """Re-format the displayed rows, e.g. after the row objects changed."""
+        for index, item in self._row_items.items():
+            text, values = self.format_row(self.rows[index])
+            self.tree.item(item, text=text, values=tuple(values))
+
+    def row_index(self, item: str) -> Optional[int]:
+        """Return the row index shown by a tree item."""
+        return self._item_rows.get(item)
+
+    def selected_row(self) -> Optional[Any]:
+        """Return the selected row object, if any."""
+        if self._selected is None or self._selected >= len(self.rows):
+            return None
+        return self.rows[self._selected]
+
+    def _cancel_jobs(self):
+        for job in (self._insert_job, self._render_job):
+            if job is not None:
+                self.tree.after_cancel(job)
+        self._insert_job = None
+        self._render_job = None
+
+    def _delete_items(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self._row_items = {}
+        self._item_rows = {}
+        self._inserted = 0
+
+    def _set_virtual(self, virtual: bool):
+        if virtual == self.virtual:
+            return
+        self.virtual = virtual
+        if virtual:
+            # The scrollbar now tracks the window over self.rows, not the tree's own view
+            self.tree.configure(yscrollcommand='')
+            self.scrollbar.configure(command=self._on_scroll)
+        else:
+            self.tree.configure(yscrollcommand=self.scrollbar.set)
+            self.scrollbar.configure(command=self.tree.yview)
+
+    def _insert_chunk(self):
+        self._insert_job = None
+        end = min(len(self.rows), self._inserted + self.chunk_size)
+        for index in range(self._inserted, end):
+            text, values = self.format_row(self.rows[index])
+            item = self.tree.insert('', tk.END, text=text, values=tuple(values))
+            self._row_items[index] = item
+            self._item_rows[item] = index
+        self._inserted = end
+        if self._inserted < len(self.rows):
+            self._insert_job = self.tree.after(1, self._insert_chunk)
+
+    def _visible_rows(self) -> int:
+        height = self.tree.winfo_height()
+        if height <= 1:  # Not mapped yet
+            return int(self.tree.cget('height'))
+        if self._row_height is None:
+            style = ttk.Style(self.tree)
+            try:
+                self._row_height = int(style.lookup(self.tree.cget('style') or 'Treeview', 'rowheight'))
+            except (ValueError, tk.TclError):
+                self._row_height = DEFAULT_ROW_HEIGHT
+        # One row's worth of height goes to the headings
+        return max(1, height // self._row_height - 1)
+
+    def _schedule_render(self):
+        if self._render_job is None:
+            self._render_job = self.tree.after_idle(self._render)
+
+    def _render(self):
+        self._render_job = None
+        if not self.virtual:
+            return
+        total = len(self.rows)
+        count = min(self._visible_rows(), total)
+        self._offset = max(0, min(self._offset, total - count))
+
+        items = list(self.tree.get_children())
+        while len(items) < count:
+            items.append(self.tree.insert('', tk.END))
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+            del items[count:]
+
+        # Reuse the same items for whichever rows are in the window
+        self._row_items = {}
+        self._item_rows = {}
+        selected = []
+        for slot, item in enumerate(items):
+            index = self._offset + slot
+            text, values = self.format_row(self.rows[index])
+            self.tree.item(item, text=text, values=tuple(values))
+            self._row_items[index] = item
+            self._item_rows[item] = index
+            if index == self._selected:
+                selected.append(item)
+        if tuple(selected) != self.tree.selection():
+            self.tree.selection_set(selected)
+        self.tree.yview_moveto(0)
+        if total:
+            self.scrollbar.set(self._offset / total, (self._offset + count) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_configure(self, event):
+        if self.virtual:
+            self._schedule_render()
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        # An empty selection in the windowed view usually means the selected
+        # row scrolled out of the window, not that it was deselected
+        if selection:
+            self._selected = self._item_rows.get(selection[0])
+        elif not self.virtual:
+            self._selected = None
+
+    def _on_scroll(self, *args):
+        # Scrollbar protocol: ('moveto', fraction) or ('scroll', count, 'units'|'pages')
+        if args[0] == 'moveto':
+            self._offset = int(float(args[1]) * len(self.rows))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self._visible_rows()
+            self._offset += step
+        self._render()
+
+    def _on_wheel(self, event):
+        if not self.virtual:
+            return None
+        if event.num == 4:
+            self._offset -= WHEEL_ROWS
+        elif event.num == 5:
+            self._offset += WHEEL_ROWS
+        else:
+            self._offset += -WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS
+        self._render()
+        return 'break'
+
+    def _on_key(self, event):
+        if not self.virtual or not self.rows:
+            return None
+        count = self._visible_rows()
+        current = self._selected if self._selected is not None else self._offset
+        moves = {'Up': -1, 'Down': 1, 'Prior': -count, 'Next': count}
+        if event.keysym == 'Home':
+            target = 0
+        elif event.keysym == 'End':
+            target = len(self.rows) - 1
+        else:
+            target = current + moves[event.keysym]
+        target = max(0, min(len(self.rows) - 1, target))
+
+        self._selected = target
+        if target < self._offset:
+            self._offset = target
+        elif target >= self._offset + count:
+            self._offset = target - count + 1
+        self._render()
+        item = self._row_items.get(target)
+        if item is not None:
+            self.tree.focus(item)
+        return 'break'
@@ -69,7 +69,96 @@ class Config:
         self.config['GENERAL'] = {
             'dry_run_mode': 'true',
             'log_level': 'INFO',
-            'backup_original_names': 'true'
+            'backup_original_names': 'true',
+            'operation_mode': 'rename'  # rename, move, copy, hardlink or symlink
+        }
+        
+        # Logging Settings
+        self.config['LOGGING'] = {
+            'directory': 'logs',
+            'file_name': 'plex_renamer.log',
+            'format': 'text',  # text or json
+            'max_size_mb': '10',
+            'backup_count': '5',
+            'rotate_hours': '24',
+            'console': 'true',
+            'queue_size': '10000'
+        }
+        
+        # Network Settings
+        self.config['NETWORK'] = {
+            'max_workers': '4',
+            'max_retries': '5',
+            'backoff_factor': '0.5',
+            'backoff_max': '30',
+            'request_timeout': '10',
+            'tmdb_requests_per_second': '4',
+            'tvdb_requests_per_second': '10'
+        }
+        
+        # Execution Settings
+        self.config['EXECUTION'] = {
+            'max_workers': '8',
+            'per_device_workers': '2',
+            'batch_size': '64',
+            'copy_chunk_mb': '64',
+            'verify_copies': 'true',
+            'use_reflink': 'true',
+            'journal_dir': 'journals',
+            'journal_batch_size': '64'
+        }
+        
+        # Background Job Settings
+        self.config['JOBS'] = {
+            'max_concurrent_jobs': '2',
+            'retained_jobs': '20',
+            'retention_minutes': '60',
+            'store_path': 'cache/jobs.db',
+            'heartbeat_seconds': '10'
+        }
+        
+        # Metrics Settings
+        self.config['METRICS'] = {
+            'enabled': 'true',
+            'flush_seconds': '5'
+        }
+        
+        # Tracing Settings
+        self.config['TRACING'] = {
+            'enabled': 'false',
+            'exporter': 'jsonl',
+            'path': 'logs/traces.jsonl',
+            'endpoint': 'http://127.0.0.1:4318/v1/traces',
+            'service_name': 'plex-renamer',
+            'max_queue': '10000'
+        }
+        
+        # Profiling Settings
+        self.config['PROFILING'] = {
+            'enabled': 'false',
+            'directory': 'logs/profiles',
+            'max_profiles': '50',
+            'sample_interval_ms': '5',
+            'admin_token': ''
+        }
+        
+        # Directory Browsing Settings
+        self.config['BROWSE'] = {
+            'page_size': '500',
+            'listing_ttl_seconds': '30',
+            'listing_cache_directories': '2048'
+        }
+        
+        # Metadata Cache Settings
+        self.config['CACHE'] = {
+            'enabled': 'true',
+            'path': 'cache/metadata_cache.db',
+            'ttl_hours': '168',
+            'max_entries': '10000',
+            'background_refresh': 'true',
+            'refresh_idle_seconds': '30',
+            'refresh_top_n': '50',
+            'refresh_interval': '60'
         }
         
         self.save_config()
@@ -97,6 +186,22 @@ class Config:
         """Get a boolean configuration value."""
         return self.config.getboolean(section, key, fallback=fallback)
     
+    def get_int(self, section, key, fallback=0):
+        """Get an integer configuration value."""
+        try:
+            return self.config.getint(section, key, fallback=fallback)
+        except ValueError:
+            logger.warning(f"Invalid integer for [{section}] {key}, using {fallback}")
+            return fallback
+    
+    def get_float(self, section, key, fallback=0.0):
+        """Get a float configuration value."""
+        try:
+            return self.config.getfloat(section, key, fallback=fallback)
+        except ValueError:
+            logger.warning(f"Invalid number for [{section}] {key}, using {fallback}")
+            return fallback
+    
     def set_boolean(self, section, key, value):
         """Set a boolean configuration value."""
         self.set(section, key, 'true' if value else 'false')
@@ -144,4 +249,12 @@ class Config:
     
     @dry_run_mode.setter
     def dry_run_mode(self, value):
-        self.set_boolean('GENERAL', 'dry_run_mode', value) 
\ No newline at end of file
+        self.set_boolean('GENERAL', 'dry_run_mode', value)
+    
+    @property
+    def operation_mode(self):
+        return self.get('GENERAL', 'operation_mode', 'rename')
+    
+    @operation_mode.setter
+    def operation_mode(self, value):
+        self.set('GENERAL', 'operation_mode', value) 
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+In-process event bus for pushing scan progress to web clients.
+
+Events get increasing IDs and are kept in a bounded history so a client
+that reconnects with ``Last-Event-ID`` receives what it missed. Subscribers
+block on a condition variable instead of polling; EventBatcher coalesces
+high-frequency items (planned operations) into periodic batch events.
+
+With an SQLiteEventLog the history lives in a shared database, so a client
+connected to one web worker also receives events published by the others
+(picked up by a short poll of the log).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Event:
+    """A published event."""
+
+    __slots__ = ('id', 'type', 'data')
+
+    def __init__(self, event_id: int, event_type: str, data: Any):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+
+    def to_sse(self) -> str:
+        """Format the event as a Server-Sent Events message."""
+        return format_sse(self.type, self.data, self.id)
+
+
+def format_sse(event_type: str, data: Any, event_id: Optional[int] = None) -> str:
+    """
+    Format one Server-Sent Events message.
+
+    Args:
+        event_type: SSE event name
+        data: JSON-serializable payload
+        event_id: Optional ID the browser echoes back as Last-Event-ID
+
+    Returns:
+        Message text, terminated by a blank line
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class SQLiteEventLog:
+    """Event history in an SQLite table shared between processes."""
+
+    def __init__(self, path: str, history: int = 1000):
+        """
+        Initialize the log, creating the table if needed.
+
+        Args:
+            path: SQLite database file
+            history: Number of recent events kept
+        """
+        self.history = history
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT,
+                data TEXT,
+                created_at REAL
+            )
+        ''')
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def append(self, event_type: str, data: Any) -> int:
+        """Store an event and return its ID."""
+        with self._lock, self._db:
+            event_id = self._db.execute(
+                'INSERT INTO events (type, data, created_at) VALUES (?, ?, ?)',
+                (event_type, json.dumps(data, default=str), time.time())
+            ).lastrowid
+            if event_id % 100 == 0:
+                self._db.execute('DELETE FROM events WHERE id <= ?', (event_id - self.history,))
+        return event_id
+
+    def since(self, cursor: int, limit: int = 500) -> List[Event]:
+        """Return events after cursor, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT id, type, data FROM events WHERE id > ? ORDER BY id LIMIT ?', (cursor, limit)
+            ).fetchall()
+        return [Event(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def last_id(self) -> int:
+        """Return the newest event ID (0 if none)."""
+        with self._lock:
+            return self._db.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+
+
+class EventBus:
+    """Thread-safe publish/subscribe with a replayable history."""
+
+    def __init__(self, history: int = 1000, log: Optional[SQLiteEventLog] = None,
+                 poll_interval: float = 0.5):
+        """
+        Initialize the event bus.
+
+        Args:
+            history: Number of recent events kept for reconnecting clients
+            log: Optional shared log; events from other processes are then delivered too
+            poll_interval: Seconds between checks of the shared log
+        """
+        self._history = deque(maxlen=history)
+        self._next_id = 1
+        self._published = 0  # Local publishes so far; lets a subscriber tell if it missed a wake-up
+        self._condition = threading.Condition()
+        self.log = log
+        self.poll_interval = poll_interval
+
+    @property
+    def last_id(self) -> int:
+        """ID of the most recently published event (0 if none)."""
+        if self.log is not None:
+            return self.log.last_id()
+        return self._next_id - 1
+
+    def publish(self, event_type: str, data: Any) -> Event:
+        """
+        Publish an event and wake all subscribers.
+
+        Args:
+            event_type: Event name
+            data: JSON-serializable payload
+
+        Returns:
+            The published event
+        """
+        if self.log is not None:
+            # The database write happens outside the condition, so subscribers are never held up by it
+            event = Event(self.log.append(event_type, data), event_type, data)
+        with self._condition:
+            if self.log is None:
+                event = Event(self._next_id, event_type, data)
+                self._next_id += 1
+                self._history.append(event)
+            self._published += 1
+            self._condition.notify_all()
+        return event
+
+    def _since(self, cursor: int) -> List[Event]:
+        if self.log is not None:
+            return self.log.since(cursor)
+        with self._condition:
+            if not self._history or self._history[-1].id <= cursor:
+                return []
+            # IDs are contiguous, so the offset into the history is arithmetic
+            start = max(0, cursor - self._history[0].id + 1)
+            return list(self._history)[start:]
+
+    def subscribe(self, last_id: Optional[int] = None, keepalive: float = 15.0,
+                  max_duration: Optional[float] = None) -> Iterator[Optional[Event]]:
+        """
+        Yield events as they are published.
+
+        Args:
+            last_id: Replay events after this ID (None: only new events)
+            keepalive: Seconds without events before yielding None, so the
+                caller can send a keep-alive comment
+            max_duration: Stop after this many seconds (clients reconnect)
+
+        Yields:
+            Events, or None when keepalive elapses without any
+        """
+        cursor = self.last_id if last_id is None else last_id
+        deadline = time.monotonic() + max_duration if max_duration else None
+        # Local publishes wake subscribers at once; events from other
+        # processes are only seen by reading the shared log again
+        wait = min(keepalive, self.poll_interval) if self.log is not None else keepalive
+        quiet_since = time.monotonic()
+
+        while deadline is None or time.monotonic() < deadline:
+            with self._condition:
+                published = self._published
+            events = self._since(cursor)
+            if not events:
+                with self._condition:
+                    # Skip the wait if something was published since the read above
+                    if self._published == published:
+                        self._condition.wait(timeout=wait)
+                events = self._since(cursor)
+            if events:
+                cursor = events[-1].id
+                quiet_since = time.monotonic()
+                yield from events
+            elif time.monotonic() - quiet_since >= keepalive:
+                quiet_since = time.monotonic()
+                yield None
+
+
+class EventBatcher:
+    """Collects items and publishes them as batch events."""
+
+    def __init__(self, bus: EventBus, event_type: str, max_items: int = 100, max_delay: float = 0.5,
+                 context: Optional[Dict] = None):
+        """
+        Initialize the batcher.
+
+        Args:
+            bus: EventBus to publish on
+            event_type: Event name for each batch
+            max_items: Publish as soon as this many items are waiting
+            max_delay: Publish waiting items at least this often (checked on add/flush_due)
+            context: Extra fields included in every batch (e.g. the job ID)
+        """
+        self.bus = bus
+        self.event_type = event_type
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.context = context or {}
+        self._items: List[Any] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, item: Any):
+        """Queue an item, publishing the batch if it is full or overdue."""
+        with self._lock:
+            self._items.append(item)
+        self.flush_due()
+
+    def flush_due(self):
+        """Publish waiting items if the batch is full or max_delay has passed."""
+        with self._lock:
+            due = (len(self._items) >= self.max_items
+                   or (self._items and time.monotonic() - self._last_flush >= self.max_delay))
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Publish all waiting items now."""
+        with self._lock:
+            items, self._items = self._items, []
+            self._last_flush = time.monotonic()
+        if items:
+            payload = dict(self.context, items=items)
+            self.bus.publish(self.event_type, payload)
@@ -0,0 +1,290 @@
+"""
+Directory listing cache for bulk filesystem work.
+
+Over network mounts every ``exists``/``makedirs`` call is a metadata
+round-trip. DirectoryCache reads each directory once with ``os.scandir``
+and answers existence checks from that listing, creates missing
+directories once, and is kept up to date as operations add and remove
+files, for the lifetime of one batch.
+
+ListingCache keeps whole listings (names and entry types from
+``os.scandir``) for a few seconds across requests, for directory browsing
+and the scanner's tree walks.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class DirectoryCache:
+    """Thread-safe, per-batch cache of directory listings."""
+
+    def __init__(self):
+        # abspath -> {casefolded name: name}, or None if the directory does not exist
+        self._listings: Dict[str, Optional[Dict[str, str]]] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(directory: str) -> str:
+        return os.path.abspath(directory)
+
+    def _load(self, key: str) -> Optional[Dict[str, str]]:
+        if key not in self._listings:
+            try:
+                with os.scandir(key) as entries:
+                    self._listings[key] = {entry.name.casefold(): entry.name for entry in entries}
+            except (FileNotFoundError, NotADirectoryError):
+                self._listings[key] = None
+            except OSError as e:
+                logger.warning(f"Cannot list {key}: {e}")
+                self._listings[key] = None
+        return self._listings[key]
+
+    def listing(self, directory: str) -> Dict[str, str]:
+        """
+        Return a directory's entries as {casefolded name: name}.
+
+        Args:
+            directory: Directory path
+
+        Returns:
+            Mapping of entries; empty if the directory does not exist
+        """
+        with self._lock:
+            return self._load(self._key(directory)) or {}
+
+    def is_dir(self, directory: str) -> bool:
+        """Return True if the directory exists (as far as this batch knows)."""
+        with self._lock:
+            return self._load(self._key(directory)) is not None
+
+    def exists(self, path: str) -> bool:
+        """Return True if path names an existing entry, matching case exactly."""
+        directory, name = os.path.split(self._key(path))
+        with self._lock:
+            listing = self._load(directory)
+            return listing is not None and listing.get(name.casefold()) == name
+
+    def error_for(self, directory: str) -> Optional[str]:
+        """Return the error that prevented creating a directory, if any."""
+        return self._errors.get(self._key(directory))
+
+    def ensure_directory(self, directory: str) -> bool:
+        """
+        Create a directory unless the cache already knows it exists.
+
+        Args:
+            directory: Directory path
+
+        Returns:
+            True if the directory exists afterwards
+        """
+        key = self._key(directory)
+        with self._lock:
+            if key in self._errors:
+                return False
+            if self._load(key) is not None:
+                return True
+            try:
+                os.makedirs(key, exist_ok=True)
+            except OSError as e:
+                logger.error(f"Error creating directory {key}: {e}")
+                self._errors[key] = str(e)
+                return False
+
+            logger.info(f"Created directory: {key}")
+            self._listings[key] = {}
+            # Update ancestors already listed; ones known to be missing were just created
+            child, parent = key, os.path.dirname(key)
+            while parent != child and parent in self._listings:
+                name = os.path.basename(child)
+                listing = self._listings[parent]
+                if listing is not None:
+                    listing[name.casefold()] = name
+                    break
+                self._listings[parent] = {name.casefold(): name}
+                child, parent = parent, os.path.dirname(parent)
+            return True
+
+    def ensure_directories(self, directories: Iterable[str]) -> int:
+        """
+        Create every missing directory once, parents first.
+
+        Args:
+            directories: Directory paths (duplicates are fine)
+
+        Returns:
+            Number of distinct directories that exist afterwards
+        """
+        ready = 0
+        for directory in sorted({self._key(d) for d in directories}):
+            if self.ensure_directory(directory):
+                ready += 1
+        return ready
+
+    def add(self, path: str):
+        """Record that path now exists."""
+        directory, name = os.path.split(self._key(path))
+        with self._lock:
+            listing = self._listings.get(directory)
+            if listing is not None:
+                listing[name.casefold()] = name
+
+    def discard(self, path: str):
+        """Record that path no longer exists."""
+        directory, name = os.path.split(self._key(path))
+        with self._lock:
+            listing = self._listings.get(directory)
+            if listing is not None and listing.get(name.casefold()) == name:
+                del listing[name.casefold()]
+
+
+class ListingEntry:
+    """One directory entry as read by ``os.scandir``."""
+
+    __slots__ = ('name', 'path', 'is_dir', 'is_file', 'is_symlink', 'size')
+
+    def __init__(self, entry: os.DirEntry):
+        self.name = entry.name
+        self.path = entry.path
+        # On Linux and Windows these come from the directory read itself, not a stat
+        try:
+            self.is_dir = entry.is_dir()
+            self.is_file = entry.is_file()
+            self.is_symlink = entry.is_symlink()
+        except OSError:
+            self.is_dir = self.is_file = self.is_symlink = False
+        self.size: Optional[int] = None  # Looked up on demand
+
+    def sort_key(self) -> Tuple[int, str, str]:
+        """Directories first, then case-insensitive name order."""
+        return (0 if self.is_dir else 1, self.name.casefold(), self.name)
+
+    def stat_size(self) -> Optional[int]:
+        """Return the file size, stat'ing the entry the first time it is asked for."""
+        if self.size is None and self.is_file:
+            try:
+                self.size = os.stat(self.path).st_size
+            except OSError:
+                pass
+        return self.size
+
+
+class Listing:
+    """A directory's entries, sorted directories first, as of one read."""
+
+    __slots__ = ('path', 'entries', 'keys', 'loaded_at')
+
+    def __init__(self, path: str, entries: List[ListingEntry]):
+        entries.sort(key=ListingEntry.sort_key)
+        self.path = path
+        self.entries = entries
+        self.keys = [entry.sort_key() for entry in entries]
+        self.loaded_at = time.monotonic()
+
+
+class ListingCache:
+    """
+    Process-wide cache of directory listings with a short TTL.
+
+    Shared by directory browsing and the scanner, so a folder browsed just
+    before a scan (or scanned just before it is browsed) is read once. The
+    TTL bounds how stale a listing can get; callers that change the tree
+    themselves call invalidate().
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_directories: int = 2048):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Seconds a listing is reused before the directory is read again
+            max_directories: Listings kept; the least recently used are dropped first
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_directories = max(1, max_directories)
+        self._listings: 'OrderedDict[str, Listing]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'ListingCache':
+        """Build a listing cache from the [BROWSE] configuration section."""
+        return cls(
+            ttl_seconds=config.get_float('BROWSE', 'listing_ttl_seconds', 30),
+            max_directories=config.get_int('BROWSE', 'listing_cache_directories', 2048)
+        )
+
+    def listing(self, directory: str, refresh: bool = False) -> Listing:
+        """
+        Return a directory's listing, reading it if not cached or expired.
+
+        Args:
+            directory: Directory path
+            refresh: Read the directory even if a fresh listing is cached
+
+        Returns:
+            The Listing
+
+        Raises:
+            OSError: If the directory cannot be read (FileNotFoundError,
+                NotADirectoryError, PermissionError, ...)
+        """
+        key = os.path.abspath(directory)
+        with self._lock:
+            cached = self._listings.get(key)
+            if (cached is not None and not refresh
+                    and time.monotonic() - cached.loaded_at < self.ttl_seconds):
+                self._listings.move_to_end(key)
+                return cached
+
+        # Read outside the lock; a slow network share must not block other directories
+        with os.scandir(key) as entries:
+            listing = Listing(key, [ListingEntry(entry) for entry in entries])
+
+        with self._lock:
+            self._listings[key] = listing
+            self._listings.move_to_end(key)
+            while len(self._listings) > self.max_directories:
+                self._listings.popitem(last=False)
+        return listing
+
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """
+        Walk a tree top-down like ``os.walk``, reading directories through the cache.
+
+        Unreadable directories are skipped and symlinked directories are
+        listed but not descended into. Callers may prune ``dirs`` in place.
+
+        Args:
+            top: Directory to walk
+
+        Yields:
+            (root, dirs, files) tuples
+        """
+        try:
+            listing = self.listing(top)
+        except OSError:
+            return
+        dirs = [entry.name for entry in listing.entries if entry.is_dir]
+        files = [entry.name for entry in listing.entries if not entry.is_dir]
+        links = {entry.name for entry in listing.entries if entry.is_dir and entry.is_symlink}
+        yield top, dirs, files
+        for name in dirs:
+            if name not in links:
+                yield from self.walk(os.path.join(top, name))
+
+    def invalidate(self, directory: Optional[str] = None):
+        """Forget one directory's listing, or every listing if directory is None."""
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(os.path.abspath(directory), None)
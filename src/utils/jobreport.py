@@ -0,0 +1,229 @@
+"""
+Per-job timing and cost reports.
+
+A JobReport collects where one scan or apply spent its time: wall-clock
+seconds per stage, files and directories touched, bytes copied, metadata
+API requests versus cache hits, and the slowest files and queries.
+
+The report a job is filling is held in a context variable, so deep code
+(the file walker, API clients, the cache) records into it through the
+module-level helpers without it being passed down. The helpers do nothing
+when no report is active. Code that hands work to other threads copies the
+context into them (see ``run_in_context``); the metrics in
+``src.utils.metrics`` remain the process-wide view. The job's cancel event
+travels the same way (``cancellation``), so waits deep in the API clients
+end as soon as the job is cancelled.
+"""
+
+import contextvars
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+_CURRENT: contextvars.ContextVar[Optional['JobReport']] = contextvars.ContextVar('job_report', default=None)
+_CANCEL: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar('job_cancel', default=None)
+
+# Slowest items kept per category
+DEFAULT_SLOWEST = 10
+
+
+class JobReport:
+    """Stage timings, counters and slowest items of one job."""
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        """
+        Initialize an empty report.
+
+        Args:
+            slowest: Number of slowest items kept per category
+        """
+        self.slowest_limit = max(0, slowest)
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._stages: Dict[str, float] = {}
+        self._counts: Dict[str, float] = {}
+        self._slowest: Dict[str, List] = {}
+        self._sequence = 0  # Breaks ties between equally slow items in the heaps
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """Make this the report recorded into by the calling context."""
+        token = _CURRENT.set(self)
+        try:
+            yield self
+        finally:
+            _CURRENT.reset(token)
+
+    def set_stage(self, name: str, seconds: float):
+        """Record a stage's wall-clock seconds (replacing an earlier value)."""
+        with self._lock:
+            self._stages[name] = seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the seconds spent inside the block to a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stages[name] = self._stages.get(name, 0.0) + elapsed
+
+    def add(self, name: str, amount: float = 1):
+        """Add amount to a counter."""
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def observe(self, category: str, name: str, seconds: float, **extra):
+        """
+        Offer an item for the slowest-items list of a category.
+
+        Args:
+            category: e.g. "files" or "queries"
+            name: What took this long (a path, a request)
+            seconds: Duration
+            **extra: Additional JSON-friendly fields for the item
+        """
+        if not self.slowest_limit:
+            return
+        with self._lock:
+            self._sequence += 1
+            heap = self._slowest.setdefault(category, [])
+            item = (seconds, self._sequence, name, extra)
+            if len(heap) < self.slowest_limit:
+                heapq.heappush(heap, item)
+            elif seconds > heap[0][0]:
+                heapq.heapreplace(heap, item)
+
+    def finish(self):
+        """Mark the end of the job (used for the total wall time)."""
+        if self.finished_at is None:
+            self.finished_at = time.time()
+
+    def as_dict(self) -> Dict:
+        """
+        Return the report as a JSON-friendly dict.
+
+        Returns:
+            Dictionary with wall_seconds, stages (a list of {name, seconds}
+            in the order the stages were first recorded), counts and
+            slowest (per category, slowest first)
+        """
+        end = self.finished_at or time.time()
+        with self._lock:
+            return {
+                'wall_seconds': round(end - self.started_at, 3),
+                'stages': [{'name': name, 'seconds': round(seconds, 3)} for name, seconds in self._stages.items()],
+                'counts': {name: round(value, 3) if isinstance(value, float) else value
+                           for name, value in sorted(self._counts.items())},
+                'slowest': {
+                    category: [dict(extra, name=name, seconds=round(seconds, 4))
+                               for seconds, _, name, extra in sorted(heap, reverse=True)]
+                    for category, heap in self._slowest.items()
+                }
+            }
+
+    def summary(self) -> str:
+        """Return a one-line summary suitable for a status bar."""
+        return summarize(self.as_dict())
+
+
+def summarize(report: Dict) -> str:
+    """
+    Format a report dictionary (JobReport.as_dict()) as one line.
+
+    Args:
+        report: Report dictionary
+
+    Returns:
+        e.g. "3.2s total - walk 0.4s, parse 0.9s, lookup 3.0s - 120 files, 412 API requests, 80 cache hits"
+    """
+    parts = [f"{report['wall_seconds']:.1f}s total"]
+    stages = ', '.join(f"{stage['name']} {stage['seconds']:.1f}s" for stage in report['stages'])
+    if stages:
+        parts.append(stages)
+    counts = report['counts']
+    labels = (('files', 'files'), ('operations', 'operations'), ('directories', 'directories'),
+              ('bytes', 'bytes copied'), ('api_requests', 'API requests'), ('cache_hits', 'cache hits'))
+    totals = ', '.join(f"{int(counts[key])} {label}" for key, label in labels if counts.get(key))
+    if totals:
+        parts.append(totals)
+    return ' - '.join(parts)
+
+
+def current_report() -> Optional[JobReport]:
+    """Return the report active in the calling context, if any."""
+    return _CURRENT.get()
+
+
+def add_count(name: str, amount: float = 1):
+    """Add to a counter of the active report (no-op without one)."""
+    report = _CURRENT.get()
+    if report is not None:
+        report.add(name, amount)
+
+
+def observe_slow(category: str, name: str, seconds: float, **extra):
+    """Offer an item to the active report's slowest list (no-op without one)."""
+    report = _CURRENT.get()
+    if report is not None:
+        report.observe(category, name, seconds, **extra)
+
+
+@contextmanager
+def timed_stage(name: str):
+    """Time the block into a stage of the active report (no-op without one)."""
+    report = _CURRENT.get()
+    if report is None:
+        yield
+        return
+    with report.stage(name):
+        yield
+
+
+@contextmanager
+def cancellation(cancel_event: Optional[threading.Event]):
+    """Make cancel_event the one waits in the calling context give up on."""
+    token = _CANCEL.set(cancel_event)
+    try:
+        yield
+    finally:
+        _CANCEL.reset(token)
+
+
+def wait_cancelled(seconds: float) -> bool:
+    """
+    Sleep for seconds, waking early if the active job is cancelled.
+
+    Returns:
+        True if the job was cancelled (the wait may have been cut short)
+    """
+    cancel_event = _CANCEL.get()
+    if cancel_event is None:
+        time.sleep(seconds)
+        return False
+    return cancel_event.wait(seconds)
+
+
+def run_in_context(target: Callable) -> Callable:
+    """
+    Bind target to a copy of the caller's context, for running on another thread.
+
+    Each call to this function makes a new copy, as one context cannot be
+    entered by two threads at once.
+
+    Args:
+        target: Callable to run later
+
+    Returns:
+        Callable running target inside the copied context
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(target, *args, **kwargs)
+    return run
@@ -1,51 +1,295 @@
 """
 Logging utilities for the Plex Media Renamer application.
+
+Loggers hand records to a queue; a QueueListener thread formats them and
+writes them to the console and to a log file that rotates by size and,
+optionally, by age. The threads doing the work (scan workers, request
+handlers) therefore never wait for the disk or the console, and messages
+passed as ``logger.debug("Parsed %s", title)`` are not even formatted when
+their level is disabled.
 """
 
+import atexit
+import json
 import logging
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+            'process': record.process
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SizedTimedRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotates the log file when it exceeds a size and at fixed intervals.
+
+    Backups are numbered like RotatingFileHandler's (``.1`` newest). Several
+    processes (gunicorn workers) may share the file: rotation takes a lock
+    file, and a process that finds the file already rotated by another one
+    just reopens it.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, backup_count: int = 0,
+                 interval_hours: float = 0, encoding: str = 'utf-8'):
+        """
+        Initialize the handler.
+
+        Args:
+            filename: Log file path
+            max_bytes: Rotate when the file would exceed this size (0 disables)
+            backup_count: Rotated files kept
+            interval_hours: Rotate every this many hours from local midnight (0 disables)
+            encoding: File encoding
+        """
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.interval = interval_hours * 3600
+        try:
+            last_write = os.stat(filename).st_mtime
+        except OSError:
+            last_write = time.time()
+        self.rollover_at = self._next_rollover(last_write)
 
-def setup_logging(log_level=logging.INFO):
+    def _next_rollover(self, after: float) -> float:
+        """
+        Return the first rotation time after a moment.
+
+        Rotation times are aligned to local midnight (every interval from it),
+        so all processes sharing the file agree on them, and a file last
+        written before the latest one is rotated on the next write.
+        """
+        if not self.interval:
+            return float('inf')
+        day_start = time.mktime(time.localtime(after)[:3] + (0, 0, 0, 0, 0, -1))
+        return day_start + ((after - day_start) // self.interval + 1) * self.interval
+
+    def _last_rollover(self, now: float) -> float:
+        """Return the latest rotation time at or before now."""
+        if not self.interval:
+            return float('-inf')
+        day_start = time.mktime(time.localtime(now)[:3] + (0, 0, 0, 0, 0, -1))
+        return day_start + ((now - day_start) // self.interval) * self.interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        lock_file = None
+        if fcntl is not None:
+            lock_file = open(self.baseFilename + '.lock', 'a')
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if self._rotated_elsewhere():
+                if self.stream:
+                    self.stream.close()
+                    self.stream = None
+            elif self.stream is not None and self.stream.tell():
+                super().doRollover()
+            elif self.stream is None and self._due_on_disk():
+                super().doRollover()
+            self.rollover_at = self._next_rollover(time.time())
+        finally:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    def _due_on_disk(self) -> bool:
+        """
+        Whether the file at baseFilename itself still needs rotating.
+
+        Used when this process has not opened the file: another process may
+        have rotated it since this one decided to, in which case the file
+        is new (written after the latest rotation time) and small.
+        """
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return False
+        if not current.st_size:
+            return False
+        if self.maxBytes and current.st_size >= self.maxBytes:
+            return True
+        return current.st_mtime < self._last_rollover(time.time())
+
+    def _rotated_elsewhere(self) -> bool:
+        """Whether the open stream no longer is the file at baseFilename."""
+        if self.stream is None:
+            return False
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(self.stream.fileno())
+        return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that defers formatting to the listener thread.
+
+    The standard QueueHandler merges the message and its arguments before
+    queueing (so records can be pickled); the listener here runs in the same
+    process, so records are queued as they are. When the queue is full,
+    records below WARNING are dropped rather than making the caller wait,
+    and the number dropped is logged once there is room again.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            notice = logging.LogRecord(__name__, logging.WARNING, __file__, 0,
+                                       "Log queue full: dropped %d records", (dropped,), None)
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self.dropped += dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+            else:
+                self.dropped += 1
+
+
+class _Listener(QueueListener):
+    """QueueListener that waits for room for its stop sentinel in a bounded queue."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _log_level(value) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def setup_logging(log_level=None, config=None):
     """
     Set up logging configuration for the application.
-    
+
     Args:
-        log_level: The logging level to use (default: INFO)
-    """
-    # Create logs directory if it doesn't exist
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    # Create log filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(log_dir, f"plex_renamer_{timestamp}.log")
-    
-    # Configure logging
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()  # Also log to console
-        ]
+        log_level: The logging level to use (default: [GENERAL] log_level, else INFO)
+        config: Application Config with the [LOGGING] section, if any
+
+    Returns:
+        Path of the log file
+    """
+    global _listener
+
+    def setting(key, default):
+        return config.get('LOGGING', key, default) if config is not None else default
+
+    def int_setting(key, default):
+        return config.get_int('LOGGING', key, default) if config is not None else default
+
+    if log_level is None:
+        log_level = config.get('GENERAL', 'log_level', 'INFO') if config is not None else logging.INFO
+    level = _log_level(log_level)
+
+    log_dir = setting('directory', 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, setting('file_name', 'plex_renamer.log'))
+
+    file_handler = SizedTimedRotatingFileHandler(
+        log_file,
+        max_bytes=int_setting('max_size_mb', 10) * 1024 * 1024,
+        backup_count=int_setting('backup_count', 5),
+        interval_hours=float(setting('rotate_hours', 24) or 0)
     )
-    
+    if setting('format', 'text') == 'json':
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+    handlers = [file_handler]
+    if config is None or config.get_boolean('LOGGING', 'console', True):
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+        handlers.append(console_handler)
+
+    with _listener_lock:
+        stop_logging()
+        log_queue = queue.Queue(maxsize=max(0, int_setting('queue_size', 10000)))
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+        root.addHandler(NonBlockingQueueHandler(log_queue))
+        root.setLevel(level)
+        _listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
     # Log the start of the session
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging session started - Log file: {log_file}")
-    
+    logger.info("Logging session started - Log file: %s", log_file)
+
     return log_file
 
+
+def stop_logging():
+    """Write out queued records and stop the listener thread (also run at exit)."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(stop_logging)
+
+
 def get_logger(name):
     """
     Get a logger instance for the given name.
-    
+
     Args:
         name: The name for the logger (usually __name__)
-    
+
     Returns:
         logging.Logger: The logger instance
     """
-    return logging.getLogger(name) 
\ No newline at end of file
+    return logging.getLogger(name)
@@ -0,0 +1,355 @@
+"""
+Counters and histograms exported in the Prometheus text format.
+
+Instrumented code updates metrics in process memory, which is cheap
+enough for per-file and per-request updates. Gunicorn runs several
+workers, each with its own memory, so a registry can be shared through
+an SQLite table: every process writes its current values there
+periodically (and just before rendering), and ``/metrics`` sums the
+series of all processes, so whichever worker is scraped reports totals.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Latency-oriented default buckets, in seconds (as used by Prometheus clients)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        try:
+            return tuple(str(labels[name]) for name in self.label_names)
+        except KeyError as e:
+            raise ValueError(f"Metric {self.name} needs label {e}") from None
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Add amount (default 1) to the series with these label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def state(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    @staticmethod
+    def merge(states: Iterable[Dict[LabelValues, float]]) -> Dict[LabelValues, float]:
+        merged: Dict[LabelValues, float] = {}
+        for state in states:
+            for key, value in state.items():
+                merged[key] = merged.get(key, 0.0) + value
+        return merged
+
+    def render(self, state: Dict[LabelValues, float]) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in sorted(state.items())]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [count per bucket..., count above the last bucket, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        """Record one observation in the series with these label values."""
+        key = self._key(labels)
+        slot = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                slot = i
+                break
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            series[slot] += 1
+            series[-1] += value
+
+    def time(self, **labels) -> '_Timer':
+        """Return a context manager observing the seconds spent inside it."""
+        return _Timer(self, labels)
+
+    def state(self) -> Dict[LabelValues, List[float]]:
+        with self._lock:
+            return {key: list(series) for key, series in self._values.items()}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def merge(self, states: Iterable[Dict[LabelValues, List[float]]]) -> Dict[LabelValues, List[float]]:
+        merged: Dict[LabelValues, List[float]] = {}
+        for state in states:
+            for key, series in state.items():
+                if len(series) != len(self.buckets) + 2:
+                    continue  # Written by a process with different buckets
+                target = merged.setdefault(key, [0.0] * len(series))
+                for i, value in enumerate(series):
+                    target[i] += value
+        return merged
+
+    def render(self, state: Dict[LabelValues, List[float]]) -> List[str]:
+        lines = []
+        for key, series in sorted(state.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class SQLiteMetricsStore:
+    """Per-process metric values in an SQLite table shared between processes."""
+
+    def __init__(self, path: str, retention_seconds: float = 7 * 86400):
+        """
+        Initialize the store, creating the table if needed.
+
+        Args:
+            path: SQLite database file
+            retention_seconds: Values of processes that stopped writing this
+                long ago are deleted
+        """
+        self.retention_seconds = retention_seconds
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS metrics (
+                process TEXT,
+                name TEXT,
+                state TEXT,
+                updated_at REAL,
+                PRIMARY KEY (process, name)
+            )
+        ''')
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def write(self, process: str, states: Dict[str, Dict]):
+        """Replace one process's values (metric name -> {label values: value})."""
+        now = time.time()
+        rows = [(process, name, json.dumps([[list(key), value] for key, value in state.items()]), now)
+                for name, state in states.items()]
+        with self._lock, self._db:
+            self._db.executemany('INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?)', rows)
+            self._db.execute('DELETE FROM metrics WHERE updated_at < ?', (now - self.retention_seconds,))
+
+    def read(self) -> Dict[str, List[Dict]]:
+        """Return every process's values, grouped by metric name."""
+        with self._lock:
+            rows = self._db.execute('SELECT name, state FROM metrics').fetchall()
+        states: Dict[str, List[Dict]] = {}
+        for name, state in rows:
+            states.setdefault(name, []).append({tuple(key): value for key, value in json.loads(state)})
+        return states
+
+
+class MetricsRegistry:
+    """Holds the metrics of a process and renders them, summed across processes if shared."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._store: Optional[SQLiteMetricsStore] = None
+        self._pid = os.getpid()
+        self._process = f"{self._pid}-{time.time():.6f}"
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        """Create (or return the already registered) counter."""
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Create (or return the already registered) histogram."""
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def _check_fork(self):
+        # A forked child inherits the parent's values; it must only report its own
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._process = f"{self._pid}-{time.time():.6f}"
+            for metric in list(self._metrics.values()):
+                metric.reset()
+
+    def share(self, store: SQLiteMetricsStore, interval: float = 5.0):
+        """
+        Write this process's values to a shared store every interval seconds.
+
+        Args:
+            store: Store shared by all worker processes
+            interval: Seconds between writes; other workers' values seen by
+                a scrape are at most this old
+        """
+        self._store = store
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, args=(interval,),
+                                             name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def flush(self):
+        """Write this process's current values to the shared store, if any."""
+        if self._store is None:
+            return
+        self._check_fork()
+        try:
+            self._store.write(self._process, {name: metric.state() for name, metric in self._metrics.items()})
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write metrics: {e}")
+
+    def render(self, extra: Optional[Callable[[], List[str]]] = None) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Args:
+            extra: Optional callable returning additional, already formatted
+                lines (e.g. gauges computed at scrape time)
+
+        Returns:
+            Exposition text
+        """
+        self._check_fork()
+        shared = None
+        if self._store is not None:
+            self.flush()
+            try:
+                shared = self._store.read()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read shared metrics: {e}")
+
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            states = shared.get(name, []) if shared is not None else [metric.state()]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render(metric.merge(states)))
+        if extra is not None:
+            lines.extend(extra())
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry used by instrumented modules
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+    """Create a counter in the process-wide registry."""
+    return REGISTRY.counter(name, documentation, labels)
+
+
+def histogram(name: str, documentation: str, labels: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    """Create a histogram in the process-wide registry."""
+    return REGISTRY.histogram(name, documentation, labels, buckets)
+
+
+def gauge_lines(name: str, documentation: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """
+    Format a gauge computed at scrape time.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        samples: (labels, value) pairs
+
+    Returns:
+        Exposition lines
+    """
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+    return lines
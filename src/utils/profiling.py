@@ -0,0 +1,282 @@
+"""
+Opt-in profiling of scans, jobs and individual requests.
+
+A ProfileSession runs one cProfile profiler per participating thread (the
+scan pipeline's walk, parse and lookup workers each enable it on their own
+thread) and merges them into a single pstats report when it is saved.
+Optionally a sampler thread also records the participating threads' stacks
+at a fixed interval, which shows where wall-clock time goes while threads
+wait on the network or the disk (cProfile only attributes it to the call
+that blocked). Samples are written in the collapsed-stack format read by
+flamegraph.pl and speedscope.
+
+Sessions are saved by a ProfileStore to a directory (logs/profiles by
+default) that the web admin endpoints serve and the GUI writes to.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# File suffixes written for a saved session
+PSTATS_SUFFIX = '.pstats'
+SUMMARY_SUFFIX = '.txt'
+SAMPLES_SUFFIX = '.folded'
+PROFILE_SUFFIXES = (PSTATS_SUFFIX, SUMMARY_SUFFIX, SAMPLES_SUFFIX)
+
+
+class ProfileSession:
+    """Collects cProfile data (and optional stack samples) from several threads."""
+
+    def __init__(self, label: str = 'profile', sample_interval: Optional[float] = None,
+                 max_stack_depth: int = 64):
+        """
+        Initialize a session; nothing is recorded until a thread enables it.
+
+        Args:
+            label: Short description used to name the saved profile
+            sample_interval: Seconds between stack samples, or None to only
+                record cProfile data
+            max_stack_depth: Innermost frames kept per stack sample
+        """
+        self.label = label
+        self.sample_interval = sample_interval
+        self.max_stack_depth = max_stack_depth
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._profiles: List[cProfile.Profile] = []
+        self._active: Dict[int, Optional[cProfile.Profile]] = {}
+        self._samples: Dict[str, int] = {}
+        self._sample_count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        if sample_interval:
+            self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+            self._sampler.start()
+
+    @property
+    def sampling(self) -> bool:
+        return self._sampler is not None
+
+    def enable(self):
+        """Start profiling the calling thread (no-op if it already is)."""
+        ident = threading.get_ident()
+        with self._lock:
+            if ident in self._active or self._stop.is_set():
+                return
+            self._active[ident] = None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Python 3.12+ allows one active profiler per process, and it
+            # already sees every thread; the thread is still sampled
+            logger.debug(f"Not profiling thread {threading.current_thread().name}: {e}")
+            return
+        with self._lock:
+            self._active[ident] = profile
+
+    def disable(self):
+        """Stop profiling the calling thread and keep what it recorded."""
+        with self._lock:
+            profile = self._active.pop(threading.get_ident(), None)
+        if profile is not None:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    @contextmanager
+    def profile_thread(self):
+        """Profile the calling thread for the duration of the block."""
+        self.enable()
+        try:
+            yield self
+        finally:
+            self.disable()
+
+    def wrap(self, target: Callable) -> Callable:
+        """Return target wrapped so that the thread running it is profiled."""
+        def profiled(*args, **kwargs):
+            with self.profile_thread():
+                return target(*args, **kwargs)
+        return profiled
+
+    def stop(self):
+        """Stop sampling; threads still profiling keep their data until they finish."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.finished_at = time.time()
+        if self._sampler is not None:
+            self._sampler.join(timeout=5)
+
+    def _frame_name(self, frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                idents = list(self._active)
+            if not idents:
+                continue
+            frames = sys._current_frames()
+            stacks = []
+            for ident in idents:
+                frame = frames.get(ident)
+                names = []
+                while frame is not None and len(names) < self.max_stack_depth:
+                    names.append(self._frame_name(frame))
+                    frame = frame.f_back
+                if names:
+                    stacks.append(';'.join(reversed(names)))
+            with self._lock:
+                self._sample_count += 1
+                for stack in stacks:
+                    self._samples[stack] = self._samples.get(stack, 0) + 1
+
+    def stats(self) -> Optional[pstats.Stats]:
+        """Return the merged cProfile data of all finished threads, or None if there is none."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def summary(self, limit: int = 40) -> str:
+        """
+        Return a plain-text report of the hottest functions.
+
+        Args:
+            limit: Functions listed per ordering
+
+        Returns:
+            Functions ordered by cumulative time, then by own time
+        """
+        finished = self.finished_at or time.time()
+        header = (f"Profile: {self.label}\n"
+                  f"Wall-clock seconds: {finished - self.started_at:.3f}\n"
+                  f"Profiled threads: {len(self._profiles)}\n")
+        if self.sampling:
+            header += f"Stack samples: {self._sample_count} every {self.sample_interval * 1000:g} ms\n"
+        stats = self.stats()
+        if stats is None:
+            return header + "\nNo profiling data was recorded.\n"
+
+        stream = io.StringIO()
+        stats.stream = stream
+        stream.write("\n=== By cumulative time ===\n")
+        stats.sort_stats('cumulative').print_stats(limit)
+        stream.write("\n=== By own time ===\n")
+        stats.sort_stats('tottime').print_stats(limit)
+        return header + stream.getvalue()
+
+    def folded_samples(self) -> str:
+        """Return stack samples as collapsed stacks ("outer;inner count" per line)."""
+        with self._lock:
+            samples = sorted(self._samples.items())
+        return ''.join(f"{stack} {count}\n" for stack, count in samples)
+
+
+class ProfileStore:
+    """Directory of saved profiles, pruned to the most recent ones."""
+
+    def __init__(self, directory: str = 'logs/profiles', max_profiles: int = 50):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory the profile files are written to
+            max_profiles: Saved profiles kept; older ones are deleted
+        """
+        self.directory = directory
+        self.max_profiles = max(1, max_profiles)
+
+    @classmethod
+    def from_config(cls, config) -> 'ProfileStore':
+        """Build a store from the [PROFILING] configuration section."""
+        return cls(
+            directory=config.get('PROFILING', 'directory', 'logs/profiles'),
+            max_profiles=config.get_int('PROFILING', 'max_profiles', 50)
+        )
+
+    def save(self, session: ProfileSession, name: Optional[str] = None) -> Dict:
+        """
+        Write a session's pstats file, text summary and stack samples.
+
+        Args:
+            session: Stopped (or stoppable) profile session
+            name: Base file name; defaults to the label and a timestamp
+
+        Returns:
+            Dictionary with the profile name and its file names
+        """
+        session.stop()
+        if name is None:
+            name = f"{session.label}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(session.started_at))}"
+        name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+        os.makedirs(self.directory, exist_ok=True)
+
+        files = []
+        stats = session.stats()
+        if stats is not None:
+            stats.dump_stats(os.path.join(self.directory, name + PSTATS_SUFFIX))
+            files.append(name + PSTATS_SUFFIX)
+        with open(os.path.join(self.directory, name + SUMMARY_SUFFIX), 'w', encoding='utf-8') as f:
+            f.write(session.summary())
+        files.append(name + SUMMARY_SUFFIX)
+        if session.sampling:
+            with open(os.path.join(self.directory, name + SAMPLES_SUFFIX), 'w', encoding='utf-8') as f:
+                f.write(session.folded_samples())
+            files.append(name + SAMPLES_SUFFIX)
+
+        self._prune()
+        logger.info(f"Saved profile {name} to {self.directory}")
+        return {'name': name, 'files': files}
+
+    def list_profiles(self) -> List[Dict]:
+        """
+        Return saved profiles, newest first.
+
+        Returns:
+            List of dictionaries with name, files, size and created (epoch seconds)
+        """
+        profiles: Dict[str, Dict] = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+        for entry in entries:
+            stem, suffix = os.path.splitext(entry.name)
+            if suffix not in PROFILE_SUFFIXES or not entry.is_file():
+                continue
+            stat = entry.stat()
+            profile = profiles.setdefault(stem, {'name': stem, 'files': [], 'size': 0, 'created': stat.st_mtime})
+            profile['files'].append(entry.name)
+            profile['size'] += stat.st_size
+            profile['created'] = min(profile['created'], stat.st_mtime)
+        for profile in profiles.values():
+            profile['files'].sort()
+        return sorted(profiles.values(), key=lambda p: p['created'], reverse=True)
+
+    def _prune(self):
+        for profile in self.list_profiles()[self.max_profiles:]:
+            for file_name in profile['files']:
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                except OSError as e:
+                    logger.warning(f"Could not remove old profile file {file_name}: {e}")
@@ -0,0 +1,312 @@
+"""
+Lightweight tracing spans in the OpenTelemetry data model.
+
+``span(name, **attributes)`` times a block of work. Spans opened inside it
+(on the same thread, or on threads started through
+``src.utils.jobreport.run_in_context``) become its children, so one job's
+walk, parse calls, metadata requests, planning and file operations form a
+single trace that shows which files or shows dominate its latency.
+
+Finished spans are queued and exported in batches by a background thread,
+as OTLP/JSON: either appended to a local JSONL file (one export request per
+line, the OpenTelemetry Collector file format) or posted to an OTLP/HTTP
+collector such as ``tools/trace_collector.py``. While tracing is disabled,
+``span`` returns a shared no-op object, so instrumented code pays one
+attribute check per call.
+"""
+
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_CURRENT_SPAN: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def _attribute_value(value) -> Dict:
+    # bool before int: bool is a subclass of int
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _attributes(attributes: Dict) -> List[Dict]:
+    return [{'key': key, 'value': _attribute_value(value)}
+            for key, value in attributes.items() if value is not None]
+
+
+class Span:
+    """One timed operation of a trace."""
+
+    __slots__ = ('tracer', 'name', 'kind', 'attributes', 'trace_id', 'span_id', 'parent_id',
+                 'start_ns', 'end_ns', '_start_perf', 'status', 'status_message', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, kind: int, attributes: Dict, parent: Optional['Span']):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else ''
+        self.start_ns = 0
+        self.end_ns = 0
+        self._start_perf = 0
+        self.status = STATUS_OK
+        self.status_message = ''
+        self._token = None
+
+    def set_attribute(self, key: str, value):
+        """Set (or replace) an attribute."""
+        self.attributes[key] = value
+
+    def record_error(self, error):
+        """Mark the span as failed."""
+        self.status = STATUS_ERROR
+        self.status_message = str(error)
+
+    def __enter__(self) -> 'Span':
+        self.start_ns = time.time_ns()
+        self._start_perf = time.perf_counter_ns()
+        self._token = _CURRENT_SPAN.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Wall-clock start plus a monotonic duration, so clock steps cannot give negative spans
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._start_perf)
+        _CURRENT_SPAN.reset(self._token)
+        if exc is not None and self.status != STATUS_ERROR:
+            self.record_error(exc)
+        self.tracer.finish(self)
+        return False
+
+    def to_otlp(self) -> Dict:
+        """Return the span in OTLP/JSON form."""
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': _attributes(self.attributes),
+            'status': {'code': self.status}
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.status_message:
+            span['status']['message'] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def record_error(self, error):
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonlSpanExporter:
+    """Appends OTLP/JSON export requests to a file, one per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, payload: Dict):
+        # One write per batch; with O_APPEND, lines from several workers do not interleave
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(payload, separators=(',', ':')) + '\n')
+
+
+class OTLPHttpSpanExporter:
+    """Posts OTLP/JSON export requests to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def export(self, payload: Dict):
+        response = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class Tracer:
+    """Creates spans and exports finished ones in batches from a background thread."""
+
+    def __init__(self):
+        self.enabled = False
+        self.exporter = None
+        self.service_name = 'plex-renamer'
+        self.batch_size = 512
+        self.flush_interval = 1.0
+        self.dropped = 0
+        self._queue: Optional[queue.Queue] = None
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def configure(self, exporter, service_name: str = 'plex-renamer', max_queue: int = 10000,
+                  batch_size: int = 512, flush_interval: float = 1.0):
+        """
+        Enable tracing with an exporter.
+
+        Args:
+            exporter: Object with an ``export(payload)`` method
+            service_name: Reported as the ``service.name`` resource attribute
+            max_queue: Finished spans buffered before new ones are dropped
+            batch_size: Spans per export request
+            flush_interval: Seconds between exports of a partial batch
+        """
+        self.shutdown()
+        self.exporter = exporter
+        self.service_name = service_name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._export_loop, name='trace-export', daemon=True)
+        self._worker.start()
+        self.enabled = True
+
+    def shutdown(self):
+        """Disable tracing and export what is still queued."""
+        self.enabled = False
+        if self._worker is not None:
+            self._stop.set()
+            self._worker.join(timeout=10)
+            self._worker = None
+
+    def start_span(self, name: str, kind: int = KIND_INTERNAL, attributes: Optional[Dict] = None) -> Span:
+        """Create a span that is a child of the calling context's current span."""
+        return Span(self, name, kind, attributes or {}, _CURRENT_SPAN.get())
+
+    def finish(self, span: Span):
+        """Queue a finished span for export."""
+        try:
+            self._queue.put_nowait(span)
+        except (queue.Full, AttributeError):
+            self.dropped += 1
+
+    def _payload(self, spans: List[Span]) -> Dict:
+        return {'resourceSpans': [{
+            'resource': {'attributes': _attributes({'service.name': self.service_name,
+                                                    'process.pid': os.getpid()})},
+            'scopeSpans': [{
+                'scope': {'name': 'plex_renamer'},
+                'spans': [span.to_otlp() for span in spans]
+            }]
+        }]}
+
+    def _export_loop(self):
+        pending: List[Span] = []
+        deadline = time.monotonic() + self.flush_interval
+        source = self._queue
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                pending.append(source.get(timeout=max(0.0, min(0.1, deadline - time.monotonic()))))
+            except queue.Empty:
+                pass
+            if len(pending) >= self.batch_size or time.monotonic() >= deadline or (stopping and source.empty()):
+                if pending:
+                    self._export(pending)
+                    pending = []
+                deadline = time.monotonic() + self.flush_interval
+                if stopping and source.empty():
+                    return
+
+    def _export(self, spans: List[Span]):
+        try:
+            self.exporter.export(self._payload(spans))
+        except Exception as e:
+            logger.warning(f"Could not export {len(spans)} trace spans: {e}")
+
+
+# Process-wide tracer used by instrumented modules
+TRACER = Tracer()
+
+
+def span(name: str, kind: int = KIND_INTERNAL, **attributes):
+    """
+    Return a span context manager for a block of work.
+
+    Args:
+        name: Span name, e.g. "parse_file"
+        kind: KIND_INTERNAL, or KIND_CLIENT for outgoing requests
+        **attributes: Span attributes (None values are left out)
+
+    Returns:
+        A Span, or a no-op stand-in while tracing is disabled
+    """
+    if not TRACER.enabled:
+        return NOOP_SPAN
+    return TRACER.start_span(name, kind, attributes)
+
+
+def current_span():
+    """Return the calling context's current span (a no-op stand-in if none)."""
+    return _CURRENT_SPAN.get() or NOOP_SPAN
+
+
+def configure_tracing(config) -> bool:
+    """
+    Enable the process-wide tracer from the [TRACING] configuration section.
+
+    Args:
+        config: Application Config
+
+    Returns:
+        True if tracing was enabled
+    """
+    if not config.get_boolean('TRACING', 'enabled', False):
+        return False
+    exporter_name = config.get('TRACING', 'exporter', 'jsonl')
+    if exporter_name == 'otlp':
+        exporter = OTLPHttpSpanExporter(config.get('TRACING', 'endpoint', 'http://127.0.0.1:4318/v1/traces'))
+    else:
+        exporter = JsonlSpanExporter(config.get('TRACING', 'path', 'logs/traces.jsonl'))
+    TRACER.configure(
+        exporter,
+        service_name=config.get('TRACING', 'service_name', 'plex-renamer'),
+        max_queue=config.get_int('TRACING', 'max_queue', 10000)
+    )
+    logger.info(f"Tracing enabled ({exporter_name} exporter)")
+    return True
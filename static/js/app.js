@@ -3,13 +3,42 @@
  * Handles UI interactions, API calls, and dynamic content updates
  */
 
+// Results table: only the rows in view are rendered, and pages of results
+// are fetched from the server as they scroll into view
+const RESULT_ROW_HEIGHT = 64;  // px, matches .result-row in style.css
+const RESULTS_PAGE_SIZE = 200;
+const RESULTS_OVERSCAN = 10;   // Rows rendered above and below the viewport
+const MAX_CACHED_PAGES = 50;
+
+// Escapes text (file names, paths, server messages) for use in HTML
+// markup and quoted attribute values
+const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+
+function escapeHtml(value) {
+    return String(value ?? '').replace(/[&<>"']/g, char => HTML_ESCAPES[char]);
+}
+
 class PlexMediaRenamer {
     constructor() {
         this.currentTheme = localStorage.getItem('theme') || 'dark';
         this.discoveredFolders = [];
-        this.scanResults = [];
+        this.resultsQuery = { q: '', metadata_status: '', media_type: '', status: '', sort: 'id', order: 'asc' };
+        this.resultsPages = new Map();  // Page number -> rows
+        this.pendingPages = new Set();
+        this.resultsGeneration = 0;     // Bumped whenever cached pages go stale
+        this.operationsVersion = null;  // Server version of the rows held; deltas are fetched from it
+        this.resultsCount = { filtered: 0, total: 0 };
+        this.streamedRows = null;       // Provisional rows while a scan is running
+        // Selected result ids; with `all` set, every row matching the filters
+        // is selected and `ids` holds the ones unticked since
+        this.selection = { all: false, ids: new Set() };
+        this.renderPending = false;
         this.metadataIssues = [];
+        this.metadataIssueCount = 0;
         this.isScanning = false;
+        this.events = null;
+        this.jobId = null;        // Scan whose results are shown
+        this.activeJobId = null;  // Job whose progress is followed
         this.selectedFolders = new Set();
 
         this.init();
@@ -19,7 +48,7 @@ class PlexMediaRenamer {
         this.setupTheme();
         this.setupEventListeners();
         this.loadConfiguration();
-        this.startStatusPolling();
+        this.connectEvents();
     }
 
     setupTheme() {
@@ -90,6 +119,51 @@ class PlexMediaRenamer {
             this.toggleAllResults(e.target.checked);
         });
 
+        // Results filtering, sorting and paging (all server-side)
+        let searchTimer = null;
+        document.getElementById('resultsSearch').addEventListener('input', (e) => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => this.setResultsQuery({ q: e.target.value }), 250);
+        });
+
+        [['resultsMetadataFilter', 'metadata_status'], ['resultsTypeFilter', 'media_type'],
+            ['resultsStatusFilter', 'status']].forEach(([id, field]) => {
+            document.getElementById(id).addEventListener('change', (e) => {
+                this.setResultsQuery({ [field]: e.target.value });
+            });
+        });
+
+        document.querySelectorAll('#resultsTable th.sortable').forEach(header => {
+            header.addEventListener('click', () => {
+                const sort = header.dataset.sort;
+                const order = this.resultsQuery.sort === sort && this.resultsQuery.order === 'asc' ? 'desc' : 'asc';
+                this.setResultsQuery({ sort, order });
+            });
+        });
+
+        document.getElementById('resultsViewport').addEventListener('scroll', () => {
+            this.scheduleRender();
+        });
+
+        window.addEventListener('resize', () => {
+            this.scheduleRender();
+        });
+
+        // Row events are delegated, so re-rendering rows never re-binds listeners
+        const tableBody = document.getElementById('resultsTableBody');
+        tableBody.addEventListener('change', (e) => {
+            if (e.target.classList.contains('result-checkbox')) {
+                this.toggleResultSelection(parseInt(e.target.dataset.index), e.target.checked);
+            }
+        });
+
+        tableBody.addEventListener('click', (e) => {
+            const button = e.target.closest('[data-action="details"]');
+            if (button && !button.disabled) {
+                this.showFileDetails(parseInt(button.dataset.index));
+            }
+        });
+
         // Metadata issues
         document.getElementById('showMetadataIssues').addEventListener('click', () => {
             this.showMetadataIssues();
@@ -157,6 +231,13 @@ class PlexMediaRenamer {
         document.getElementById('createMovieFolders').checked = config.create_movie_folders || false;
         document.getElementById('includeEpisodeTitle').checked = config.include_episode_title || false;
         document.getElementById('includeSeriesId').checked = config.include_series_id || false;
+        document.getElementById('operationMode').value = config.operation_mode || 'rename';
+    }
+
+    operationLabel() {
+        const select = document.getElementById('operationMode');
+        const mode = select ? select.value : 'rename';
+        return mode.charAt(0).toUpperCase() + mode.slice(1);
     }
 
     async discoverMediaFolders() {
@@ -184,6 +265,9 @@ class PlexMediaRenamer {
 
             if (data.success) {
                 this.showAlert('Media folder discovery started', 'info');
+                this.activeJobId = data.job_id;
+                this.isScanning = true;
+                this.pollStatus();
             } else {
                 this.showAlert(data.error || 'Failed to start discovery', 'error');
             }
@@ -238,14 +322,14 @@ class PlexMediaRenamer {
         card.innerHTML = `
             <div class="folder-header">
                 <div>
-                    <div class="folder-name">${folder.name}</div>
-                    <div class="folder-type ${typeClass}">${folder.detected_type || 'Unknown'}</div>
+                    <div class="folder-name">${escapeHtml(folder.name)}</div>
+                    <div class="folder-type ${escapeHtml(typeClass)}">${escapeHtml(folder.detected_type || 'Unknown')}</div>
                 </div>
                 <div class="confidence-score">${confidencePercent}%</div>
             </div>
             <div class="folder-stats">
-                <span>${folder.media_file_count} media files</span>
-                <span>${folder.subdirectory_count} subdirs</span>
+                <span>${escapeHtml(folder.media_file_count)} media files</span>
+                <span>${escapeHtml(folder.subdirectory_count)} subdirs</span>
             </div>
         `;
 
@@ -297,8 +381,10 @@ class PlexMediaRenamer {
 
             if (data.success) {
                 this.showAlert('Scan started successfully', 'info');
+                this.activeJobId = data.job_id;
                 this.isScanning = true;
                 this.showProgress();
+                this.pollStatus();
             } else {
                 this.showAlert(data.error || 'Failed to start scan', 'error');
             }
@@ -312,11 +398,10 @@ class PlexMediaRenamer {
     }
 
     async applyChanges() {
-        const selectedRows = document.querySelectorAll('#resultsTableBody input[type="checkbox"]:checked');
         const dryRun = document.getElementById('dryRunMode').checked;
         const applyButton = document.getElementById('applyChangesButton');
 
-        if (selectedRows.length === 0) {
+        if (this.selectedCount() === 0) {
             this.showAlert('Please select files to rename', 'warning');
             return;
         }
@@ -325,35 +410,43 @@ class PlexMediaRenamer {
             applyButton.disabled = true;
             applyButton.innerHTML = '<i class="bi bi-arrow-clockwise"></i> Processing...';
 
-            const selectedOperations = Array.from(selectedRows).map(checkbox =>
-                parseInt(checkbox.dataset.index)
-            );
-
-            const response = await fetch('/api/rename', {
+            // The apply runs as a background job; its results are streamed back
+            const response = await fetch('/api/apply', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({
-                    operations: selectedOperations,
-                    dry_run: dryRun
+                    job_id: this.jobId,
+                    dry_run: dryRun,
+                    operation_type: document.getElementById('operationMode').value,
+                    ...this.selectionRequest()
                 })
             });
 
             const data = await response.json();
 
-            if (data.success) {
-                const message = dryRun ?
-                    `Dry run completed: ${data.summary.successful}/${data.summary.total} operations would succeed` :
-                    `Rename completed: ${data.summary.successful}/${data.summary.total} files renamed successfully`;
+            if (!data.success) {
+                this.showAlert(data.error || 'Failed to apply changes', 'error');
+                return;
+            }
 
-                this.showAlert(message, data.summary.failed > 0 ? 'warning' : 'success');
+            const status = await this.followApplyResults(data.job_id, data.total);
+            const summary = status && status.summary;
+            if (!summary) {
+                this.showAlert(status && status.error ? status.error : 'Apply did not finish', 'error');
+                return;
+            }
 
-                if (!dryRun) {
-                    this.loadScanResults(); // Refresh results
-                }
-            } else {
-                this.showAlert(data.error || 'Failed to apply changes', 'error');
+            const message = dryRun ?
+                `Dry run completed: ${summary.successful}/${summary.total} operations would succeed` :
+                `${this.operationLabel()} completed: ${summary.successful}/${summary.total} files processed successfully`;
+
+            this.showAlert(message, summary.failed > 0 ? 'warning' : 'success');
+            this.showJobReport(dryRun ? 'Last dry run' : 'Last apply', status.report);
+
+            if (!dryRun) {
+                this.refreshResults(); // Patch the rows that changed
             }
         } catch (error) {
             console.error('Error applying changes:', error);
@@ -364,29 +457,236 @@ class PlexMediaRenamer {
         }
     }
 
+    async followApplyResults(jobId, total) {
+        // Reads the NDJSON result stream, resuming after the last result if the
+        // connection drops; returns the job status from the final summary line
+        let after = 0;
+        let failures = 0;
+        while (failures < 5) {
+            try {
+                const response = await fetch(`/api/apply/${jobId}/results?after=${after}`);
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+
+                for (;;) {
+                    const { value, done } = await reader.read();
+                    if (done) {
+                        break;
+                    }
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\n');
+                    buffer = lines.pop();
+                    for (const line of lines.filter(Boolean)) {
+                        const item = JSON.parse(line);
+                        if (item.type === 'result') {
+                            after = item.seq;
+                            this.updateProgress(total ? Math.round(after * 100 / total) : 100,
+                                `Processed ${after} of ${total}: ${item.message}`);
+                            this.showProgress();
+                        } else if (item.type === 'summary') {
+                            this.hideProgress();
+                            return item.status;
+                        }
+                    }
+                }
+            } catch (error) {
+                console.warn('Apply result stream interrupted, reconnecting...', error);
+            }
+            failures += 1;
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+        this.hideProgress();
+        return null;
+    }
+
+    setResultsQuery(changes) {
+        Object.assign(this.resultsQuery, changes);
+        if (this.selection.all) {
+            // "All" meant all rows matching the previous filters
+            this.selection = { all: false, ids: new Set() };
+        }
+        document.getElementById('resultsViewport').scrollTop = 0;
+        this.loadScanResults();
+    }
+
     async loadScanResults() {
+        // Drop cached pages and fetch the one in view again; the rest are
+        // fetched as they scroll into view
+        this.resultsGeneration += 1;
+        this.resultsPages.clear();
+        this.pendingPages.clear();
+        this.operationsVersion = null;
+        await this.fetchResultsPage(this.currentResultsPage());
+    }
+
+    async refreshResults() {
+        // Fetch only the rows changed since the version held and patch them
+        // in place; when rows were added, removed or would move, reload the
+        // page in view instead
+        if (this.streamedRows || this.operationsVersion === null || !this.jobId) {
+            return this.loadScanResults();
+        }
+        const generation = this.resultsGeneration;
+
         try {
-            const response = await fetch('/api/scan/results');
+            const response = await fetch(`/api/scan/results?${this.resultsParams({ since: this.operationsVersion })}`);
             const data = await response.json();
 
+            if (generation !== this.resultsGeneration || !data.success) {
+                return;
+            }
+            if (data.reset || data.added.length || data.removed.length || !this.patchResults(data.changed)) {
+                return this.loadScanResults();
+            }
+            this.operationsVersion = data.version;
+            this.resultsCount = { filtered: data.filtered, total: data.total };
+            this.scheduleRender();
+        } catch (error) {
+            console.error('Error refreshing scan results:', error);
+        }
+    }
+
+    patchResults(changedRows) {
+        // Returns false without patching if a row's sort value changed,
+        // since the row would then belong somewhere else
+        const sortField = this.resultsQuery.sort;
+        const updates = new Map(changedRows.map(row => [row.id, row]));
+        const pages = Array.from(this.resultsPages.values());
+
+        const moved = pages.some(rows => rows.some(row =>
+            updates.has(row.id) && updates.get(row.id)[sortField] !== row[sortField]));
+        if (moved) {
+            return false;
+        }
+
+        pages.forEach(rows => rows.forEach((row, i) => {
+            if (updates.has(row.id)) {
+                rows[i] = updates.get(row.id);
+            }
+        }));
+        return true;
+    }
+
+    resultsParams(extra) {
+        const params = new URLSearchParams(extra);
+        if (this.jobId) {
+            params.set('job_id', this.jobId);
+        }
+        Object.entries(this.resultsQuery).forEach(([key, value]) => {
+            if (value !== '' && value !== null) {
+                params.set(key, value);
+            }
+        });
+        return params;
+    }
+
+    currentResultsPage() {
+        const viewport = document.getElementById('resultsViewport');
+        return Math.floor(viewport.scrollTop / RESULT_ROW_HEIGHT / RESULTS_PAGE_SIZE);
+    }
+
+    async fetchResultsPage(page) {
+        if (this.resultsPages.has(page) || this.pendingPages.has(page)) {
+            return;
+        }
+        const version = this.resultsGeneration;
+        this.pendingPages.add(page);
+
+        try {
+            const params = this.resultsParams({ page: page + 1, per_page: RESULTS_PAGE_SIZE });
+            const response = await fetch(`/api/scan/results?${params}`);
+            const data = await response.json();
+
+            if (version !== this.resultsGeneration) {
+                return; // Filters changed or results were reloaded meanwhile
+            }
             if (data.success) {
-                this.scanResults = data.results;
-                this.metadataIssues = data.metadata_issues || [];
-                this.renderScanResults();
+                // Pin the scan so applying and details refer to the rows shown
+                this.jobId = data.job_id;
+                this.resultsPages.set(page, data.results);
+                this.resultsCount = { filtered: data.filtered, total: data.total };
+                // Pages fetched at different times may differ; deltas start from the oldest
+                this.operationsVersion = this.operationsVersion === null ?
+                    data.version : Math.min(this.operationsVersion, data.version);
+                this.metadataIssueCount = data.metadata_issue_count || 0;
+                this.evictResultsPages();
                 this.updateMetadataIssuesCount();
+                this.scheduleRender();
             }
         } catch (error) {
             console.error('Error loading scan results:', error);
+        } finally {
+            if (version === this.resultsGeneration) {
+                this.pendingPages.delete(page);
+            }
         }
     }
 
+    evictResultsPages() {
+        // Keep memory bounded on very large scans by dropping the pages
+        // farthest from the viewport
+        const current = this.currentResultsPage();
+        while (this.resultsPages.size > MAX_CACHED_PAGES) {
+            const farthest = Array.from(this.resultsPages.keys()).reduce((a, b) =>
+                Math.abs(a - current) >= Math.abs(b - current) ? a : b);
+            this.resultsPages.delete(farthest);
+        }
+    }
+
+    resultCount() {
+        return this.streamedRows ? this.streamedRows.length : this.resultsCount.filtered;
+    }
+
+    resultAt(position) {
+        if (this.streamedRows) {
+            return this.streamedRows[position];
+        }
+        const page = Math.floor(position / RESULTS_PAGE_SIZE);
+        const rows = this.resultsPages.get(page);
+        if (!rows) {
+            this.fetchResultsPage(page);
+            return null;
+        }
+        return rows[position - page * RESULTS_PAGE_SIZE];
+    }
+
+    updateResultsInfo() {
+        const { filtered, total } = this.streamedRows ?
+            { filtered: this.streamedRows.length, total: this.streamedRows.length } : this.resultsCount;
+        const selected = this.selectedCount();
+        const countNote = filtered !== total ? `${filtered} of ${total} results match` : `${total} results`;
+        document.getElementById('resultsPageInfo').textContent =
+            selected ? `${countNote}, ${selected} selected` : countNote;
+
+        document.querySelectorAll('#resultsTable th.sortable').forEach(header => {
+            header.classList.remove('asc', 'desc');
+            if (header.dataset.sort === this.resultsQuery.sort) {
+                header.classList.add(this.resultsQuery.order);
+            }
+        });
+    }
+
+    scheduleRender() {
+        if (this.renderPending) {
+            return;
+        }
+        this.renderPending = true;
+        requestAnimationFrame(() => {
+            this.renderPending = false;
+            this.renderScanResults();
+        });
+    }
+
     renderScanResults() {
         const tableBody = document.getElementById('resultsTableBody');
+        const viewport = document.getElementById('resultsViewport');
+        const count = this.resultCount();
 
-        // Clear metadata issues for fresh tracking
-        this.metadataIssues = [];
+        this.updateResultsInfo();
+        this.updateApplyButton();
 
-        if (this.scanResults.length === 0) {
+        if (count === 0) {
             tableBody.innerHTML = `
                 <tr class="empty-state">
                     <td colspan="6">
@@ -401,68 +701,86 @@ class PlexMediaRenamer {
             return;
         }
 
-        const rows = this.scanResults.map((result, index) => this.createResultRow(result, index));
-        tableBody.innerHTML = rows.join('');
+        const visible = Math.ceil(viewport.clientHeight / RESULT_ROW_HEIGHT);
+        const first = Math.max(0, Math.floor(viewport.scrollTop / RESULT_ROW_HEIGHT) - RESULTS_OVERSCAN);
+        const last = Math.min(count, first + visible + 2 * RESULTS_OVERSCAN);
 
-        // Update metadata issues count
-        this.updateMetadataIssuesCount();
+        const rows = [];
+        for (let position = first; position < last; position++) {
+            const result = this.resultAt(position);
+            rows.push(result ? this.createResultRow(result, result.id) : this.createPlaceholderRow());
+        }
 
-        // Add event listeners to checkboxes
-        document.querySelectorAll('.result-checkbox').forEach(checkbox => {
-            checkbox.addEventListener('change', (e) => {
-                this.updateApplyButton();
-            });
-        });
+        // Spacer rows keep the scrollbar sized for the whole result set
+        tableBody.innerHTML = this.createSpacerRow(first) + rows.join('') + this.createSpacerRow(count - last);
+        document.getElementById('selectAllCheckbox').checked = this.selection.all && this.selection.ids.size === 0;
+    }
 
-        // Enable apply button if there are valid operations
-        this.updateApplyButton();
+    appendStreamedResults(items) {
+        // Rows arrive while the scan is still running; they are replaced by
+        // the stored results once it completes
+        if (!this.streamedRows) {
+            this.streamedRows = [];
+        }
+        items.forEach(item => this.streamedRows.push({ ...item, provisional: true }));
+        this.scheduleRender();
+    }
+
+    createSpacerRow(rowCount) {
+        return rowCount > 0 ?
+            `<tr class="spacer-row" style="height: ${rowCount * RESULT_ROW_HEIGHT}px"><td colspan="6"></td></tr>` : '';
+    }
+
+    createPlaceholderRow() {
+        return `
+            <tr class="result-row placeholder-row">
+                <td colspan="6"><div class="filepath">Loading...</div></td>
+            </tr>
+        `;
     }
 
     createResultRow(result, index) {
         const metadataStatus = this.getMetadataStatusText(result.metadata_status || 'unknown');
         const hasMetadataIssue = ['not_found', 'error', 'api_unavailable', 'partial'].includes(result.metadata_status);
 
-        if (hasMetadataIssue) {
-            this.metadataIssues.push({
-                file: result.source_path || result.filename,
-                message: result.error_message || 'Unknown metadata issue',
-                status: result.metadata_status
-            });
-        }
+        const conflicts = (result.issues || []).filter(issue => issue.blocking);
+        const conflictBadge = conflicts.length ?
+            `<span class="metadata-status error" title="${escapeHtml(conflicts.map(issue => issue.message).join('; '))}">Conflict</span>` : '';
 
         return `
-            <tr data-index="${index}" class="${hasMetadataIssue ? 'metadata-issue' : ''}">
+            <tr data-index="${index}" class="result-row ${hasMetadataIssue ? 'metadata-issue' : ''}">
                 <td class="checkbox-column">
                     <label class="checkbox-option">
-                        <input type="checkbox" class="result-checkbox" data-index="${index}">
+                        <input type="checkbox" class="result-checkbox" data-index="${index}" ${this.isSelected(index) ? 'checked' : ''} ${result.provisional ? 'disabled' : ''}>
                         <span class="checkbox-custom"></span>
                     </label>
                 </td>
                 <td>
                     <div class="file-info">
-                        <div class="filename">${result.filename || 'Unknown'}</div>
-                        <div class="filepath">${result.source_path || ''}</div>
+                        <div class="filename" title="${escapeHtml(result.filename)}">${escapeHtml(result.filename || 'Unknown')}</div>
+                        <div class="filepath" title="${escapeHtml(result.source_path)}">${escapeHtml(result.source_path)}</div>
                     </div>
                 </td>
                 <td>
                     <div class="new-filename">
-                        ${result.target_path ? result.target_path.split('/').pop() : 'No changes'}
+                        ${escapeHtml(result.target_path ? result.target_path.split('/').pop() : 'No changes')}
+                        ${conflictBadge}
                     </div>
                 </td>
                 <td>
-                    <span class="media-type ${result.media_type || 'unknown'}">
+                    <span class="media-type ${escapeHtml(result.media_type || 'unknown')}">
                         <i class="bi bi-${result.media_type === 'movie' ? 'camera-reels' : result.media_type === 'tv' ? 'tv' : 'question-circle'}"></i>
                         ${result.media_type === 'movie' ? 'Movie' : result.media_type === 'tv' ? 'TV Show' : 'Unknown'}
                     </span>
                 </td>
                 <td>
-                    <span class="metadata-status ${result.metadata_status || 'unknown'}" 
-                          title="${result.error_message || ''}">
-                        ${metadataStatus}
+                    <span class="metadata-status ${escapeHtml(result.metadata_status || 'unknown')}" 
+                          title="${escapeHtml(result.error_message)}">
+                        ${escapeHtml(metadataStatus)}
                     </span>
                 </td>
                 <td>
-                    <button class="btn btn-ghost btn-sm" onclick="app.showFileDetails(${index})" title="View details">
+                    <button class="btn btn-ghost btn-sm" data-action="details" data-index="${index}" title="View details" ${result.provisional ? 'disabled' : ''}>
                         <i class="bi bi-info-circle"></i>
                     </button>
                 </td>
@@ -482,44 +800,60 @@ class PlexMediaRenamer {
         return statusMap[status] || 'Unknown';
     }
 
+    isSelected(id) {
+        return this.selection.all !== this.selection.ids.has(id);
+    }
+
+    selectedCount() {
+        if (this.selection.all) {
+            return Math.max(0, this.resultsCount.filtered - this.selection.ids.size);
+        }
+        return this.selection.ids.size;
+    }
+
+    selectionRequest() {
+        // "Select all" is sent as the current filters rather than as every id
+        if (this.selection.all) {
+            const { q, metadata_status, media_type, status } = this.resultsQuery;
+            return {
+                selector: { q, metadata_status, media_type, status },
+                exclude: Array.from(this.selection.ids)
+            };
+        }
+        return { operations: Array.from(this.selection.ids).sort((a, b) => a - b) };
+    }
+
+    toggleResultSelection(id, checked) {
+        if (checked !== this.selection.all) {
+            this.selection.ids.add(id);
+        } else {
+            this.selection.ids.delete(id);
+        }
+        document.getElementById('selectAllCheckbox').checked = this.selection.all && this.selection.ids.size === 0;
+        this.updateResultsInfo();
+        this.updateApplyButton();
+    }
+
     updateApplyButton() {
-        const checkboxes = document.querySelectorAll('.result-checkbox:checked');
         const applyButton = document.getElementById('applyChangesButton');
-        applyButton.disabled = checkboxes.length === 0;
+        applyButton.disabled = this.selectedCount() === 0 || this.streamedRows !== null;
     }
 
     selectAllResults() {
-        const checkboxes = document.querySelectorAll('.result-checkbox');
-        const selectAllCheckbox = document.getElementById('selectAllCheckbox');
-
-        checkboxes.forEach(checkbox => {
-            checkbox.checked = true;
-        });
-        selectAllCheckbox.checked = true;
-        this.updateApplyButton();
+        this.toggleAllResults(true);
     }
 
     selectNoneResults() {
-        const checkboxes = document.querySelectorAll('.result-checkbox');
-        const selectAllCheckbox = document.getElementById('selectAllCheckbox');
-
-        checkboxes.forEach(checkbox => {
-            checkbox.checked = false;
-        });
-        selectAllCheckbox.checked = false;
-        this.updateApplyButton();
+        this.toggleAllResults(false);
     }
 
     toggleAllResults(checked) {
-        const checkboxes = document.querySelectorAll('.result-checkbox');
-        checkboxes.forEach(checkbox => {
-            checkbox.checked = checked;
-        });
-        this.updateApplyButton();
+        this.selection = { all: checked, ids: new Set() };
+        this.renderScanResults();
     }
 
     updateMetadataIssuesCount() {
-        const issuesCount = this.metadataIssues.length;
+        const issuesCount = this.metadataIssueCount;
         const metadataIssuesElement = document.getElementById('metadataIssues');
         const showIssuesButton = document.getElementById('showMetadataIssues');
 
@@ -532,7 +866,19 @@ class PlexMediaRenamer {
         }
     }
 
-    showMetadataIssues() {
+    async showMetadataIssues() {
+        try {
+            const response = await fetch(`/api/scan/issues?${this.jobParam()}`);
+            const data = await response.json();
+            this.metadataIssues = (data.metadata_issues || []).map(issue => ({
+                file: issue.file,
+                message: issue.issue,
+                status: issue.status
+            }));
+        } catch (error) {
+            console.error('Error loading metadata issues:', error);
+        }
+
         if (this.metadataIssues.length === 0) {
             this.showAlert('No metadata issues found', 'info');
             return;
@@ -543,10 +889,10 @@ class PlexMediaRenamer {
 
         issuesList.innerHTML = this.metadataIssues.map(issue => `
             <div class="issue-item">
-                <div class="issue-file">${issue.file}</div>
+                <div class="issue-file">${escapeHtml(issue.file)}</div>
                 <div class="issue-message">
-                    <span class="metadata-status ${issue.status}">${this.getMetadataStatusText(issue.status)}</span>
-                    ${issue.message}
+                    <span class="metadata-status ${escapeHtml(issue.status)}">${escapeHtml(this.getMetadataStatusText(issue.status))}</span>
+                    ${escapeHtml(issue.message)}
                 </div>
             </div>
         `).join('');
@@ -581,7 +927,8 @@ class PlexMediaRenamer {
             tv_shows_subfolder: document.getElementById('tvShowsSubfolder').value,
             create_movie_folders: document.getElementById('createMovieFolders').checked,
             include_episode_title: document.getElementById('includeEpisodeTitle').checked,
-            include_series_id: document.getElementById('includeSeriesId').checked
+            include_series_id: document.getElementById('includeSeriesId').checked,
+            operation_mode: document.getElementById('operationMode').value
         };
 
         try {
@@ -625,34 +972,185 @@ class PlexMediaRenamer {
         document.getElementById('operationsReady').textContent = operationsReady;
     }
 
-    async startStatusPolling() {
-        setInterval(async () => {
-            try {
-                const response = await fetch('/api/scan/status');
-                const data = await response.json();
-
-                if (data.success) {
-                    const status = data.status;
-
-                    if (status.is_scanning) {
-                        this.showProgress();
-                        this.updateProgress(status.progress, status.message);
-                    } else {
-                        if (this.isScanning) {
-                            // Scan just finished
-                            this.isScanning = false;
-                            this.hideProgress();
-                            this.loadScanResults();
-                            this.loadMediaFolders();
-                        }
-                    }
+    connectEvents() {
+        if (!window.EventSource) {
+            // Without SSE, status is polled only while a scan is running
+            return;
+        }
+
+        this.events = new EventSource('/api/events');
+
+        this.events.addEventListener('status', (e) => {
+            const data = JSON.parse(e.data);
+            if (this.followsJob(data.job_id, data.status.is_scanning)) {
+                this.applyStatus(data);
+            }
+        });
+
+        this.events.addEventListener('scan_started', (e) => {
+            if (!this.followsJob(JSON.parse(e.data).job_id, true)) {
+                return;
+            }
+            this.isScanning = true;
+            this.streamedRows = [];
+            this.selection = { all: false, ids: new Set() };
+            this.showProgress();
+            this.renderScanResults();
+        });
+
+        this.events.addEventListener('results', (e) => {
+            const data = JSON.parse(e.data);
+            if (this.isScanning && data.job_id === this.activeJobId) {
+                this.appendStreamedResults(data.items);
+            }
+        });
 
-                    this.updateStats(data.files_count, data.operations_count);
+        this.events.addEventListener('scan_complete', (e) => {
+            const data = JSON.parse(e.data);
+            if (!this.followsJob(data.job_id, false)) {
+                return;
+            }
+            this.isScanning = false;
+            this.hideProgress();
+            // Final ids are assigned once the scan is validated
+            this.jobId = data.job_id;
+            this.streamedRows = null;
+            this.setResultsQuery({});
+        });
+
+        this.events.addEventListener('apply_complete', (e) => {
+            // Also refreshes pages watching a scan that someone else applied
+            const data = JSON.parse(e.data);
+            if (data.scan_job_id === this.jobId && !data.summary.dry_run) {
+                this.refreshResults();
+            }
+        });
+
+        this.events.addEventListener('discovery_complete', (e) => {
+            if (this.followsJob(JSON.parse(e.data).job_id, false)) {
+                this.loadMediaFolders();
+            }
+        });
+
+        this.events.onerror = () => {
+            // EventSource reconnects by itself and resumes from the last event id
+            console.warn('Event stream disconnected, reconnecting...');
+        };
+    }
+
+    jobParam() {
+        return this.jobId ? new URLSearchParams({ job_id: this.jobId }) : '';
+    }
+
+    followsJob(jobId, running) {
+        // An idle page picks up whichever job starts next; while one job is
+        // followed, events from other users' jobs are ignored
+        if (running && (!this.isScanning || !this.activeJobId)) {
+            this.activeJobId = jobId;
+        }
+        return !this.activeJobId || jobId === this.activeJobId;
+    }
+
+    applyStatus(data) {
+        const status = data.status;
+
+        if (status.is_scanning) {
+            this.isScanning = true;
+            this.showProgress();
+            this.updateProgress(status.progress, status.message);
+        } else if (this.isScanning) {
+            this.isScanning = false;
+            this.hideProgress();
+        }
+
+        this.updateStats(data.files_count, data.operations_count);
+        if (status.report) {
+            // Only finished jobs carry a report
+            this.showJobReport(`Last ${status.kind}`, status.report);
+        }
+    }
+
+    showJobReport(title, report) {
+        const container = document.getElementById('jobReport');
+        if (!container || !report) {
+            return;
+        }
+
+        const stages = report.stages
+            .map(stage => `${stage.name} ${stage.seconds.toFixed(1)}s`)
+            .join(', ');
+        document.getElementById('jobReportSummary').textContent =
+            `${title}: ${report.wall_seconds.toFixed(1)}s` + (stages ? ` (${stages})` : '');
+
+        // Built with textContent, as names are file paths and queries
+        const body = document.getElementById('jobReportBody');
+        body.replaceChildren();
+        const counts = Object.entries(report.counts);
+        if (counts.length) {
+            body.appendChild(this.createReportTable(['Count', 'Value'], counts.map(([name, value]) => [
+                name.replace(/_/g, ' '),
+                Number.isInteger(value) ? value.toLocaleString() : value.toFixed(2)
+            ])));
+        }
+        Object.entries(report.slowest).forEach(([category, items]) => {
+            const heading = document.createElement('h4');
+            heading.textContent = `Slowest ${category}`;
+            body.appendChild(heading);
+            body.appendChild(this.createReportTable(['Item', 'Seconds'],
+                items.map(item => [item.name, item.seconds.toFixed(3)])));
+        });
+        container.style.display = 'block';
+    }
+
+    createReportTable(headers, rows) {
+        const table = document.createElement('table');
+        table.className = 'report-table';
+        const head = table.createTHead().insertRow();
+        headers.forEach(text => {
+            const cell = document.createElement('th');
+            cell.textContent = text;
+            head.appendChild(cell);
+        });
+        const tbody = table.createTBody();
+        rows.forEach(cells => {
+            const row = tbody.insertRow();
+            cells.forEach(text => {
+                row.insertCell().textContent = text;
+            });
+        });
+        return table;
+    }
+
+    async pollStatus() {
+        if (this.events) {
+            return;
+        }
+
+        try {
+            const response = await fetch(`/api/scan/status?${new URLSearchParams({ job_id: this.activeJobId })}`);
+            const data = await response.json();
+
+            if (data.success) {
+                const wasScanning = this.isScanning;
+                this.applyStatus(data);
+                if (wasScanning && !this.isScanning) {
+                    // Job just finished
+                    if (data.status.kind === 'scan' && data.status.state === 'completed') {
+                        this.jobId = data.job_id;
+                    }
+                    this.streamedRows = null;
+                    this.setResultsQuery({});
+                    this.loadMediaFolders();
+                    return;
                 }
-            } catch (error) {
-                console.error('Error polling status:', error);
             }
-        }, 1000);
+        } catch (error) {
+            console.error('Error polling status:', error);
+        }
+
+        if (this.isScanning) {
+            setTimeout(() => this.pollStatus(), 1000);
+        }
     }
 
     showAlert(message, type = 'info') {
@@ -669,7 +1167,7 @@ class PlexMediaRenamer {
 
         alert.innerHTML = `
             <i class="bi ${iconMap[type] || iconMap.info}"></i>
-            <span>${message}</span>
+            <span>${escapeHtml(message)}</span>
         `;
 
         alertContainer.appendChild(alert);
@@ -682,8 +1180,15 @@ class PlexMediaRenamer {
         }, 5000);
     }
 
-    showFileDetails(index) {
-        const result = this.scanResults[index];
+    async showFileDetails(id) {
+        let result;
+        try {
+            const response = await fetch(`/api/scan/results/${id}?${this.jobParam()}`);
+            const data = await response.json();
+            result = data.result;
+        } catch (error) {
+            console.error('Error loading result details:', error);
+        }
         if (!result) return;
 
         // Create a simple details display
@@ -692,7 +1197,7 @@ class PlexMediaRenamer {
             Source: ${result.source_path}
             Target: ${result.target_path}
             Metadata Status: ${this.getMetadataStatusText(result.metadata_status)}
-            ${result.metadata_message ? 'Message: ' + result.metadata_message : ''}
+            ${result.error_message ? 'Message: ' + result.error_message : ''}
         `;
 
         alert(details); // Simple alert for now, could be enhanced with a proper modal
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Planning throughput benchmark against the local metadata stand-in server.
+
+Generates a synthetic library of movies and TV episodes in a temporary
+directory, starts tools/mock_metadata_server.py in-process and measures
+files per second for MediaRenamer.plan_operations and for the web scan
+(/api/scan) at several concurrency settings. No API keys or network
+access are needed.
+
+Example:
+    python tools/benchmark_planning.py --files 400 --concurrency 1,4,8 --latency 0.05
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+
+from mock_metadata_server import MockMetadataServer
+
+
+def build_library(root: str, count: int) -> str:
+    """
+    Create empty media files: half movies, half TV episodes.
+
+    Args:
+        root: Directory to create the library in
+        count: Total number of files
+
+    Returns:
+        Path of the library directory
+    """
+    library = os.path.join(root, 'library')
+    movies = os.path.join(library, 'movies')
+    shows = os.path.join(library, 'tv_shows')
+    os.makedirs(movies)
+
+    for i in range(count // 2):
+        open(os.path.join(movies, f"Benchmark Movie {i} ({1980 + i % 40}) 1080p.mkv"), 'w').close()
+
+    for i in range(count - count // 2):
+        show, episode = divmod(i, 10)
+        season_dir = os.path.join(shows, f"Benchmark Show {show}", "Season 01")
+        os.makedirs(season_dir, exist_ok=True)
+        open(os.path.join(season_dir, f"Benchmark Show {show} S01E{episode + 1:02d}.mkv"), 'w').close()
+
+    return library
+
+
+def make_config(workdir: str, server: MockMetadataServer, workers: int, client_rps: float):
+    """Write a throwaway config pointing both clients at the stand-in server."""
+    from src.utils.config import Config
+
+    config = Config(os.path.join(workdir, f"bench_{workers}.ini"))
+    config.set('API', 'tmdb_api_key', 'benchmark')
+    config.set('API', 'tvdb_api_key', 'benchmark')
+    config.set('API', 'tmdb_base_url', server.tmdb_url)
+    config.set('API', 'tvdb_base_url', server.tvdb_url)
+    config.set('PATHS', 'base_media_path', os.path.join(workdir, 'plex'))
+    config.set('NETWORK', 'max_workers', workers)
+    config.set('NETWORK', 'tmdb_requests_per_second', client_rps)
+    config.set('NETWORK', 'tvdb_requests_per_second', client_rps)
+    # Measure the network path, not the cache
+    config.set('CACHE', 'enabled', 'false')
+    config.set('CACHE', 'background_refresh', 'false')
+    return config
+
+
+def bench_plan(config, library: str, workers: int) -> float:
+    """Return files/second for MediaRenamer.plan_operations."""
+    from src.core.file_parser import FileParser
+    from src.core.renamer import MediaRenamer
+
+    media_files = FileParser().scan_directory(library, 'auto')
+    renamer = MediaRenamer(config)
+    try:
+        start = time.perf_counter()
+        renamer.plan_operations(media_files, max_workers=workers)
+        elapsed = time.perf_counter() - start
+    finally:
+        renamer.close()
+    return len(media_files) / elapsed if elapsed else 0.0
+
+
+def bench_web_scan(config, library: str, timeout: float = 600) -> float:
+    """Return files/second for a full /api/scan run through the Flask app."""
+    import app as web
+    from src.core.renamer import MediaRenamer
+
+    # Importing the app configures INFO logging to the console; keep output readable
+    logging.getLogger().setLevel(logging.WARNING)
+    web.config = config
+    web.media_renamer.close()
+    web.media_renamer = MediaRenamer(config)
+    client = web.app.test_client()
+
+    start = time.perf_counter()
+    response = client.post('/api/scan', json={'media_type': 'movies', 'scan_path': library})
+    if not response.get_json().get('success'):
+        raise RuntimeError(f"Scan failed to start: {response.get_json()}")
+    job_id = response.get_json()['job_id']
+
+    while time.perf_counter() - start < timeout:
+        status = client.get(f'/api/jobs/{job_id}').get_json()
+        if status['status']['state'] == 'completed':
+            elapsed = time.perf_counter() - start
+            return status['files_count'] / elapsed if elapsed else 0.0
+        if status['status']['state'] in ('failed', 'cancelled'):
+            raise RuntimeError(f"Web scan {status['status']['state']}: {status['status']['message']}")
+        time.sleep(0.05)
+    raise RuntimeError("Web scan timed out")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark metadata planning throughput")
+    parser.add_argument('--files', type=int, default=200, help='Number of synthetic media files')
+    parser.add_argument('--concurrency', default='1,2,4,8', help='Comma-separated worker counts')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request (s)')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Extra random latency (s)')
+    parser.add_argument('--tmdb-rate', type=float, default=0, help='Server-side TMDB rate limit (0 = none)')
+    parser.add_argument('--tvdb-rate', type=float, default=0, help='Server-side TVDB rate limit (0 = none)')
+    parser.add_argument('--inject-429', type=float, default=0.0, help='Probability of injected 429s')
+    parser.add_argument('--inject-503', type=float, default=0.0, help='Probability of injected 503s')
+    parser.add_argument('--client-rps', type=float, default=0, help='Client-side requests/second (0 = unlimited)')
+    parser.add_argument('--mode', choices=['plan', 'web', 'both'], default='both')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='plex_renamer_bench_')
+    cwd = os.getcwd()
+    server = MockMetadataServer(
+        latency=args.latency, jitter=args.jitter, tmdb_rate=args.tmdb_rate, tvdb_rate=args.tvdb_rate,
+        inject_429=args.inject_429, inject_503=args.inject_503, retry_after=0.2, seed=1
+    ).start()
+
+    try:
+        # The web app writes config.ini and logs/ relative to the working directory
+        os.chdir(workdir)
+        library = build_library(workdir, args.files)
+        print(f"Library: {args.files} files, server latency {args.latency * 1000:.0f}ms")
+        print(f"{'workers':>8} {'plan files/s':>14} {'web files/s':>13}")
+
+        for workers in [int(w) for w in args.concurrency.split(',') if w.strip()]:
+            config = make_config(workdir, server, workers, args.client_rps)
+            plan_rate = bench_plan(config, library, workers) if args.mode in ('plan', 'both') else None
+            web_rate = bench_web_scan(config, library) if args.mode in ('web', 'both') else None
+            print(f"{workers:>8} "
+                  f"{plan_rate if plan_rate is not None else float('nan'):>14.1f} "
+                  f"{web_rate if web_rate is not None else float('nan'):>13.1f}")
+
+        print(f"Server counters: {server.counters}")
+    finally:
+        os.chdir(cwd)
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Local TMDB/TVDB stand-in server for benchmarks and offline development.
+
+Serves recorded fixture responses (tools/fixtures/metadata.json) for the
+endpoints the clients use, and synthesizes deterministic results for any
+title that is not in the fixtures so large generated libraries still match.
+Latency, per-API rate limiting and 429/503 injection are configurable.
+
+TMDB is mounted under /3 and TVDB v4 under /v4, so point the app at it with:
+
+    [API]
+    tmdb_base_url = http://127.0.0.1:8765/3
+    tvdb_base_url = http://127.0.0.1:8765/v4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'metadata.json')
+
+MOCK_TOKEN = 'mock-tvdb-token'
+
+
+class TokenBucket:
+    """Simple token bucket used to emulate an API's rate limit."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Consume a token; return False if the caller should be throttled."""
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class MetadataDataset:
+    """Fixture records plus deterministic synthesized records for unknown titles."""
+
+    def __init__(self, fixtures_path: str = FIXTURES_PATH):
+        with open(fixtures_path, encoding='utf-8') as f:
+            fixtures = json.load(f)
+
+        self.movies = {m['id']: m for m in fixtures['tmdb']['movies']}
+        self.shows = {s['id']: s for s in fixtures['tmdb']['tv']}
+        self.series = {s['id']: s for s in fixtures['tvdb']['series']}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(title: str) -> str:
+        return re.sub(r'[^a-z0-9]+', ' ', title.lower()).strip()
+
+    @staticmethod
+    def _synthetic_id(kind: str, title: str) -> int:
+        # Offset keeps synthesized IDs clear of the fixture IDs
+        return 10_000_000 + zlib.crc32(f"{kind}:{title}".encode()) % 10_000_000
+
+    def _find(self, records: Dict[int, Dict], query: str, key: str):
+        wanted = self._normalize(query)
+        return [r for r in records.values() if wanted and wanted in self._normalize(r[key])]
+
+    def search_movies(self, query: str, year: Optional[str]):
+        results = self._find(self.movies, query, 'title')
+        if not results:
+            movie_id = self._synthetic_id('movie', self._normalize(query))
+            with self._lock:
+                movie = self.movies.setdefault(movie_id, {
+                    'id': movie_id,
+                    'title': query.strip().title(),
+                    'original_title': query.strip().title(),
+                    'release_date': f"{year or 2000}-01-01",
+                    'overview': f"Synthesized record for {query}.",
+                    'popularity': 1.0
+                })
+            results = [movie]
+        return results
+
+    def search_shows(self, query: str, year: Optional[str]):
+        results = self._find(self.shows, query, 'name')
+        if not results:
+            show_id = self._synthetic_id('tv', self._normalize(query))
+            with self._lock:
+                show = self.shows.setdefault(show_id, {
+                    'id': show_id,
+                    'name': query.strip().title(),
+                    'original_name': query.strip().title(),
+                    'first_air_date': f"{year or 2000}-01-01",
+                    'overview': f"Synthesized record for {query}.",
+                    'popularity': 1.0,
+                    'seasons': {}
+                })
+            results = [show]
+        return results
+
+    def search_series(self, query: str):
+        results = self._find(self.series, query, 'name')
+        if not results:
+            series_id = self._synthetic_id('series', self._normalize(query))
+            with self._lock:
+                series = self.series.setdefault(series_id, {
+                    'id': series_id,
+                    'name': query.strip().title(),
+                    'first_air_time': '2000-01-01',
+                    'overview': f"Synthesized record for {query}.",
+                    'episodes': []
+                })
+            results = [series]
+        return results
+
+    def episode(self, show: Dict, season: int, number: int) -> Dict:
+        for ep in show.get('seasons', {}).get(str(season), []):
+            if ep['episode_number'] == number:
+                return dict(ep, season_number=season)
+        return {
+            'episode_number': number,
+            'season_number': season,
+            'name': f"Episode {number}",
+            'air_date': None
+        }
+
+    def season(self, show: Dict, season: int, episodes: int = 10) -> Dict:
+        known = {ep['episode_number'] for ep in show.get('seasons', {}).get(str(season), [])}
+        numbers = sorted(known | set(range(1, episodes + 1)))
+        return {
+            'season_number': season,
+            'name': f"Season {season}",
+            'episodes': [self.episode(show, season, n) for n in numbers]
+        }
+
+    def series_episodes(self, series: Dict, season: Optional[int]):
+        episodes = list(series.get('episodes', []))
+        if not episodes:
+            episodes = [{'id': series['id'] * 100 + n, 'seasonNumber': 1, 'number': n,
+                         'name': f"Episode {n}", 'aired': None} for n in range(1, 11)]
+        if season is not None:
+            episodes = [ep for ep in episodes if ep['seasonNumber'] == season]
+        return episodes
+
+
+class MockServerState:
+    """Shared configuration and counters for request handlers."""
+
+    def __init__(self, dataset: MetadataDataset, latency: float = 0.0, jitter: float = 0.0,
+                 tmdb_rate: float = 0.0, tvdb_rate: float = 0.0, inject_429: float = 0.0,
+                 inject_503: float = 0.0, retry_after: float = 1.0, seed: Optional[int] = None):
+        self.dataset = dataset
+        self.latency = latency
+        self.jitter = jitter
+        self.buckets = {'tmdb': TokenBucket(tmdb_rate), 'tvdb': TokenBucket(tvdb_rate)}
+        self.inject_429 = inject_429
+        self.inject_503 = inject_503
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def count(self, key: str):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def roll(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self.random.random() < probability
+
+
+class MockMetadataHandler(BaseHTTPRequestHandler):
+    """Routes TMDB (/3) and TVDB (/v4) requests to the dataset."""
+
+    server_version = 'MockMetadata/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def state(self) -> MockServerState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode('utf-8')
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            self.state.count('status_304')
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 200:
+            self.send_header('ETag', etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.state.count(f'status_{status}')
+
+    def _throttle(self, api: str) -> bool:
+        """Apply latency, rate limiting and fault injection; True if a fault was sent."""
+        state = self.state
+        delay = state.latency + (random.uniform(0, state.jitter) if state.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if not state.buckets[api].take() or state.roll(state.inject_429):
+            self._send_json(429, {'status_message': 'Your request count is over the allowed limit.'},
+                            {'Retry-After': str(state.retry_after)})
+            return True
+        if state.roll(state.inject_503):
+            self._send_json(503, {'status_message': 'Service unavailable.'})
+            return True
+        return False
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        path = parsed.path.rstrip('/')
+        self.state.count('requests')
+
+        if path == '/_stats':
+            self._send_json(200, self.state.counters)
+        elif path.startswith('/3/'):
+            if not self._throttle('tmdb'):
+                self._route_tmdb(path[len('/3'):], query)
+        elif path.startswith('/v4/'):
+            if self.headers.get('Authorization') != f'Bearer {MOCK_TOKEN}':
+                self._send_json(401, {'status': 'failure', 'message': 'Unauthorized'})
+            elif not self._throttle('tvdb'):
+                self._route_tvdb(path[len('/v4'):], query)
+        else:
+            self._send_json(404, {'status_message': 'Not found'})
+
+    def do_POST(self):
+        path = urlparse(self.path).path.rstrip('/')
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        self.state.count('requests')
+
+        if path == '/v4/login':
+            if payload.get('apikey'):
+                self._send_json(200, {'status': 'success', 'data': {'token': MOCK_TOKEN}})
+            else:
+                self._send_json(401, {'status': 'failure', 'message': 'Invalid API key'})
+        else:
+            self._send_json(404, {'status_message': 'Not found'})
+
+    def _route_tmdb(self, path: str, query: Dict):
+        data = self.state.dataset
+        if not query.get('api_key'):
+            self._send_json(401, {'status_message': 'Invalid API key'})
+            return
+
+        if path == '/search/movie':
+            results = data.search_movies(query.get('query', ''), query.get('year'))
+            self._send_json(200, {'page': 1, 'results': results, 'total_results': len(results)})
+            return
+        if path == '/search/tv':
+            results = data.search_shows(query.get('query', ''), query.get('first_air_date_year'))
+            self._send_json(200, {'page': 1, 'results': results, 'total_results': len(results)})
+            return
+
+        match = re.fullmatch(r'/movie/(\d+)', path)
+        if match:
+            movie = data.movies.get(int(match.group(1)))
+            if movie:
+                self._send_json(200, movie)
+            else:
+                self._send_json(404, {'status_message': 'Not found'})
+            return
+
+        match = re.fullmatch(r'/tv/(\d+)(?:/season/(\d+)(?:/episode/(\d+))?)?', path)
+        if match:
+            show = data.shows.get(int(match.group(1)))
+            if not show:
+                self._send_json(404, {'status_message': 'Not found'})
+            elif match.group(3):
+                self._send_json(200, data.episode(show, int(match.group(2)), int(match.group(3))))
+            elif match.group(2):
+                self._send_json(200, data.season(show, int(match.group(2))))
+            else:
+                self._send_json(200, {k: v for k, v in show.items() if k != 'seasons'})
+            return
+
+        self._send_json(404, {'status_message': 'Not found'})
+
+    def _route_tvdb(self, path: str, query: Dict):
+        data = self.state.dataset
+
+        if path == '/search':
+            results = [{'id': s['id'], 'tvdb_id': str(s['id']), 'type': 'series', 'name': s['name'],
+                        'first_air_time': s['first_air_time']}
+                       for s in data.search_series(query.get('query', ''))]
+            self._send_json(200, {'status': 'success', 'data': results})
+            return
+
+        match = re.fullmatch(r'/series/(\d+)(/extended|/episodes/default)?', path)
+        if match:
+            series = data.series.get(int(match.group(1)))
+            if not series:
+                self._send_json(404, {'status': 'failure', 'message': 'Not found'})
+            elif match.group(2) == '/episodes/default':
+                season = int(query['season']) if 'season' in query else None
+                self._send_json(200, {'status': 'success', 'data': {
+                    'series': {'id': series['id'], 'name': series['name']},
+                    'episodes': data.series_episodes(series, season)
+                }})
+            else:
+                details = {k: v for k, v in series.items() if k != 'episodes'}
+                self._send_json(200, {'status': 'success', 'data': details})
+            return
+
+        self._send_json(404, {'status': 'failure', 'message': 'Not found'})
+
+
+class MockMetadataServer:
+    """Threaded stand-in server that can run in-process or from the command line."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **options):
+        """
+        Initialize the server.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            **options: MockServerState options (latency, jitter, tmdb_rate,
+                tvdb_rate, inject_429, inject_503, retry_after, seed)
+        """
+        fixtures = options.pop('fixtures', FIXTURES_PATH)
+        self.httpd = ThreadingHTTPServer((host, port), MockMetadataHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = MockServerState(MetadataDataset(fixtures), **options)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def tmdb_url(self) -> str:
+        return f"{self.url}/3"
+
+    @property
+    def tvdb_url(self) -> str:
+        return f"{self.url}/v4"
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self.httpd.state.counters)
+
+    def start(self) -> 'MockMetadataServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-metadata', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='Base response latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Extra random latency in seconds')
+    parser.add_argument('--tmdb-rate', type=float, default=40, help='TMDB requests/second before 429 (0 = unlimited)')
+    parser.add_argument('--tvdb-rate', type=float, default=20, help='TVDB requests/second before 429 (0 = unlimited)')
+    parser.add_argument('--inject-429', type=float, default=0.0, help='Probability of a random 429')
+    parser.add_argument('--inject-503', type=float, default=0.0, help='Probability of a random 503')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--fixtures', default=FIXTURES_PATH)
+    args = parser.parse_args(argv)
+
+    server = MockMetadataServer(
+        args.host, args.port, latency=args.latency, jitter=args.jitter,
+        tmdb_rate=args.tmdb_rate, tvdb_rate=args.tvdb_rate, inject_429=args.inject_429,
+        inject_503=args.inject_503, retry_after=args.retry_after, fixtures=args.fixtures
+    )
+    print(f"Mock metadata server listening on {server.url} (TMDB: {server.tmdb_url}, TVDB: {server.tvdb_url})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Local OTLP/HTTP trace collector stand-in and trace report tool.
+
+Accepts the OTLP/JSON export requests the app posts to /v1/traces when
+``[TRACING] exporter = otlp``, appends each one as a line to a JSONL file
+(the same format the ``jsonl`` exporter writes) and keeps the spans in
+memory. ``--report`` reads such a file and lists the slowest traces and
+spans, and the total time per span name, to find the files or shows that
+dominate a scan:
+
+    python tools/trace_collector.py --port 4318 --output logs/traces.jsonl
+    python tools/trace_collector.py --report logs/traces.jsonl --top 20
+"""
+
+import argparse
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+
+
+def iter_spans(payload: Dict) -> Iterable[Dict]:
+    """Yield the spans of one OTLP/JSON export request, each with its attributes as a dict."""
+    for resource_spans in payload.get('resourceSpans', []):
+        for scope_spans in resource_spans.get('scopeSpans', []):
+            for span in scope_spans.get('spans', []):
+                attributes = {}
+                for attribute in span.get('attributes', []):
+                    value = attribute.get('value', {})
+                    attributes[attribute['key']] = next(iter(value.values()), None)
+                yield dict(span, attributes=attributes,
+                           duration=(int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])) / 1e9)
+
+
+def load_spans(path: str) -> List[Dict]:
+    """Read every span of a JSONL trace file."""
+    spans = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                spans.extend(iter_spans(json.loads(line)))
+    return spans
+
+
+def span_label(span: Dict) -> str:
+    """Return a span's name with the attribute that identifies its subject, if any."""
+    attributes = span['attributes']
+    for key in ('file.path', 'operation.source', 'api.endpoint', 'url.path', 'job.id', 'file.directory'):
+        if key in attributes:
+            suffix = f"?{attributes['url.query']}" if key == 'url.path' and attributes.get('url.query') else ''
+            return f"{span['name']} {attributes[key]}{suffix}"
+    return span['name']
+
+
+def report(spans: List[Dict], top: int = 10) -> str:
+    """
+    Summarize spans as text.
+
+    Args:
+        spans: Spans from iter_spans / load_spans
+        top: Rows per section
+
+    Returns:
+        Slowest traces (by root span), slowest spans, and time per span name
+    """
+    lines = [f"{len(spans)} spans in {len({span['traceId'] for span in spans})} traces"]
+
+    roots = sorted((span for span in spans if not span.get('parentSpanId')),
+                   key=lambda span: span['duration'], reverse=True)
+    lines.append("\nSlowest traces:")
+    lines.extend(f"  {span['duration']:10.3f}s  {span_label(span)}" for span in roots[:top])
+
+    lines.append("\nSlowest spans:")
+    slowest = sorted((span for span in spans if span.get('parentSpanId')),
+                     key=lambda span: span['duration'], reverse=True)
+    lines.extend(f"  {span['duration']:10.3f}s  {span_label(span)}"
+                 + ('  [error]' if span.get('status', {}).get('code') == 2 else '')
+                 for span in slowest[:top])
+
+    totals: Dict[str, List[float]] = {}
+    for span in spans:
+        totals.setdefault(span['name'], []).append(span['duration'])
+    lines.append("\nTime per span name:")
+    lines.append(f"  {'name':30} {'count':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}")
+    for name, durations in sorted(totals.items(), key=lambda item: sum(item[1]), reverse=True)[:top]:
+        lines.append(f"  {name:30} {len(durations):8d} {sum(durations):10.3f} "
+                     f"{sum(durations) / len(durations) * 1000:10.2f} {max(durations) * 1000:10.2f}")
+    return '\n'.join(lines)
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """Accepts OTLP/JSON export requests on /v1/traces."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.path.split('?', 1)[0] != '/v1/traces':
+            self._send(404, {'error': 'Not found'})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        except (ValueError, TypeError):
+            self._send(400, {'error': 'Expected an OTLP/JSON body'})
+            return
+        self.server.collector.add(payload)
+        self._send(200, {})
+
+    def _send(self, status: int, body: Dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TraceCollector:
+    """Threaded collector that can run in-process or from the command line."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, output: Optional[str] = None):
+        """
+        Initialize the collector.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            output: JSONL file each export request is appended to
+        """
+        self.output = output
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), CollectorHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.collector = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/traces"
+
+    def add(self, payload: Dict):
+        """Store one export request."""
+        with self._lock:
+            self.spans.extend(iter_spans(payload))
+            if self.output:
+                with open(self.output, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(payload, separators=(',', ':')) + '\n')
+
+    def start(self) -> 'TraceCollector':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='trace-collector', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4318)
+    parser.add_argument('--output', help='JSONL file export requests are appended to')
+    parser.add_argument('--report', metavar='FILE', help='Summarize a JSONL trace file instead of serving')
+    parser.add_argument('--top', type=int, default=10, help='Rows per report section')
+    args = parser.parse_args(argv)
+
+    if args.report:
+        print(report(load_spans(args.report), args.top))
+        return 0
+
+    collector = TraceCollector(args.host, args.port, args.output)
+    print(f"Trace collector listening on {collector.url}")
+    try:
+        collector.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.httpd.server_close()
+        if collector.spans:
+            print(report(collector.spans, args.top))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())